@@ -0,0 +1,82 @@
+"""
+`alloc_guard`
+================================================================================
+Measure heap allocation of a hot path, to catch code that allocates in the
+steady state and causes garbage collection pauses.
+
+Uses ``gc.mem_alloc()`` on CircuitPython and ``tracemalloc`` on a host.  Run
+the path against NullDevice stand-ins for the UART and HID keyboard so that
+measuring it doesn't send anything.
+
+* Author: Jason Pecor
+
+"""
+
+import gc
+
+
+def allocated_per_call(func, *, warmup=3, iterations=20):
+    """Return the average number of heap bytes allocated by one call of ``func`` after
+    ``warmup`` calls.  Collection is disabled while measuring so nothing is freed
+    part way through.
+    """
+    for _ in range(warmup):
+        func()
+    mem_alloc = getattr(gc, "mem_alloc", None)
+    if mem_alloc is None:
+        return _traced_per_call(func, iterations)
+
+    gc.collect()
+    gc.disable()
+    try:
+        before = mem_alloc()
+        for _ in range(iterations):
+            func()
+        after = mem_alloc()
+    finally:
+        gc.enable()
+    return (after - before) / iterations
+
+
+def _traced_per_call(func, iterations):
+    # Host fallback.  Memory that is allocated and freed within the call never shows
+    # up as growth, so count the peak above the starting point of each call.
+    import tracemalloc    # pylint: disable=import-outside-toplevel
+    tracemalloc.start()
+    total = 0
+    try:
+        for _ in range(iterations):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            func()
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / iterations
+
+
+class NullDevice():
+    """Stand-in for a UART or HID device that accepts and discards everything."""
+
+    in_waiting = 0
+
+    def write(self, data):
+        """Accept a UART write."""
+        return len(data)
+
+    def readinto(self, buffer):
+        """Nothing is ever received."""
+        return 0
+
+    def send_report(self, report):
+        """Accept a HID report."""
+
+
+def check(name, func, *, limit=0, warmup=3, iterations=20):
+    """Print a warning and return False if ``func`` allocates more than ``limit`` bytes
+    per call once warmed up."""
+    allocated = allocated_per_call(func, warmup=warmup, iterations=iterations)
+    if allocated > limit:
+        print("{} allocates {} bytes per call".format(name, allocated))
+        return False
+    return True
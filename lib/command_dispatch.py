@@ -0,0 +1,253 @@
+"""
+`command_dispatch`
+================================================================================
+Dispatch table between button presses and the code that acts on commands.
+
+At startup the command numbers of every (page, button) pair are compiled
+into a flat table of bindings, so a press costs one index rather than any
+searching.  Commands are queued rather than run straight away, and the queue
+is drained from the main loop:
+
+* a command that is already waiting in the queue is merged with it rather
+  than queued twice, so holding a repeat button against a slow link can't
+  pile up a backlog
+* each command can have a minimum interval between runs; it waits in the
+  queue until it is allowed, without holding up other commands
+* the queue has a fixed size; when it is full either the new command or the
+  oldest waiting one is dropped
+* an optional ``ready`` check lets a busy downstream link hold everything
+
+Rate limits and latencies are kept in ``ticks_ms`` milliseconds and compared
+through ``ticks_diff()``, so a 50 ms limit stays 50 ms however long the board
+has been up.
+
+* Author: Jason Pecor
+
+"""
+
+from array import array
+from micropython import const
+from ticks import ticks_ms, ticks_add, ticks_diff
+
+# What to do when a command arrives and the queue is full
+DROP_NEWEST = const(0)
+DROP_OLDEST = const(1)
+
+_NONE = const(0xFFFF)     # no binding in the table
+
+
+class _Binding():
+    # pylint: disable=too-many-instance-attributes, too-few-public-methods
+    # Handler and rate limit state for one command; times are in milliseconds
+    def __init__(self, command, handler, min_interval, coalesce):
+        self.command = command
+        self.handler = handler
+        self.min_interval = int(min_interval * 1000 + 0.5)
+        self.coalesce = coalesce
+        self.next_time = 0
+        self.queued_at = 0
+        self.pending = False
+
+
+class CommandDispatcher():
+    # pylint: disable=too-many-instance-attributes
+    """Maps (page, button) presses to command handlers through a bounded queue.
+
+    :param default_handler: Function called as ``handler(command)`` for commands without
+                            a handler of their own.
+    :param queue_size: Most commands waiting at once. Defaults to 16.
+    :param overflow: DROP_NEWEST or DROP_OLDEST. Defaults to DROP_OLDEST.
+    :param min_interval: Default seconds between runs of the same command. Defaults to 0.
+    :param ready: Function returning False while commands should wait, e.g. while the
+                  UART queue is backed up.
+    :param clock: Function returning the current time in milliseconds. Defaults to
+                  ``supervisor.ticks_ms``.
+
+    """
+
+    def __init__(self, default_handler, *, queue_size=16, overflow=DROP_OLDEST,
+                 min_interval=0, ready=None, clock=ticks_ms):
+        self._default_handler = default_handler
+        self._min_interval = min_interval
+        self.overflow = overflow
+        self._ready = ready
+        self._clock = clock
+        self._bindings = {}
+        self._table = array("H")
+        self._table_bindings = []
+        self._buttons = 0
+        self._queue = [None] * queue_size
+        self._count = 0
+
+        # Statistics
+        self.submitted = 0
+        self.dispatched = 0
+        self.merged = 0         # duplicates folded into a command already waiting
+        self.dropped = 0        # overflow of a full queue
+        self.held = 0           # polls where ``ready`` said to wait
+        self.queue_peak = 0
+        self.latency_last = 0   # milliseconds from submit to the handler running
+        self.latency_max = 0
+        self.latency_total = 0
+
+    def bind(self, command, handler=None, *, min_interval=None, coalesce=True):
+        """Set how ``command`` is handled.
+
+        :param handler: Function called as ``handler(command)``. Defaults to the
+                        dispatcher's default handler.
+        :param min_interval: Seconds between runs of the command. Defaults to the
+                             dispatcher's ``min_interval``.
+        :param coalesce: Merge the command into a copy that is already waiting. Defaults to True.
+        """
+        self._bindings[command] = _Binding(
+            command, handler if handler is not None else self._default_handler,
+            self._min_interval if min_interval is None else min_interval, coalesce)
+
+    def _binding(self, command):
+        binding = self._bindings.get(command)
+        if binding is None:
+            self.bind(command)
+            binding = self._bindings[command]
+        return binding
+
+    def compile(self, page_commands, buttons):
+        """Build the (page, button) table.
+
+        :param page_commands: For each page, its command numbers indexed by button id,
+                              e.g. ``[page.commands for page in page_manager.pages]``.
+        :param buttons: Number of button ids per page, i.e. the largest button id + 1,
+                        e.g. ``page_manager.button_ids``.
+        """
+        table = array("H", [_NONE] * (len(page_commands) * buttons))
+        bindings = []
+        index_of = {}
+        for page, commands in enumerate(page_commands):
+            for button_id in range(min(buttons, len(commands))):
+                command = commands[button_id]
+                if command not in index_of:
+                    index_of[command] = len(bindings)
+                    bindings.append(self._binding(command))
+                table[page * buttons + button_id] = index_of[command]
+        if len(bindings) >= _NONE:
+            raise ValueError("Too many commands for the dispatch table")
+        self._table = table
+        self._table_bindings = bindings
+        self._buttons = buttons
+
+    def command_for(self, page, button_id):
+        """Return the command of ``button_id`` on ``page`` or None."""
+        binding = self._lookup(page, button_id)
+        return None if binding is None else binding.command
+
+    def _lookup(self, page, button_id):
+        if not 0 <= button_id < self._buttons:
+            return None
+        index = page * self._buttons + button_id
+        if not 0 <= index < len(self._table):
+            return None
+        index = self._table[index]
+        return None if index == _NONE else self._table_bindings[index]
+
+    def press(self, page, button_id):
+        """Queue the command of ``button_id`` on ``page``.  Returns the command or None."""
+        binding = self._lookup(page, button_id)
+        if binding is None:
+            return None
+        self._submit(binding)
+        return binding.command
+
+    def submit(self, command):
+        """Queue ``command`` directly, e.g. for a long press.  Returns False if it was
+        dropped."""
+        return self._submit(self._binding(command))
+
+    def _submit(self, binding):
+        self.submitted += 1
+        if binding.coalesce and binding.pending:
+            self.merged += 1
+            return True
+        queue = self._queue
+        if self._count == len(queue):
+            self.dropped += 1
+            if self.overflow == DROP_NEWEST:
+                return False
+            queue[0].pending = False
+            self._remove(0)
+        queue[self._count] = binding
+        self._count += 1
+        if self._count > self.queue_peak:
+            self.queue_peak = self._count
+        binding.pending = True
+        binding.queued_at = self._clock()
+        return True
+
+    def _remove(self, index):
+        queue = self._queue
+        count = self._count - 1
+        for i in range(index, count):
+            queue[i] = queue[i + 1]
+        queue[count] = None
+        self._count = count
+
+    @property
+    def queued(self):
+        """Commands waiting to run."""
+        return self._count
+
+    def poll(self, budget=4):
+        """Run up to ``budget`` waiting commands whose rate limit allows.  Returns the
+        number run."""
+        if not self._count:
+            return 0
+        now = self._clock()
+        run = 0
+        index = 0
+        queue = self._queue
+        while (run < budget) and (index < self._count):
+            binding = queue[index]
+            # Only a time within one interval ahead is a limit, so a command last
+            # run days ago can't look rate limited once the ticks have wrapped
+            wait = ticks_diff(binding.next_time, now)
+            if 0 < wait <= binding.min_interval:
+                index += 1      # rate limited; let later commands go first
+                continue
+            if (self._ready is not None) and not self._ready():
+                self.held += 1
+                break
+            self._remove(index)
+            binding.pending = False
+            binding.next_time = ticks_add(now, binding.min_interval)
+            latency = ticks_diff(now, binding.queued_at)
+            self.latency_last = latency
+            self.latency_total += latency
+            if latency > self.latency_max:
+                self.latency_max = latency
+            self.dispatched += 1
+            run += 1
+            binding.handler(binding.command)
+        return run
+
+    def clear(self):
+        """Drop every waiting command."""
+        while self._count:
+            self._queue[0].pending = False
+            self._remove(0)
+
+    def reset_stats(self):
+        """Clear the statistics."""
+        self.submitted = 0
+        self.dispatched = 0
+        self.merged = 0
+        self.dropped = 0
+        self.held = 0
+        self.queue_peak = 0
+        self.latency_last = 0
+        self.latency_max = 0
+        self.latency_total = 0
+
+    def report(self):
+        """Print the statistics."""
+        print("dispatch: submitted {} run {} merged {} dropped {} held {} peak {} "
+              "latency {}/{} ms".format(self.submitted, self.dispatched, self.merged,
+                                             self.dropped, self.held, self.queue_peak,
+                                             self.latency_last, self.latency_max))
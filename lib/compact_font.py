@@ -0,0 +1,108 @@
+"""
+`compact_font`
+================================================================================
+Loader for the compact binary fonts written by ``tools/compile_font.py``.
+
+The whole file is read in one go and glyphs are looked up in the packed table
+with a binary search, so only the glyphs that are actually drawn get a
+``displayio.Bitmap``.  The returned font can be passed anywhere a font from
+``adafruit_bitmap_font.bitmap_font.load_font()`` is expected, e.g. as the
+``label_font`` of a PaddedButton.
+
+File layout (little endian)::
+
+    header  "<4sBBbbH"   magic, bbox width, bbox height, bbox x, bbox y, glyph count
+    table   "<HBBbbbbH"  per glyph, sorted by code point: code point, width,
+                         height, dx, dy, shift_x, shift_y, offset into the bitmap data
+    data                 1 bit per pixel rows, MSB first, each row padded to a byte
+
+* Author: Jason Pecor
+
+"""
+
+import struct
+import displayio
+from fontio import Glyph
+
+MAGIC = b"CFNT"
+HEADER = "<4sBBbbH"
+ENTRY = "<HBBbbbbH"
+HEADER_SIZE = struct.calcsize(HEADER)
+ENTRY_SIZE = struct.calcsize(ENTRY)
+
+
+class CompactFont():
+    """A font backed by a compact binary glyph table.
+
+    :param data: The contents of a compact font file.
+
+    """
+
+    def __init__(self, data):
+        magic, width, height, x, y, count = struct.unpack_from(HEADER, data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a compact font file")
+        self._data = data
+        self._bbox = (width, height, x, y)
+        self._count = count
+        self._bitmap_base = HEADER_SIZE + count * ENTRY_SIZE
+        self._glyphs = {}
+
+    def get_bounding_box(self):
+        """The font bounding box as (width, height, x offset, y offset)."""
+        return self._bbox
+
+    def load_glyphs(self, code_points):
+        """Build the glyphs for ``code_points`` (a string or iterable of ints) ahead of time."""
+        for code_point in code_points:
+            if isinstance(code_point, str):
+                code_point = ord(code_point)
+            self.get_glyph(code_point)
+
+    def _find(self, code_point):
+        # Binary search of the sorted glyph table
+        data = self._data
+        low = 0
+        high = self._count - 1
+        while low <= high:
+            mid = (low + high) // 2
+            code = data[HEADER_SIZE + mid * ENTRY_SIZE] | \
+                (data[HEADER_SIZE + mid * ENTRY_SIZE + 1] << 8)
+            if code == code_point:
+                return HEADER_SIZE + mid * ENTRY_SIZE
+            if code < code_point:
+                low = mid + 1
+            else:
+                high = mid - 1
+        return -1
+
+    def get_glyph(self, code_point):
+        """Return the Glyph for ``code_point`` or None if it was not compiled in."""
+        glyph = self._glyphs.get(code_point)
+        if glyph is not None:
+            return glyph
+        entry = self._find(code_point)
+        if entry < 0:
+            return None
+
+        _, width, height, dx, dy, shift_x, shift_y, offset = \
+            struct.unpack_from(ENTRY, self._data, entry)
+        bitmap = displayio.Bitmap(width, height, 2)
+        stride = (width + 7) // 8
+        start = self._bitmap_base + offset
+        for y in range(height):
+            row = start + y * stride
+            for x in range(width):
+                if self._data[row + (x >> 3)] & (0x80 >> (x & 7)):
+                    bitmap[x, y] = 1
+
+        glyph = Glyph(bitmap, 0, width, height, dx, dy, shift_x, shift_y)
+        self._glyphs[code_point] = glyph
+        return glyph
+
+
+def load_font(filename):
+    """Load a compact font file with a single read."""
+    with open(filename, "rb") as font_file:
+        data = font_file.read()
+    return CompactFont(data)
@@ -0,0 +1,113 @@
+"""
+`dirty_rects`
+================================================================================
+Bookkeeping for the screen areas the next refresh has to push.
+
+displayio only sends the areas of objects that changed, and it sends each
+changed object's area on its own, so overlapping changes are pushed once per
+object.  DirtyRects records the same thing: code that changes the screen
+adds the area of each object it touches, and ``pixels`` is then what the
+refresh will push over SPI.  Changing fewer, smaller objects is the only way
+to push fewer pixels, so this is what page transitions are measured with.
+
+* Author: Jason Pecor
+
+"""
+
+from array import array
+
+
+def box_of(item, x=0, y=0):
+    """Screen area of a displayio Label, TileGrid or Group as (x, y, width, height), or
+    None if it can't be worked out.  ``x`` and ``y`` are the position of its parent."""
+    x += item.x
+    y += item.y
+    bounding_box = getattr(item, "bounding_box", None)
+    if bounding_box is not None:
+        return (x + bounding_box[0], y + bounding_box[1], bounding_box[2], bounding_box[3])
+    bitmap = getattr(item, "bitmap", None)
+    if bitmap is not None:
+        return (x, y, bitmap.width, bitmap.height)
+    try:
+        children = iter(item)
+    except TypeError:
+        return None
+    left = top = right = bottom = None
+    for child in children:
+        box = box_of(child, x, y)
+        if box is None:
+            return None
+        if left is None:
+            left, top, right, bottom = box[0], box[1], box[0] + box[2], box[1] + box[3]
+            continue
+        left = min(left, box[0])
+        top = min(top, box[1])
+        right = max(right, box[0] + box[2])
+        bottom = max(bottom, box[1] + box[3])
+    if left is None:
+        return (x, y, 0, 0)
+    return (left, top, right - left, bottom - top)
+
+
+class DirtyRects():
+    """Areas of the screen changed since the last refresh.
+
+    :param width: Screen width in pixels. Defaults to 320.
+    :param height: Screen height in pixels. Defaults to 240.
+    :param capacity: Rectangles kept for inspection; more are still counted in
+                     ``pixels``. Defaults to 16.
+
+    """
+
+    def __init__(self, *, width=320, height=240, capacity=16):
+        self.width = width
+        self.height = height
+        self._rects = array("h", [0] * (4 * capacity))
+        self._capacity = capacity
+        self._count = 0
+        self.pixels = 0
+
+    def __len__(self):
+        return min(self._count, self._capacity)
+
+    def rect(self, index):
+        """The ``index`` th rectangle added as (x, y, width, height)."""
+        base = 4 * index
+        rects = self._rects
+        return (rects[base], rects[base + 1], rects[base + 2], rects[base + 3])
+
+    def add(self, x, y, width, height):
+        """Record that the area at (x, y) of size width by height will be pushed."""
+        if x < 0:
+            width += x
+            x = 0
+        if y < 0:
+            height += y
+            y = 0
+        if x + width > self.width:
+            width = self.width - x
+        if y + height > self.height:
+            height = self.height - y
+        if (width <= 0) or (height <= 0):
+            return
+        if self._count < self._capacity:
+            base = 4 * self._count
+            rects = self._rects
+            rects[base] = x
+            rects[base + 1] = y
+            rects[base + 2] = width
+            rects[base + 3] = height
+        self._count += 1
+        self.pixels += width * height
+
+    def add_box(self, box):
+        """Record an (x, y, width, height) box, e.g. from ``box_of()``.  None means the
+        area is unknown and the whole screen is counted."""
+        if box is None:
+            box = (0, 0, self.width, self.height)
+        self.add(box[0], box[1], box[2], box[3])
+
+    def clear(self):
+        """Forget everything, e.g. after a refresh."""
+        self._count = 0
+        self.pixels = 0
@@ -0,0 +1,139 @@
+"""
+`gestures`
+================================================================================
+Swipe recognition from a stream of touch samples.
+
+Each sample of a stroke is smoothed and written into preallocated arrays
+used as a ring buffer, so adding a sample costs the same small, fixed
+amount of work and never allocates.  Velocity is taken across the samples
+held in the ring, i.e. over the last few polls, which means a quick flick
+counts as a swipe but a slow drag that stops does not.
+
+* Author: Jason Pecor
+
+"""
+
+from array import array
+from micropython import const
+from ticks import ticks_ms, ticks_diff
+
+# Gestures returned by SwipeDetector.end()
+NONE = const(0)
+SWIPE_LEFT = const(1)     # finger moved right to left: show the next page
+SWIPE_RIGHT = const(2)    # finger moved left to right: show the previous page
+
+
+class SwipeDetector():
+    # pylint: disable=too-many-instance-attributes
+    """Recognizes horizontal swipes.
+
+    :param size: Samples kept for the velocity estimate. Defaults to 8.
+    :param smoothing: Noise filter strength; each sample moves the filtered point
+                      ``1 / 2 ** smoothing`` of the way towards it. 0 turns filtering off.
+                      Defaults to 1.
+    :param min_distance: Pixels the stroke must travel sideways. Defaults to 60.
+    :param min_speed: Pixels per second the stroke must be moving sideways when it ends.
+                      Defaults to 200.
+    :param max_slope: Largest vertical to horizontal travel ratio. Defaults to 0.5.
+    :param clock: Function returning the current time in milliseconds. Defaults to
+                  ``supervisor.ticks_ms``.
+
+    """
+
+    def __init__(self, *, size=8, smoothing=1, min_distance=60, min_speed=200,
+                 max_slope=0.5, clock=ticks_ms):
+        self.min_distance = min_distance
+        self.min_speed = min_speed
+        self.max_slope = max_slope
+        self._smoothing = smoothing
+        self._clock = clock
+
+        # Ring buffer of filtered samples; times are relative to the stroke start
+        self._x = array("h", [0] * size)
+        self._y = array("h", [0] * size)
+        self._z = array("H", [0] * size)
+        self._t = array("f", [0] * size)
+        self._size = size
+        self._head = 0      # index of the newest sample
+        self._count = 0
+        self._start_time = 0
+        self._start_x = 0
+        self._start_y = 0
+        self._filtered_x = 0
+        self._filtered_y = 0
+        self.active = False
+
+        # Statistics
+        self.samples = 0
+        self.strokes = 0
+        self.swipes = 0
+
+    def begin(self, point):
+        """Start a stroke at ``point``, an (x, y, z) touch point."""
+        self._start_time = self._clock()
+        self._start_x = self._filtered_x = point[0]
+        self._start_y = self._filtered_y = point[1]
+        self._head = self._size - 1
+        self._count = 0
+        self.active = True
+        self.strokes += 1
+        self.add(point)
+
+    def add(self, point):
+        """Add a sample to the current stroke."""
+        if not self.active:
+            return
+        shift = self._smoothing
+        self._filtered_x += (point[0] - self._filtered_x) >> shift
+        self._filtered_y += (point[1] - self._filtered_y) >> shift
+
+        head = self._head + 1
+        if head == self._size:
+            head = 0
+        self._head = head
+        self._x[head] = self._filtered_x
+        self._y[head] = self._filtered_y
+        self._z[head] = point[2] if len(point) > 2 else 0
+        self._t[head] = ticks_diff(self._clock(), self._start_time) / 1000
+        if self._count < self._size:
+            self._count += 1
+        self.samples += 1
+
+    def _oldest(self):
+        index = self._head - self._count + 1
+        return index + self._size if index < 0 else index
+
+    @property
+    def velocity(self):
+        """Horizontal speed in pixels per second across the buffered samples."""
+        if self._count < 2:
+            return 0
+        oldest = self._oldest()
+        elapsed = self._t[self._head] - self._t[oldest]
+        if elapsed <= 0:
+            return 0
+        return (self._x[self._head] - self._x[oldest]) / elapsed
+
+    @property
+    def distance(self):
+        """Filtered (dx, dy) travel since the stroke started."""
+        return (self._filtered_x - self._start_x, self._filtered_y - self._start_y)
+
+    def cancel(self):
+        """Drop the current stroke without recognizing it."""
+        self.active = False
+
+    def end(self):
+        """Finish the stroke and return NONE, SWIPE_LEFT or SWIPE_RIGHT."""
+        if not self.active:
+            return NONE
+        self.active = False
+        dx = self._filtered_x - self._start_x
+        dy = self._filtered_y - self._start_y
+        if abs(dx) < self.min_distance or abs(dy) > abs(dx) * self.max_slope:
+            return NONE
+        velocity = self.velocity
+        if abs(velocity) < self.min_speed or (velocity < 0) != (dx < 0):
+            return NONE
+        self.swipes += 1
+        return SWIPE_LEFT if dx < 0 else SWIPE_RIGHT
@@ -0,0 +1,173 @@
+"""
+`hid_macros`
+================================================================================
+Key macros compiled once into raw HID keyboard reports and played out a report
+at a time from the main loop.
+
+A macro is a string of text, a single keycode, a tuple of keycodes pressed
+together, or a list of any of those.  Each step becomes a press report and a
+release report in one preallocated bytearray, so a button press only queues
+the macro and nothing is translated while it plays.  Reports are paced in
+``ticks_ms`` milliseconds, so the spacing holds however long the board has
+been up.
+
+* Author: Jason Pecor
+
+"""
+
+from micropython import const
+from ticks import ticks_ms, ticks_add, ticks_diff
+
+_REPORT_SIZE = const(8)
+_MODIFIER_FIRST = const(0xE0)
+_MODIFIER_LAST = const(0xE7)
+
+
+def find_keyboard_device(devices):
+    """Return the boot keyboard from ``usb_hid.devices``."""
+    for device in devices:
+        if device.usage_page == 0x01 and device.usage == 0x06:
+            return device
+    raise ValueError("No keyboard HID device")
+
+
+class MacroPlayer():
+    # pylint: disable=too-many-instance-attributes
+    """Compiles key macros and plays them without blocking.
+
+    :param device: The keyboard HID device; anything with ``send_report(report)``.
+    :param layout: Keyboard layout used to compile text, e.g. KeyboardLayoutUS.
+    :param interval: Seconds between reports. Defaults to 0.01.
+    :param queue_size: Most macros waiting to play. Defaults to 8.
+    :param clock: Function returning the current time in milliseconds. Defaults to
+                  ``supervisor.ticks_ms``.
+
+    """
+
+    def __init__(self, device, *, layout=None, interval=0.01, queue_size=8,
+                 clock=ticks_ms):
+        self._device = device
+        self._layout = layout
+        self.interval = interval
+        self._clock = clock
+        self._macros = {}
+
+        # Pending macros, preallocated as a ring
+        self._queue = [None] * queue_size
+        self._queue_head = 0
+        self._queue_count = 0
+
+        self._playing = None
+        self._position = 0
+        self._next_time = clock()
+        self._report = bytearray(_REPORT_SIZE)
+
+        # Statistics
+        self.reports_sent = 0
+        self.macros_played = 0
+        self.macros_dropped = 0
+        self.poll_time_last = 0     # milliseconds
+        self.poll_time_max = 0
+
+    @property
+    def interval(self):
+        """Seconds between reports."""
+        return self._interval
+
+    @interval.setter
+    def interval(self, value):
+        self._interval = value
+        self._interval_ms = int(value * 1000 + 0.5)
+
+    def _steps(self, spec):
+        # Yield the keycode chords for a macro spec
+        if isinstance(spec, str):
+            for char in spec:
+                yield self._layout.keycodes(char)
+        elif isinstance(spec, int):
+            yield (spec,)
+        elif isinstance(spec, tuple):
+            yield spec
+        else:
+            for item in spec:
+                for step in self._steps(item):
+                    yield step
+
+    def compile(self, spec):
+        """Return the press/release report sequence for ``spec`` as a memoryview."""
+        if isinstance(spec, str) and self._layout is None:
+            raise ValueError("A keyboard layout is needed for text macros")
+        steps = list(self._steps(spec))
+        reports = bytearray(2 * _REPORT_SIZE * len(steps))   # releases stay all zero
+        for index, keycodes in enumerate(steps):
+            offset = 2 * _REPORT_SIZE * index
+            slot = 2
+            for keycode in keycodes:
+                if _MODIFIER_FIRST <= keycode <= _MODIFIER_LAST:
+                    reports[offset] |= 1 << (keycode - _MODIFIER_FIRST)
+                elif slot < _REPORT_SIZE:
+                    reports[offset + slot] = keycode
+                    slot += 1
+                else:
+                    raise ValueError("More than 6 keys pressed at once")
+        return memoryview(reports)
+
+    def bind(self, command, spec):
+        """Compile ``spec`` and bind it to ``command``."""
+        self._macros[command] = self.compile(spec)
+
+    def bound(self, command):
+        """True if ``command`` has a macro."""
+        return command in self._macros
+
+    @property
+    def busy(self):
+        """True while a macro is playing or queued."""
+        return (self._playing is not None) or (self._queue_count > 0)
+
+    def play(self, command):
+        """Queue the macro bound to ``command``.  Returns False if there is none or the
+        queue is full."""
+        macro = self._macros.get(command)
+        if macro is None:
+            return False
+        if self._queue_count == len(self._queue):
+            self.macros_dropped += 1
+            return False
+        self._queue[(self._queue_head + self._queue_count) % len(self._queue)] = macro
+        self._queue_count += 1
+        return True
+
+    def poll(self):
+        """Send the next report if one is due.  Call every pass of the main loop."""
+        start = self._clock()
+        if ticks_diff(self._next_time, start) > 0:
+            return
+        if self._playing is None:
+            if not self._queue_count:
+                return
+            self._playing = self._queue[self._queue_head]
+            self._queue[self._queue_head] = None
+            self._queue_head = (self._queue_head + 1) % len(self._queue)
+            self._queue_count -= 1
+            self._position = 0
+
+        # Copy into the preallocated report rather than slicing, to avoid allocating
+        position = self._position
+        playing = self._playing
+        report = self._report
+        for i in range(_REPORT_SIZE):
+            report[i] = playing[position + i]
+        self._device.send_report(report)
+        self.reports_sent += 1
+        position += _REPORT_SIZE
+        if position >= len(self._playing):
+            self._playing = None
+            self.macros_played += 1
+        self._position = position
+
+        end = self._clock()
+        self._next_time = ticks_add(end, self._interval_ms)
+        self.poll_time_last = ticks_diff(end, start)
+        if self.poll_time_last > self.poll_time_max:
+            self.poll_time_max = self.poll_time_last
@@ -0,0 +1,106 @@
+"""
+`hit_grid`
+================================================================================
+Coarse cell lookup table for mapping a touch point to a PaddedButton without
+scanning every button on the screen.
+
+The screen is divided into square cells.  Each cell holds the (usually one)
+buttons whose padded touch area overlaps it, so a lookup is a single index
+calculation plus a contains() check on a handful of candidates.
+
+* Author: Jason Pecor
+
+"""
+
+_EMPTY = ()
+
+
+class HitGrid():
+    """Spatial hit-test index for a set of buttons.
+
+    :param buttons: Buttons to index.  Anything with ``bounds`` and ``contains()``.
+    :param width: Width of the touch area in pixels. Defaults to 320.
+    :param height: Height of the touch area in pixels. Defaults to 240.
+    :param cell_size: Cell edge length in pixels. Defaults to 16.
+
+    """
+
+    def __init__(self, buttons=(), *, width=320, height=240, cell_size=16):
+        self._width = width
+        self._height = height
+        self._cell_size = cell_size
+        self._cols = (width + cell_size - 1) // cell_size
+        self._rows = (height + cell_size - 1) // cell_size
+        self._cells = [_EMPTY] * (self._cols * self._rows)
+        self._buttons = []
+        self._dirty = True
+        self.rebuilds = 0
+        for button in buttons:
+            self.add(button)
+
+    def add(self, button):
+        """Add a button to the index."""
+        self._buttons.append(button)
+        button._hit_index = self    # pylint: disable=protected-access
+        self._dirty = True
+
+    def remove(self, button):
+        """Remove a button from the index."""
+        self._buttons.remove(button)
+        button._hit_index = None    # pylint: disable=protected-access
+        self._dirty = True
+
+    def clear(self):
+        """Remove every button from the index."""
+        for button in self._buttons:
+            button._hit_index = None    # pylint: disable=protected-access
+        self._buttons = []
+        self._dirty = True
+
+    @property
+    def buttons(self):
+        """The indexed buttons, in the order they were added."""
+        return self._buttons
+
+    def invalidate(self):
+        """Mark the table stale.  Called by buttons when their geometry changes."""
+        self._dirty = True
+
+    def rebuild(self):
+        """Recompute the cell table from the buttons' padded bounds."""
+        cells = [_EMPTY] * (self._cols * self._rows)
+        size = self._cell_size
+        max_col = self._cols - 1
+        max_row = self._rows - 1
+        for button in self._buttons:
+            x_min, y_min, x_max, y_max = button.bounds
+            if x_max < 0 or y_max < 0 or x_min >= self._width or y_min >= self._height:
+                continue
+            col0 = max(0, x_min // size)
+            col1 = min(max_col, x_max // size)
+            row0 = max(0, y_min // size)
+            row1 = min(max_row, y_max // size)
+            for row in range(row0, row1 + 1):
+                base = row * self._cols
+                for col in range(col0, col1 + 1):
+                    cells[base + col] = cells[base + col] + (button,)
+        self._cells = cells
+        self._dirty = False
+        self.rebuilds += 1
+
+    def hit(self, point):
+        """Return the first button containing ``point`` or None.
+
+        :param point: A touch point; ``point[0]`` is x and ``point[1]`` is y.
+        """
+        if self._dirty:
+            self.rebuild()
+        x = point[0]
+        y = point[1]
+        if x < 0 or y < 0 or x >= self._width or y >= self._height:
+            return None
+        size = self._cell_size
+        for button in self._cells[(y // size) * self._cols + (x // size)]:
+            if button.contains(point):
+                return button
+        return None
@@ -0,0 +1,130 @@
+"""
+`hold_repeat`
+================================================================================
+Long-press and auto-repeat actions for buttons, e.g. jog and increment
+controls.
+
+Each configured button gets two Timers in a shared TimerWheel: one for its
+long-press action and one for its repeats.  Pressing a button schedules
+them and releasing it cancels them, so nothing is polled per button and
+holding many buttons costs no more per tick than the timers actually due.
+Repeats are scheduled from when the previous one was due rather than when
+it ran, so a late tick doesn't make the rate drift.  Hold times are kept in
+``ticks_ms`` milliseconds like the TimerWheel.
+
+* Author: Jason Pecor
+
+"""
+
+from ticks import ticks_add, ticks_diff
+from timer_wheel import Timer
+
+
+def _millis(seconds):
+    return None if seconds is None else max(1, int(seconds * 1000 + 0.5))
+
+
+class _Actions():
+    # pylint: disable=too-many-instance-attributes, too-many-arguments, too-few-public-methods
+    # Hold settings and timers for one button; times are in milliseconds
+    def __init__(self, button, long_press, long_press_command, repeat_delay,
+                 repeat_interval, on_long_press, on_repeat):
+        self.button = button
+        self.long_press = long_press
+        self.long_press_command = long_press_command
+        self.repeat_delay = repeat_delay
+        self.repeat_interval = repeat_interval
+        self.command = None
+        self.press_time = 0
+        self.long_press_timer = Timer(on_long_press, self)
+        self.repeat_timer = Timer(on_repeat, self)
+
+
+class HoldRepeat():
+    """Long-press and auto-repeat for buttons.
+
+    :param wheel: The TimerWheel driving the timeouts.
+    :param on_command: Function called as ``on_command(button, command)`` for each long
+                       press and repeat.
+
+    """
+
+    def __init__(self, wheel, on_command):
+        self._wheel = wheel
+        self._on_command = on_command
+        self._actions = {}
+        self._held = []
+
+        # Statistics
+        self.long_presses = 0
+        self.repeats = 0
+
+    def configure(self, button, *, long_press=None, long_press_command=None,
+                  repeat_delay=None, repeat_interval=None):
+        """Set the hold actions of ``button``.
+
+        :param long_press: Seconds the button must be held to send ``long_press_command``.
+        :param long_press_command: Command sent once on a long press.
+        :param repeat_delay: Seconds held before the button's command starts repeating.
+                             Defaults to ``repeat_interval``.
+        :param repeat_interval: Seconds between repeats.  None turns repeat off.
+        """
+        if (long_press is None) and (repeat_interval is None):
+            self._actions.pop(button, None)
+            return
+        if repeat_delay is None:
+            repeat_delay = repeat_interval
+        self._actions[button] = _Actions(button, _millis(long_press), long_press_command,
+                                         _millis(repeat_delay), _millis(repeat_interval),
+                                         self._on_long_press, self._on_repeat)
+
+    def press(self, button, command):
+        """Start timing a press of ``button``, which sent ``command``."""
+        actions = self._actions.get(button)
+        if actions is None:
+            return
+        wheel = self._wheel
+        actions.command = command
+        actions.press_time = wheel.clock()
+        if actions.long_press is not None:
+            wheel.schedule_at(actions.long_press_timer,
+                              ticks_add(actions.press_time, actions.long_press))
+        if (actions.repeat_interval is not None) and (command is not None):
+            wheel.schedule_at(actions.repeat_timer,
+                              ticks_add(actions.press_time, actions.repeat_delay))
+        if actions not in self._held:
+            self._held.append(actions)
+
+    def release(self):
+        """Cancel the hold actions of every pressed button."""
+        held = self._held
+        while held:
+            actions = held.pop()
+            self._wheel.cancel(actions.long_press_timer)
+            self._wheel.cancel(actions.repeat_timer)
+
+    def held_for(self, button):
+        """Seconds ``button`` has been held, or 0 if it isn't."""
+        for actions in self._held:
+            if actions.button is button:
+                return ticks_diff(self._wheel.clock(), actions.press_time) / 1000
+        return 0
+
+    def _on_long_press(self, timer):
+        actions = timer.arg
+        self.long_presses += 1
+        if actions.long_press_command is not None:
+            self._on_command(actions.button, actions.long_press_command)
+
+    def _on_repeat(self, timer):
+        actions = timer.arg
+        self.repeats += 1
+        self._on_command(actions.button, actions.command)
+        # Step from the due time so the rate holds even when a tick runs late;
+        # if whole intervals were missed, skip them rather than firing a burst
+        interval = actions.repeat_interval
+        due = ticks_add(timer.due, interval)
+        now = self._wheel.clock()
+        while ticks_diff(due, now) <= 0:
+            due = ticks_add(due, interval)
+        self._wheel.schedule_at(timer, due)
@@ -0,0 +1,168 @@
+"""
+`instrumentation`
+================================================================================
+Optional timing hooks for finding where time goes between a finger landing
+and the screen changing.
+
+Timings are recorded into fixed-size histograms with power-of-two buckets, so
+recording never allocates.  The PaddedButton hooks are installed by swapping
+the class's methods for timed wrappers in ``enable()`` and put back by
+``disable()``; while disabled nothing extra runs at all.
+
+The hooked methods take microseconds, far less than one ``ticks_ms`` tick, so
+the hooks are timed in microseconds with ``ticks_us``.  That reads a long int
+and allocates on the microcontroller, which is accepted because it only
+happens while the hooks are enabled.  The other histograms stay in ms.
+
+* Author: Jason Pecor
+
+"""
+
+from ticks import ticks_ms, ticks_us, ticks_diff
+from uart_link import FRAME_STATS
+
+
+class Histogram():
+    """Counts of timings in power-of-two buckets.  Bucket 0 holds 0, bucket ``n`` holds
+    values from ``2 ** (n - 1)`` up to ``2 ** n - 1`` and the last bucket holds the rest.
+
+    :param name: Name used when dumping.
+    :param timer: Function returning the current time in ``ticks_ms`` style ints.
+    :param bins: Number of buckets. Defaults to 16.
+
+    """
+
+    def __init__(self, name, timer, bins=16):
+        self.name = name
+        self._timer = timer
+        self.counts = [0] * bins
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._start = 0
+
+    def record(self, value):
+        """Add a timing."""
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        bucket = 0
+        last = len(self.counts) - 1
+        while value > 0 and bucket < last:
+            value >>= 1
+            bucket += 1
+        self.counts[bucket] += 1
+
+    def start(self):
+        """Start timing."""
+        self._start = self._timer()
+
+    def stop(self):
+        """Record the time since ``start()``."""
+        self.record(ticks_diff(self._timer(), self._start))
+
+    def reset(self):
+        """Clear all counts."""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def __str__(self):
+        last = len(self.counts)
+        while last > 0 and not self.counts[last - 1]:
+            last -= 1
+        return "{} n={} total={} max={} [{}]".format(
+            self.name, self.count, self.total, self.max,
+            ",".join(str(c) for c in self.counts[:last]))
+
+    def encode(self):
+        """Return the histogram as bytes: the name, a zero byte, then each count as a
+        2 byte little endian value saturated at 65535."""
+        data = bytearray(self.name, "utf-8")
+        data.append(0)
+        for count in self.counts:
+            count = min(count, 0xFFFF)
+            data.append(count & 0xFF)
+            data.append(count >> 8)
+        return data
+
+
+class Instrumentation():
+    """A set of named histograms plus hooks into PaddedButton.
+
+    :param timer: Function returning the current time as an int that wraps like
+                  ``supervisor.ticks_ms``.  Small ints don't allocate, unlike
+                  ``time.monotonic_ns()`` on the microcontroller.  Defaults to
+                  ``supervisor.ticks_ms``.
+    :param hook_timer: Function timing the PaddedButton hooks, wrapping the same way.
+                       Defaults to ``ticks_us``.
+    :param bins: Buckets per histogram. Defaults to 16.
+
+    """
+
+    def __init__(self, *, timer=None, hook_timer=None, bins=16):
+        self.timer = timer if timer is not None else ticks_ms
+        self.hook_timer = hook_timer if hook_timer is not None else ticks_us
+        self._bins = bins
+        self.histograms = {}
+        self._patched = {}
+        self._button_class = None
+
+    def histogram(self, name):
+        """Return the histogram called ``name``, creating it on first use."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = Histogram(name, self.timer, self._bins)
+            self.histograms[name] = histogram
+        return histogram
+
+    @property
+    def enabled(self):
+        """True while the PaddedButton hooks are installed."""
+        return bool(self._patched)
+
+    def enable(self, button_class):
+        """Time ``contains()``, the ``selected`` setter and the ``label`` setter of
+        ``button_class``, e.g. PaddedButton, in microseconds."""
+        if self._patched:
+            return
+        self._button_class = button_class
+        for method, name in (("contains", "contains"), ("_set_selected", "selected"),
+                             ("_set_label", "label")):
+            original = getattr(button_class, method)
+            self._patched[method] = original
+            setattr(button_class, method, self._timed(original, self.histogram(name)))
+
+    def _timed(self, method, histogram):
+        timer = self.hook_timer
+
+        def timed(button, value):
+            start = timer()
+            result = method(button, value)
+            histogram.record(ticks_diff(timer(), start))
+            return result
+        return timed
+
+    def disable(self):
+        """Put the original PaddedButton methods back."""
+        for name, original in self._patched.items():
+            setattr(self._button_class, name, original)
+        self._patched = {}
+
+    def reset(self):
+        """Clear every histogram."""
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def dump(self):
+        """Print every histogram over the serial console."""
+        for histogram in self.histograms.values():
+            print(histogram)
+
+    def send(self, link):
+        """Send every histogram over a CommandLink as FRAME_STATS frames."""
+        for histogram in self.histograms.values():
+            link.send_frame(FRAME_STATS, histogram.encode())
@@ -0,0 +1,414 @@
+"""
+`layout`
+================================================================================
+Loads the UI layout (button styles, the page area, the tab strip, the pages,
+the command buttons and the command key bindings) from a JSON file.
+
+The first boot validates the JSON and compiles it into a compact binary
+cache next to it.  Later boots check the JSON file's size and modification
+time against the ones recorded in the cache and, while they match, read the
+cache in one go and unpack its fixed-size records, skipping JSON parsing and
+validation altogether.  Editing the JSON changes its size or time, so the
+cache is rebuilt on the next boot.  A cache that doesn't add up (cut short
+by a reset while it was written, say) is ignored and rebuilt the same way;
+it is written to a temporary file and renamed into place so a reset never
+leaves a partly written cache behind.  If the filesystem is read-only to code
+(the CircuitPython default unless ``boot.py`` remounts it) the layout is
+simply compiled in memory on every boot.
+
+JSON layout::
+
+    colors    {name: "#RRGGBB"} usable anywhere a color is expected
+    styles    [{name, shape, fill_color, outline_color, label_color, label_x, label_y,
+                selected_fill, selected_outline, selected_label, margin, padding}]
+    area      {x, y, width, height} of the page background
+    tabs      {x, y, width, height, tab_width, style}
+    pages     [{name, color}]
+    buttons   [{id, x, y, width, height, label, style, label_max, long_press,
+                long_press_command, repeat_delay, repeat_interval}]
+    bindings  [{command, keys: [Keycode names]} or {command, text}]
+
+Binary layout (little endian)::
+
+    header    "<4sBxIIHHHHH"     magic, version, source size, source time, style, page,
+                                 button and binding counts, string table size
+    tabs      "<hhhhhB"          x, y, width, height, tab width, style index
+    area      "<hhhh"            x, y, width, height
+    styles    "<HBiiiiiihhhhhh"  per style: name, shape, fill, outline, label, selected
+                                 fill, outline and label colors, label x, label y,
+                                 margin x, y, padding x, y
+    pages     "<Hi"              per page: name, color
+    buttons   "<BhhhhHBBHHHH"    per button: id, x, y, width, height, label, style index,
+                                 label max, long press ms, long press command, repeat
+                                 delay ms, repeat interval ms
+    bindings  "<HBH"             per binding: command, kind, keys or text
+    strings                      length byte then UTF-8, referred to by offset
+
+Colors are stored as ints with -1 for None; unused hold times and the unused
+long press command are stored as 0 and 0xFFFF.  Binding keys are stored as the
+Keycode names separated by spaces.
+
+* Author: Jason Pecor
+
+"""
+
+import os
+import struct
+
+MAGIC = b"CLAY"
+VERSION = 2
+HEADER = "<4sBxIIHHHHH"
+TABS = "<hhhhhB"
+AREA = "<hhhh"
+STYLE = "<HBiiiiiihhhhhh"
+PAGE = "<Hi"
+BUTTON = "<BhhhhHBBHHHH"
+BINDING = "<HBH"
+
+# Binding kinds
+KEYS = 0
+TEXT = 1
+
+# PaddedButton shape constants by name
+_SHAPES = {"rect": 0, "roundrect": 1, "shadowrect": 2, "shadowroundrect": 3}
+
+_STYLE_COLORS = ("fill_color", "outline_color", "label_color",
+                 "selected_fill", "selected_outline", "selected_label")
+# Defaults match ButtonStyle; None selected colors invert the normal ones
+_STYLE_DEFAULTS = {"fill_color": 0xFFFFFF, "outline_color": 0x0, "label_color": 0x0,
+                   "selected_fill": None, "selected_outline": None, "selected_label": None}
+
+
+class Layout():
+    # pylint: disable=too-few-public-methods
+    """A loaded layout.
+
+    :ivar styles: ``{name: ButtonStyle keyword arguments}``; add ``label_font`` to use them.
+    :ivar area: (x, y, width, height) of the page background.
+    :ivar tabs: Tab strip keyword arguments plus ``style``, the name of the tab style.
+    :ivar pages: List of (name, color).
+    :ivar buttons: List of PaddedButton keyword arguments plus ``style`` and the
+                   HoldRepeat settings ``long_press``, ``long_press_command``,
+                   ``repeat_delay`` and ``repeat_interval``.
+    :ivar bindings: List of (command, kind, value) where value is a tuple of Keycode
+                    names for KEYS or a string for TEXT.
+    :ivar from_cache: True if the layout was read from the binary cache.
+
+    """
+
+    def __init__(self):
+        self.styles = {}
+        self.area = None
+        self.tabs = None
+        self.pages = []
+        self.buttons = []
+        self.bindings = []
+        self.from_cache = False
+
+
+def _source_stamp(filename):
+    stat = os.stat(filename)
+    return stat[6], int(stat[8]) & 0xFFFFFFFF
+
+
+def _fail(where, message):
+    raise ValueError("Layout {}: {}".format(where, message))
+
+
+def _check_int(value, key, where, low=-32768, high=32767):
+    if (not isinstance(value, int)) or isinstance(value, bool) or not low <= value <= high:
+        _fail(where, "{} must be an integer from {} to {}".format(key, low, high))
+    return value
+
+
+def _int(config, key, where, low=-32768, high=32767, default=None):
+    return _check_int(config.get(key, default), key, where, low, high)
+
+
+def _color(value, colors, where):
+    if value is None:
+        return -1
+    if isinstance(value, str):
+        value = colors.get(value, value)
+        if isinstance(value, str) and value.startswith("#"):
+            try:
+                value = int(value[1:], 16)
+            except ValueError:
+                pass
+    if (not isinstance(value, int)) or not 0 <= value <= 0xFFFFFF:
+        _fail(where, "bad color {!r}".format(value))
+    return value
+
+
+def _millis(config, key, where):
+    # Optional duration in seconds, stored in milliseconds with 0 for None
+    value = config.get(key)
+    if value is None:
+        return 0
+    if (not isinstance(value, (int, float))) or isinstance(value, bool) or \
+            not 0 < value <= 65.535:
+        _fail(where, "{} must be seconds from 0.001 to 65.535".format(key))
+    return max(1, int(value * 1000 + 0.5))
+
+
+def _pair(config, key, where):
+    value = config.get(key, (0, 0))
+    if (not isinstance(value, (list, tuple))) or len(value) != 2:
+        _fail(where, "{} must be [x, y]".format(key))
+    return (_check_int(value[0], key, where), _check_int(value[1], key, where))
+
+
+class _Strings():
+    # Builds the string table, storing each distinct string once
+    def __init__(self):
+        self.data = bytearray()
+        self._offsets = {}
+
+    def add(self, text):
+        offset = self._offsets.get(text)
+        if offset is None:
+            encoded = text.encode("utf-8")
+            if len(encoded) > 255:
+                raise ValueError("Layout string too long: {!r}".format(text))
+            offset = len(self.data)
+            self.data.append(len(encoded))
+            self.data.extend(encoded)
+            self._offsets[text] = offset
+        return offset
+
+
+def compile_layout(config, source_size=0, source_time=0):
+    """Validate a layout parsed from JSON and return it in the binary format.  Raises
+    ValueError naming the offending entry if the layout is invalid."""
+    # pylint: disable=too-many-locals
+    strings = _Strings()
+    colors = config.get("colors", {})
+    records = bytearray()
+
+    styles = config.get("styles", [])
+    style_index = {}
+    for i, style in enumerate(styles):
+        where = "style {}".format(i)
+        name = style.get("name")
+        if not isinstance(name, str) or name in style_index:
+            _fail(where, "needs a unique name")
+        style_index[name] = i
+
+    def find_style(name, where):
+        if name not in style_index:
+            _fail(where, "unknown style {!r}".format(name))
+        return style_index[name]
+
+    tabs = config.get("tabs")
+    if not isinstance(tabs, dict):
+        _fail("tabs", "missing")
+    records.extend(struct.pack(TABS, _int(tabs, "x", "tabs"), _int(tabs, "y", "tabs"),
+                               _int(tabs, "width", "tabs", 1), _int(tabs, "height", "tabs", 1),
+                               _int(tabs, "tab_width", "tabs", 1),
+                               find_style(tabs.get("style"), "tabs")))
+    area = config.get("area")
+    if not isinstance(area, dict):
+        _fail("area", "missing")
+    records.extend(struct.pack(AREA, _int(area, "x", "area"), _int(area, "y", "area"),
+                               _int(area, "width", "area", 1), _int(area, "height", "area", 1)))
+
+    for style in styles:
+        where = "style {!r}".format(style["name"])
+        shape = style.get("shape", "rect")
+        if shape not in _SHAPES:
+            _fail(where, "unknown shape {!r}".format(shape))
+        values = [strings.add(style["name"]), _SHAPES[shape]]
+        for key in _STYLE_COLORS:
+            values.append(_color(style.get(key, _STYLE_DEFAULTS[key]), colors, where))
+        values.append(_int(style, "label_x", where, default=-1))
+        values.append(_int(style, "label_y", where, default=-1))
+        values.extend(_pair(style, "margin", where))
+        values.extend(_pair(style, "padding", where))
+        records.extend(struct.pack(STYLE, *values))
+
+    pages = config.get("pages", [])
+    if not pages:
+        _fail("pages", "at least one page is needed")
+    for i, page in enumerate(pages):
+        where = "page {}".format(i)
+        name = page.get("name", "Page {}".format(i))
+        records.extend(struct.pack(PAGE, strings.add(name), _color(page.get("color"), colors, where)))
+
+    buttons = config.get("buttons", [])
+    ids = set()
+    for i, button in enumerate(buttons):
+        where = "button {}".format(i)
+        button_id = _int(button, "id", where, 0, 255, default=i)
+        if button_id in ids:
+            _fail(where, "duplicate id {}".format(button_id))
+        ids.add(button_id)
+        label = button.get("label", "")
+        label_max = _int(button, "label_max", where, 0, 255, default=0)
+        if label_max and len(label) > label_max:
+            _fail(where, "label longer than label_max")
+        long_press_command = 0xFFFF
+        if "long_press_command" in button:
+            long_press_command = _int(button, "long_press_command", where, 0, 65534)
+        records.extend(struct.pack(BUTTON, button_id, _int(button, "x", where),
+                                   _int(button, "y", where), _int(button, "width", where, 1),
+                                   _int(button, "height", where, 1), strings.add(label),
+                                   find_style(button.get("style"), where), label_max,
+                                   _millis(button, "long_press", where), long_press_command,
+                                   _millis(button, "repeat_delay", where),
+                                   _millis(button, "repeat_interval", where)))
+
+    bindings = config.get("bindings", [])
+    for i, binding in enumerate(bindings):
+        where = "binding {}".format(i)
+        command = _int(binding, "command", where, 0, 65535)
+        if "text" in binding:
+            records.extend(struct.pack(BINDING, command, TEXT, strings.add(binding["text"])))
+        elif binding.get("keys"):
+            records.extend(struct.pack(BINDING, command, KEYS,
+                                       strings.add(" ".join(binding["keys"]))))
+        else:
+            _fail(where, "needs keys or text")
+
+    if len(strings.data) > 65535:
+        _fail("strings", "too much text")
+    header = struct.pack(HEADER, MAGIC, VERSION, source_size, source_time, len(styles),
+                         len(pages), len(buttons), len(bindings), len(strings.data))
+    return bytes(header + records + strings.data)
+
+
+def _string(data, base, offset):
+    start = base + offset + 1
+    if start > len(data) or start + data[start - 1] > len(data):
+        raise ValueError("Compiled layout string out of range")
+    return str(data[start:start + data[start - 1]], "utf-8")
+
+
+def _style_name(names, index):
+    if index >= len(names):
+        raise ValueError("Compiled layout style out of range")
+    return names[index]
+
+
+def parse_layout(data):
+    """Return the Layout held in compiled layout ``data``.  Raises ValueError (or
+    UnicodeError for bad text) if ``data`` isn't a complete compiled layout."""
+    # pylint: disable=too-many-locals
+    if len(data) < struct.calcsize(HEADER):
+        raise ValueError("Not a compiled layout")
+    (magic, version, _, _, style_count, page_count, button_count,
+     binding_count, strings_size) = struct.unpack_from(HEADER, data, 0)
+    if (magic != MAGIC) or (version != VERSION):
+        raise ValueError("Not a compiled layout")
+    base = (struct.calcsize(HEADER) + struct.calcsize(TABS) + struct.calcsize(AREA) +
+            style_count * struct.calcsize(STYLE) + page_count * struct.calcsize(PAGE) +
+            button_count * struct.calcsize(BUTTON) + binding_count * struct.calcsize(BINDING))
+    if base + strings_size != len(data):
+        raise ValueError("Compiled layout is {} bytes, its header says {}".format(
+            len(data), base + strings_size))
+    layout = Layout()
+    offset = struct.calcsize(HEADER)
+
+    x, y, width, height, tab_width, tab_style = struct.unpack_from(TABS, data, offset)
+    offset += struct.calcsize(TABS)
+    layout.area = struct.unpack_from(AREA, data, offset)
+    offset += struct.calcsize(AREA)
+
+    names = []
+    size = struct.calcsize(STYLE)
+    for _ in range(style_count):
+        (name, shape, fill, outline, label, selected_fill, selected_outline, selected_label,
+         label_x, label_y, margin_x, margin_y, padding_x, padding_y) = \
+            struct.unpack_from(STYLE, data, offset)
+        offset += size
+        name = _string(data, base, name)
+        names.append(name)
+        layout.styles[name] = {
+            "shape": shape,
+            "fill_color": None if fill < 0 else fill,
+            "outline_color": None if outline < 0 else outline,
+            "label_color": None if label < 0 else label,
+            "selected_fill": None if selected_fill < 0 else selected_fill,
+            "selected_outline": None if selected_outline < 0 else selected_outline,
+            "selected_label": None if selected_label < 0 else selected_label,
+            "label_x": label_x, "label_y": label_y,
+            "margin": (margin_x, margin_y), "padding": (padding_x, padding_y)}
+    layout.tabs = {"x": x, "y": y, "width": width, "height": height,
+                   "tab_width": tab_width, "style": _style_name(names, tab_style)}
+
+    size = struct.calcsize(PAGE)
+    for _ in range(page_count):
+        name, color = struct.unpack_from(PAGE, data, offset)
+        offset += size
+        layout.pages.append((_string(data, base, name), None if color < 0 else color))
+
+    size = struct.calcsize(BUTTON)
+    for _ in range(button_count):
+        (button_id, x, y, width, height, label, style, label_max, long_press,
+         long_press_command, repeat_delay, repeat_interval) = \
+            struct.unpack_from(BUTTON, data, offset)
+        offset += size
+        layout.buttons.append({
+            "id": button_id, "x": x, "y": y, "width": width, "height": height,
+            "label": _string(data, base, label), "style": _style_name(names, style),
+            "label_max": label_max or None,
+            "long_press": long_press / 1000 if long_press else None,
+            "long_press_command": None if long_press_command == 0xFFFF else long_press_command,
+            "repeat_delay": repeat_delay / 1000 if repeat_delay else None,
+            "repeat_interval": repeat_interval / 1000 if repeat_interval else None})
+
+    size = struct.calcsize(BINDING)
+    for _ in range(binding_count):
+        command, kind, value = struct.unpack_from(BINDING, data, offset)
+        offset += size
+        value = _string(data, base, value)
+        layout.bindings.append((command, kind, tuple(value.split()) if kind == KEYS else value))
+    return layout
+
+
+def _read_cache(cache, stamp):
+    try:
+        with open(cache, "rb") as file:
+            data = file.read()
+        magic, version, size, mtime = struct.unpack_from(HEADER, data, 0)[:4]
+    except (OSError, ValueError, struct.error):
+        return None
+    if (magic != MAGIC) or (version != VERSION) or ((size, mtime) != stamp):
+        return None
+    return data
+
+
+def _write_cache(cache, data):
+    temp = cache + ".tmp"
+    try:
+        with open(temp, "wb") as file:
+            file.write(data)
+        try:
+            os.remove(cache)    # FAT can't rename over an existing file
+        except OSError:
+            pass
+        os.rename(temp, cache)
+    except OSError:
+        pass    # read-only filesystem; compile again next boot
+
+
+def load_layout(source, cache=None):
+    """Load the layout in JSON file ``source``, through the binary ``cache`` file when it is
+    up to date.  ``cache`` defaults to ``source`` with a ``.bin`` extension."""
+    if cache is None:
+        cache = source.rsplit(".", 1)[0] + ".bin"
+    stamp = _source_stamp(source)
+    data = _read_cache(cache, stamp)
+    if data is not None:
+        try:
+            layout = parse_layout(data)
+            layout.from_cache = True
+            return layout
+        except (ValueError, UnicodeError):
+            pass    # damaged cache; compile it again from the JSON
+
+    import json    # pylint: disable=import-outside-toplevel
+    with open(source) as file:
+        config = json.load(file)
+    data = compile_layout(config, *stamp)
+    _write_cache(cache, data)
+    return parse_layout(data)
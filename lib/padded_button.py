@@ -32,13 +32,36 @@ margin and padding.  For use with the CircuitPython displayio core module.
 from micropython import const
 import displayio
 from adafruit_display_text.label import Label
-from adafruit_display_shapes.rect import Rect
-from adafruit_display_shapes.roundrect import RoundRect
+import shape_pool as _shape_pool
+from dirty_rects import box_of
 
 __version__ = ""
 __repo__ = ""
 
 
+# PaddedButton
+# Cached label text widths, per font, for centering in-place label updates
+_text_widths = {}
+_TEXT_WIDTHS_MAX = 64
+
+
+def _text_width(font, text):
+    widths = _text_widths.get(font)
+    if widths is None:
+        widths = _text_widths[font] = {}
+    width = widths.get(text)
+    if width is None:
+        width = 0
+        for char in text:
+            glyph = font.get_glyph(ord(char))
+            if glyph:
+                width += glyph.shift_x
+        if len(widths) >= _TEXT_WIDTHS_MAX:
+            widths.clear()
+        widths[text] = width
+    return width
+
+
 def _check_color(color):
     # if a tuple is supplied, convert it to a RGB number
     if isinstance(color, tuple):
@@ -47,8 +70,99 @@ def _check_color(color):
     return color
 
 
+# Style fields in the order used for ButtonStyle interning keys
+_STYLE_FIELDS = ("shape", "fill_color", "outline_color", "label_font", "label_color",
+                 "label_x", "label_y", "selected_fill", "selected_outline",
+                 "selected_label", "margin", "padding")
+
+
+class ButtonStyle():
+    # pylint: disable=too-many-instance-attributes
+    """Shared look of a PaddedButton.  Buttons that look the same should share one
+    ButtonStyle rather than each holding their own copies of the colors, font,
+    padding and margin.  Styles are treated as immutable; use derive() to get a
+    variation.
+
+    :param shape: The shape of the button. Can be PaddedButton.RECT, ROUNDRECT, SHADOWRECT,
+                  SHADOWROUNDRECT. Defaults to RECT.
+    :param fill_color: The color to fill the button. Defaults to 0xFFFFFF.
+    :param outline_color: The color of the outline of the button.
+    :param label_font: The button label font.
+    :param label_color: The color of the button label text. Defaults to 0x0.
+    :param label_x: x offset of the label inside the button. Defaults to centered.
+    :param label_y: y offset of the label inside the button. Defaults to centered.
+    :param selected_fill: Inverts the fill color.
+    :param selected_outline: Inverts the outline color.
+    :param selected_label: Inverts the label color.
+    :param margin: (x, y) space around the outside of the button.
+    :param padding: (x, y) inset of the touch area.
+
+    """
+    __slots__ = _STYLE_FIELDS + ("_root", "_variants")
+
+    def __init__(self, *, shape=0, fill_color=0xFFFFFF, outline_color=0x0,
+                 label_font=None, label_color=0x0, label_x=-1, label_y=-1,
+                 selected_fill=None, selected_outline=None, selected_label=None,
+                 margin=None, padding=None, _root=None):
+        self.shape = shape
+        self.fill_color = _check_color(fill_color)
+        self.outline_color = _check_color(outline_color)
+        self.label_font = label_font
+        self.label_color = _check_color(label_color)
+        self.label_x = label_x
+        self.label_y = label_y
+        self.selected_fill = _check_color(selected_fill)
+        self.selected_outline = _check_color(selected_outline)
+        self.selected_label = _check_color(selected_label)
+        self.margin = None if margin is None else tuple(margin)
+        self.padding = (0, 0) if padding is None else tuple(padding)
+
+        # Variants are interned on the root style so repeated derive() calls
+        # (e.g. on every page change) hand back the same few objects
+        self._root = self if _root is None else _root
+        self._variants = {} if _root is None else None
+        if _root is not None:
+            return
+
+        # Selecting inverts the button colors!
+        if (self.selected_fill is None) and (self.fill_color is not None):
+            self.selected_fill = (~self.fill_color) & 0xFFFFFF
+        if (self.selected_outline is None) and (self.outline_color is not None):
+            self.selected_outline = (~self.outline_color) & 0xFFFFFF
+        if (self.selected_label is None) and (self.label_color is not None):
+            self.selected_label = (~self.label_color) & 0xFFFFFF
+
+    def _key(self):
+        return tuple(getattr(self, field) for field in _STYLE_FIELDS)
+
+    def derive(self, **changes):
+        """Return a style equal to this one with ``changes`` applied.  Equal variants
+        of the same base style are shared."""
+        for field in ("fill_color", "outline_color", "label_color",
+                      "selected_fill", "selected_outline", "selected_label"):
+            if field in changes:
+                changes[field] = _check_color(changes[field])
+        for field in ("margin", "padding"):
+            if changes.get(field) is not None:
+                changes[field] = tuple(changes[field])
+        values = {}
+        for field in _STYLE_FIELDS:
+            values[field] = changes.get(field, getattr(self, field))
+        key = tuple(values[field] for field in _STYLE_FIELDS)
+        if key == self._key():
+            return self
+        root = self._root
+        if key == root._key():    # pylint: disable=protected-access
+            return root
+        variant = root._variants.get(key)    # pylint: disable=protected-access
+        if variant is None:
+            variant = ButtonStyle(_root=root, **values)
+            root._variants[key] = variant    # pylint: disable=protected-access
+        return variant
+
+
 class PaddedButton():
-    # pylint: disable=too-many-instance-attributes, too-many-locals
+    # pylint: disable=too-many-instance-attributes, too-many-locals, too-many-public-methods
     """Helper class for creating UI buttons for ``displayio``.
 
     :param x: The x position of the button.
@@ -66,6 +180,12 @@ class PaddedButton():
     :param selected_fill: Inverts the fill color.
     :param selected_outline: Inverts the outline color.
     :param selected_label: Inverts the label color.
+    :param button_style: A shared ButtonStyle.  When given, it replaces the style, color,
+                         font, label position, margin and padding arguments.
+    :param shape_pool: ShapePool the button body bitmaps come from.  Defaults to
+                       ``shape_pool.default_pool``.
+    :param label_max: Longest label text that can be shown by updating the label in
+                      place.  Defaults to the length of the initial label.
 
     """
     RECT = const(0)
@@ -73,91 +193,222 @@ class PaddedButton():
     SHADOWRECT = const(2)
     SHADOWROUNDRECT = const(3)
 
+    # PaddedButton
+    # Per-button state only; everything that looks the same lives in the shared ButtonStyle
+    __slots__ = ("_x", "_y", "_width", "_height", "name", "group", "body", "shadow",
+                 "_style", "_label", "_id", "_selected", "_hit_index",
+                 "_x_min", "_y_min", "_x_max", "_y_max",
+                 "_shown_fill", "_shown_outline", "_shown_label", "writes", "_label_max",
+                 "dirty", "_body_box", "_label_box")
+
+    # PaddedButton
+    # Count of color writes that actually reached displayio, across all buttons
+    writes_total = 0
+
     def __init__(self, *, x, y, width, height, name=None, style=RECT,
                  fill_color=0xFFFFFF, outline_color=0x0,
                  label=None, label_font=None, label_color=0x0,
                  label_x=-1, label_y=-1, id=-1,                 # PaddedButton
                  selected_fill=None, selected_outline=None,
-                 selected_label=None, margin=None, padding=None): # PaddedButton
+                 selected_label=None, margin=None, padding=None, # PaddedButton
+                 button_style=None, shape_pool=None, label_max=None):
 
         # PaddedButton
-        # Define padding around the button boundaries to constrain
-        # calculation for the contains() method
-        if padding is not None:
-            self._padding = padding
-        else:
-            self._padding = (0, 0)  # (x,y) respectively
-            
+        # Buttons created the old way get a style of their own
+        if button_style is None:
+            button_style = ButtonStyle(shape=style, fill_color=fill_color,
+                                       outline_color=outline_color,
+                                       label_font=label_font, label_color=label_color,
+                                       label_x=label_x, label_y=label_y,
+                                       selected_fill=selected_fill,
+                                       selected_outline=selected_outline,
+                                       selected_label=selected_label,
+                                       margin=margin, padding=padding)
+        self._style = button_style
+        style = button_style.shape
+        fill_color = button_style.fill_color
+        outline_color = button_style.outline_color
+
         # Margin provides space around the outside of the button
-        self._margin = margin
-        
+        margin = button_style.margin
+
         # PaddedButton
+        # Hit-test index (e.g. HitGrid) notified when the touch area changes
+        self._hit_index = None
         if margin is not None:
-            self.x = x + margin[0]
-            self.y = y + margin[1]
-            self.width = width - (2 * self.margin[0])
-            self.height = height - (2 * self.margin[1])
-        else: 
-            self.x = x
-            self.y = y
-            self.width = width
-            self.height = height
-
-        self._font = label_font
+            self._x = x + margin[0]
+            self._y = y + margin[1]
+            self._width = width - (2 * margin[0])
+            self._height = height - (2 * margin[1])
+        else:
+            self._x = x
+            self._y = y
+            self._width = width
+            self._height = height
+        self._update_bounds()
+
         self._selected = False
+        self.writes = 0       # PaddedButton
+        # PaddedButton
+        # Optional DirtyRects that the areas of color and label changes are recorded in
+        self.dirty = None
         self.group = displayio.Group()
         self.name = name
-        self._label = label
+        self._label = None
+        self._label_box = None
         self._id = id         # PaddedButton
-        self.body = self.fill = self.shadow = None
-
-        self.fill_color = _check_color(fill_color)
-        self.outline_color = _check_color(outline_color)
-        self._label_color = label_color
-        self._label_font = label_font
-        self._label_x = label_x         # PaddedButton
-        self._label_y = label_y         # PaddedButton
-
-        # Selecting inverts the button colors!
-        self.selected_fill = _check_color(selected_fill)
-        self.selected_outline = _check_color(selected_outline)
-        self.selected_label = _check_color(selected_label)
-
-        if (self.selected_fill is None) and (fill_color is not None):
-            self.selected_fill = (~self.fill_color) & 0xFFFFFF
-        if self.selected_outline is None and outline_color is not None:
-            self.selected_outline = (~self.outline_color) & 0xFFFFFF
+        self.body = self.shadow = None
 
         # print("id: {} selected_fill: {}".format(self._id,self.selected_fill))
 
+        # PaddedButton
+        # Identically sized bodies share one bitmap from the pool
+        if shape_pool is None:
+            shape_pool = _shape_pool.default_pool
         if (outline_color is not None) or (fill_color is not None):
             if style == PaddedButton.RECT:
-                self.body = Rect(self.x, self.y, width, height,
-                                    fill=self.fill_color, outline=self.outline_color)
+                self.body = shape_pool.rect(self.x, self.y, width, height,
+                                            fill=fill_color, outline=outline_color)
             elif style == PaddedButton.ROUNDRECT:
-                self.body = RoundRect(self.x, self.y, self.width, self.height, r=10,
-                                        fill=self.fill_color, outline=self.outline_color)
+                self.body = shape_pool.roundrect(self.x, self.y, self.width, self.height, 10,
+                                                 fill=fill_color, outline=outline_color)
             elif style == PaddedButton.SHADOWRECT:
-                self.shadow = Rect(x + 2, y + 2, width - 2, height - 2,
-                                    fill=outline_color)
-                self.body = Rect(x, y, width - 2, height - 2,
-                                    fill=self.fill_color, outline=self.outline_color)
+                self.shadow = shape_pool.rect(x + 2, y + 2, width - 2, height - 2,
+                                              fill=outline_color)
+                self.body = shape_pool.rect(x, y, width - 2, height - 2,
+                                            fill=fill_color, outline=outline_color)
             elif style == PaddedButton.SHADOWROUNDRECT:
-                self.shadow = RoundRect(x + 2, y + 2, width - 2, height - 2, r=10,
-                                        fill=self.outline_color)
-                self.body = RoundRect(x, y, width - 2, height - 2, r=10,
-                                        fill=self.fill_color, outline=self.outline_color)
+                self.shadow = shape_pool.roundrect(x + 2, y + 2, width - 2, height - 2, 10,
+                                                   fill=outline_color)
+                self.body = shape_pool.roundrect(x, y, width - 2, height - 2, 10,
+                                                 fill=fill_color, outline=outline_color)
             if self.shadow:
                 self.group.append(self.shadow)
 
             self.group.append(self.body)
 
+        # PaddedButton
+        # Screen areas are worked out when they change, not when they are recorded
+        self._body_box = None if self.body is None else box_of(self.body)
+
+        # PaddedButton
+        # Colors currently pushed to displayio, used to skip no-op writes
+        self._shown_fill = fill_color
+        self._shown_outline = outline_color
+        self._shown_label = None
+
+        if label_max is None:
+            label_max = len(label) if label else 0
+        self._label_max = label_max
         self.label = label
 
         # else: # ok just a bounding box
         # self.bodyshape = displayio.Shape(width, height)
         # self.group.append(self.bodyshape)
 
+    # PaddedButton
+    # Color and layout attributes are read from, and changes are derived from, the shared style
+    @property
+    def button_style(self):
+        """The ButtonStyle used by this button.  Setting it recolors the button; the
+        shape, font and margin of the new style are not applied."""
+        return self._style
+
+    @button_style.setter
+    def button_style(self, value):
+        if value is self._style:
+            return
+        self._style = value
+        self._update_bounds()
+        self._apply_colors()
+
+    # PaddedButton
+    # Geometry changes rebuild the cached touch area and tell the hit-test index
+    @property
+    def x(self):
+        """X position of the button, inside its margin."""
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        self._x = value
+        self._update_bounds()
+
+    @property
+    def y(self):
+        """Y position of the button, inside its margin."""
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        self._y = value
+        self._update_bounds()
+
+    @property
+    def width(self):
+        """Width of the button, inside its margin."""
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        self._width = value
+        self._update_bounds()
+
+    @property
+    def height(self):
+        """Height of the button, inside its margin."""
+        return self._height
+
+    @height.setter
+    def height(self, value):
+        self._height = value
+        self._update_bounds()
+
+    @property
+    def fill_color(self):
+        """Unselected fill color."""
+        return self._style.fill_color
+
+    @fill_color.setter
+    def fill_color(self, value):
+        self._style = self._style.derive(fill_color=value)
+
+    @property
+    def outline_color(self):
+        """Unselected outline color."""
+        return self._style.outline_color
+
+    @outline_color.setter
+    def outline_color(self, value):
+        self._style = self._style.derive(outline_color=value)
+
+    @property
+    def selected_fill(self):
+        """Selected fill color."""
+        return self._style.selected_fill
+
+    @selected_fill.setter
+    def selected_fill(self, value):
+        self._style = self._style.derive(selected_fill=value)
+
+    @property
+    def selected_outline(self):
+        """Selected outline color."""
+        return self._style.selected_outline
+
+    @selected_outline.setter
+    def selected_outline(self, value):
+        self._style = self._style.derive(selected_outline=value)
+
+    @property
+    def selected_label(self):
+        """Selected label color."""
+        return self._style.selected_label
+
+    @selected_label.setter
+    def selected_label(self, value):
+        self._style = self._style.derive(selected_label=value)
+
     @property
     def label(self):
         """The text label of the button"""
@@ -165,28 +416,63 @@ class PaddedButton():
 
     @label.setter
     def label(self, newtext):
+        self._set_label(newtext)
+
+    @property
+    def label_max(self):
+        """Longest label text that is updated in place rather than rebuilt."""
+        return self._label_max
+
+    # PaddedButton
+    # Setters are plain methods so instrumentation can wrap them
+    def _set_label(self, newtext):
+        # PaddedButton
+        # Reuse the existing Label when the new text fits, rather than rebuilding it
+        if (self._label is not None) and newtext and (len(newtext) <= self._label_max):
+            if newtext == self._label.text:
+                return     # nothing changed, nothing to redraw
+            style = self._style
+            width = _text_width(style.label_font, newtext)
+            if width >= self.width:
+                raise RuntimeError("Button not large enough for label")
+            self._touched(self._label_box)
+            self._label.text = newtext
+            if style.label_x <= -1:
+                self._label.x = self.x + (self.width - width) // 2
+            self._label_box = box_of(self._label)
+            self._touched(self._label_box)
+            return
+
         if self._label and (self.group[-1] == self._label):
             self.group.pop()
+            self._touched(self._label_box)
 
         self._label = None
-        if not newtext or (self._label_color is None):  # no new text
+        self._label_box = None
+        style = self._style
+        if not newtext or (style.label_color is None):  # no new text
             return     # nothing to do!
 
-        if not self._label_font:
+        if not style.label_font:
             raise RuntimeError("Please provide label font")
-        self._label = Label(self._label_font, text=newtext)
+        if len(newtext) > self._label_max:
+            self._label_max = len(newtext)
+        try:
+            self._label = Label(style.label_font, text=newtext, max_glyphs=self._label_max)
+        except TypeError:   # newer adafruit_display_text sizes the label itself
+            self._label = Label(style.label_font, text=newtext)
         dims = self._label.bounding_box
         if dims[2] >= self.width or dims[3] >= self.height:
             raise RuntimeError("Button not large enough for label")
 
         # PaddedButton
         # Set an x,y location for the label
-        if self._label_x > -1:
-            x_loc = self.x + self._label_x
-        else: 
+        if style.label_x > -1:
+            x_loc = self.x + style.label_x
+        else:
             x_loc = self.x + (self.width - dims[2]) // 2
-        if self._label_y > -1: 
-            y_loc = self.y + self._label_y
+        if style.label_y > -1:
+            y_loc = self.y + style.label_y
         else:
             y_loc = self.y + self.height // 2
             
@@ -196,11 +482,14 @@ class PaddedButton():
         # self._label.x = self.x + (self.width - dims[2]) // 2
         # self._label.y = self.y + self.height // 2
 
-        self._label.color = self._label_color
+        self._label.color = style.label_color
+        self._shown_label = style.label_color
         self.group.append(self._label)
+        self._label_box = box_of(self._label)
+        self._touched(self._label_box)
 
-        if (self.selected_label is None) and (self._label_color is not None):
-            self.selected_label = (~self._label_color) & 0xFFFFFF
+        if self._selected:
+            self._apply_colors()
 
     @property
     def selected(self):
@@ -209,26 +498,88 @@ class PaddedButton():
 
     @selected.setter
     def selected(self, value):
+        self._set_selected(value)
+
+    def _set_selected(self, value):
         if value == self._selected:
             return   # bail now, nothing more to do
         self._selected = value
+        self._apply_colors()
+
+    # PaddedButton
+    # Push the colors for the current state, skipping anything already on screen
+    def _apply_colors(self):
+        style = self._style
         if self._selected:
-            new_fill = self.selected_fill
-            new_out = self.selected_outline
-            new_label = self.selected_label
+            new_fill = style.selected_fill
+            new_out = style.selected_outline
+            new_label = style.selected_label
         else:
-            new_fill = self.fill_color
-            new_out = self.outline_color
-            new_label = self._label_color
-        # print("id: {} new_fill: {}".format(self._id,new_fill))
-        # update all relevant colros!
+            new_fill = style.fill_color
+            new_out = style.outline_color
+            new_label = style.label_color
+        writes = 0
         if self.body is not None:
-            # print("id: {} updating new_fill: {}".format(self._id,new_fill))
-            self.body.fill = new_fill
-            self.body.outline = new_out
-        if self._label is not None:
+            if new_fill != self._shown_fill:
+                self.body.fill = new_fill
+                self._shown_fill = new_fill
+                writes += 1
+            if new_out != self._shown_outline:
+                self.body.outline = new_out
+                self._shown_outline = new_out
+                writes += 1
+            if writes:
+                self._touched(self._body_box)
+        if (self._label is not None) and (new_label != self._shown_label):
             self._label.color = new_label
+            self._shown_label = new_label
+            writes += 1
+            self._touched(self._label_box)
+        if writes:
+            self.writes += writes
+            PaddedButton.writes_total += writes
 
+    # PaddedButton
+    # Record the screen area of a changed part of the button
+    def _touched(self, box):
+        if (self.dirty is not None) and (box is not None):
+            group = self.group
+            self.dirty.add(box[0] + group.x, box[1] + group.y, box[2], box[3])
+
+    def update(self, *, selected=None, fill=None, outline=None, label_color=None):
+        """Change several visual properties at once and push a single coalesced update.
+        Arguments left as None are unchanged.
+
+        :param selected: New selected state.
+        :param fill: New unselected fill color.
+        :param outline: New unselected outline color.
+        :param label_color: New unselected label color.
+        """
+        if selected is not None:
+            self._selected = selected
+        if fill is not None:
+            self._style = self._style.derive(fill_color=fill)
+        if outline is not None:
+            self._style = self._style.derive(outline_color=outline)
+        if label_color is not None:
+            self._style = self._style.derive(label_color=label_color)
+        self._apply_colors()
+
+    # PaddedButton
+    # The padded touch area is cached here rather than rebuilt on every contains() call
+    def _update_bounds(self):
+        padding = self._style.padding
+        self._x_min = self._x + padding[0]
+        self._x_max = self._x + self._width - padding[0]
+        self._y_min = self._y + padding[1]
+        self._y_max = self._y + self._height - padding[1]
+        if self._hit_index is not None:
+            self._hit_index.invalidate()
+
+    @property
+    def bounds(self):
+        """The padded touch area as (x_min, y_min, x_max, y_max), inclusive."""
+        return (self._x_min, self._y_min, self._x_max, self._y_max)
 
     # PaddedButton
     # New code for contains function
@@ -237,12 +588,7 @@ class PaddedButton():
         ``button.contains(touch)`` where ``touch`` is the touch point on the screen will allow for
         determining that a button has been touched.
         """
-        x_min = self.x + self._padding[0]
-        x_max = self.x + self.width - self._padding[0]
-        y_min = self.y + self._padding[1]
-        y_max = self.y + self.height - self._padding[1]
-
-        return (x_min <= point[0] <= x_max) and (y_min  <= point[1] <= y_max)
+        return (self._x_min <= point[0] <= self._x_max) and (self._y_min <= point[1] <= self._y_max)
 
     # def contains(self, point):
     #     """Used to determine if a point is contained within a button. For example,
@@ -253,6 +599,14 @@ class PaddedButton():
     #                                                             self.y + self.height)
 
     # PaddedButton additions
+    def release(self):
+        """Return the body bitmaps to the shape pool.  Call once the button is no
+        longer displayed."""
+        if self.body is not None:
+            self.body.release()
+        if self.shadow is not None:
+            self.shadow.release()
+
     @property
     def id(self):
         """Button ID.  Should be an integer."""
@@ -261,20 +615,22 @@ class PaddedButton():
     @property
     def padding(self):
         """Sets the button outline padding"""
-        return self._padding
+        return self._style.padding
 
     @padding.setter
     def padding(self, value):
-        self._padding = value
+        self._style = self._style.derive(padding=value)
+        self._update_bounds()
 
     @property
     def margin(self):
         """Sets the button outline padding"""
-        return self._margin
+        return self._style.margin
 
     @margin.setter
     def margin(self, value):
-        self._margin = value
+        # Like the original, only new buttons are laid out with the margin
+        self._style = self._style.derive(margin=value)
 
     @property
     def fillcolor(self):
@@ -283,22 +639,25 @@ class PaddedButton():
 
     @fillcolor.setter
     def fillcolor(self, fill):
-        self.body.fill = fill
+        self.fill_color = fill
+        self._apply_colors()
 
     @property
     def outlinecolor(self):
-        """Sets the fill color"""
-        return self.outline
+        """Sets the outline color"""
+        return self.outline_color
 
     @outlinecolor.setter
-    def outlinecolor(self, fill):
-        self.body.outline = fill
+    def outlinecolor(self, outline):
+        self.outline_color = outline
+        self._apply_colors()
 
     @property
     def labelcolor(self):
-        """Sets the fill color"""
-        return self._label_color
+        """Sets the label color"""
+        return self._style.label_color
 
     @labelcolor.setter
     def labelcolor(self, value):
-        self._label_color = value
\ No newline at end of file
+        self._style = self._style.derive(label_color=value)
+        self._apply_colors()
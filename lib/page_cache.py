@@ -0,0 +1,149 @@
+"""
+`page_cache`
+================================================================================
+Least-recently-used cache of built page Groups.  Pages are built on first use
+and evicted when the cache holds too many pages, too many bytes, or the heap
+runs low.
+
+* Author: Jason Pecor
+
+"""
+
+import gc
+import time
+
+
+class PageCache():
+    # pylint: disable=too-many-instance-attributes
+    """LRU cache of ``displayio.Group`` objects keyed by page index.
+
+    :param max_pages: Maximum number of built pages to keep. Defaults to 4.
+    :param max_bytes: Maximum estimated heap bytes for built pages, or None for no limit.
+    :param min_free: Evict pages while free heap is below this many bytes, or None.
+    :param clock: Function returning the current time in seconds. Defaults to ``time.monotonic``.
+    :param mem_free: Function returning free heap bytes. Defaults to ``gc.mem_free`` when available.
+    :param on_evict: Function called as ``on_evict(group)`` when a page is dropped, e.g.
+                     ``shape_pool.release_shapes``.
+
+    Set ``pinned`` to the key of the page on screen so eviction leaves it alone.
+
+    """
+
+    def __init__(self, *, max_pages=4, max_bytes=None, min_free=None,
+                 clock=time.monotonic, mem_free=None, on_evict=None):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.min_free = min_free
+        self._clock = clock
+        if mem_free is None:
+            mem_free = getattr(gc, "mem_free", None)
+        self._mem_free = mem_free
+        self._on_evict = on_evict
+        # Key of the page on screen, never evicted to make room for another
+        self.pinned = None
+
+        self._order = []   # least recently used first
+        self._groups = {}
+        self._sizes = {}
+        self.bytes = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.build_time_last = 0
+        self.build_time_max = 0
+        self.build_time_total = 0
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, key):
+        return key in self._groups
+
+    def size_of(self, key):
+        """Estimated heap bytes used to build ``key``, or None if not cached."""
+        return self._sizes.get(key)
+
+    def get(self, key, builder):
+        """Return the Group for ``key``, calling ``builder()`` to create it on a miss."""
+        group = self._groups.get(key)
+        if group is not None:
+            self.hits += 1
+            if self._order[-1] != key:
+                self._order.remove(key)
+                self._order.append(key)
+            return group
+
+        self.misses += 1
+        free_before = self._mem_free() if self._mem_free else 0
+        start = self._clock()
+        group = builder()
+        elapsed = self._clock() - start
+        size = (free_before - self._mem_free()) if self._mem_free else 0
+        if size < 0:   # a collection ran during the build
+            size = 0
+
+        self.build_time_last = elapsed
+        if elapsed > self.build_time_max:
+            self.build_time_max = elapsed
+        self.build_time_total += elapsed
+
+        self._groups[key] = group
+        self._sizes[key] = size
+        self._order.append(key)
+        self.bytes += size
+        self._evict(key)
+        return group
+
+    def swap(self, a, b):
+        """Exchange the Groups cached for ``a`` and ``b``, e.g. once each has been made
+        to show the other's content.  Returns False if either isn't cached."""
+        groups = self._groups
+        if (a not in groups) or (b not in groups):
+            return False
+        groups[a], groups[b] = groups[b], groups[a]
+        sizes = self._sizes
+        sizes[a], sizes[b] = sizes[b], sizes[a]
+        return True
+
+    def discard(self, key):
+        """Drop ``key`` from the cache if present."""
+        if key not in self._groups:
+            return
+        self._order.remove(key)
+        group = self._groups.pop(key)
+        self.bytes -= self._sizes.pop(key)
+        self.evictions += 1
+        if self._on_evict is not None:
+            self._on_evict(group)
+
+    def clear(self):
+        """Drop every cached page."""
+        for key in list(self._order):
+            self.discard(key)
+        gc.collect()
+
+    def _over_budget(self):
+        if len(self._order) > self.max_pages:
+            return True
+        if (self.max_bytes is not None) and (self.bytes > self.max_bytes):
+            return True
+        if (self.min_free is not None) and self._mem_free and (self._mem_free() < self.min_free):
+            return True
+        return False
+
+    def _evict(self, keep):
+        evicted = False
+        while self._over_budget():
+            for key in self._order:
+                if (key != keep) and (key != self.pinned):
+                    break
+            else:
+                break   # only the new page and the one on screen are left
+            self.discard(key)
+            evicted = True
+            if self.min_free is not None:
+                gc.collect()
+        if evicted:
+            gc.collect()
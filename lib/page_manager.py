@@ -0,0 +1,210 @@
+"""
+`page_manager`
+================================================================================
+Table-driven pages for the paged UI.  Pages, their tabs, colors and command
+numbers are declared as data and switching pages is a single indexed lookup.
+
+Pages may also carry their own content.  A page's ``builder`` is only called
+the first time the page is shown and the resulting Group is kept in a
+PageCache, so content for many pages does not have to fit in RAM at once.
+
+Switching pages compares the old page with the new one and only touches
+what differs: the background when the color changes, buttons that are
+filled with the page color, and the content.  Command buttons with no fill
+of their own are left alone since the new background shows through them.
+When the old and new content are both Groups of the same number of Labels
+(e.g. a title per page) the Labels on screen are changed to the new text
+rather than one Group being swapped for the other, so only the Labels that
+differ are redrawn.  The areas touched are recorded in an optional
+DirtyRects, so each transition's pushed pixels can be reported; buttons
+record their own changes when their ``dirty`` is set.
+
+* Author: Jason Pecor
+
+"""
+
+from page_cache import PageCache
+from dirty_rects import box_of
+
+
+class Page():
+    """A single page of the UI.
+
+    :param color: Background color of the page.  Also used as the fill for command buttons
+                  that have a fill color.
+    :param tab: The PaddedButton that selects this page, if any.
+    :param commands: Command numbers indexed by button id.
+    :param name: Optional name of the page.
+    :param builder: Function called as ``builder(page)`` that returns a ``displayio.Group``
+                    with the page's own content.  Labels that may be changed to another
+                    page's text need room for it, e.g. the same ``max_glyphs``.
+
+    """
+
+    def __init__(self, *, color, tab=None, commands=(), name=None, builder=None):
+        self.color = color
+        self.tab = tab
+        self.commands = tuple(commands)
+        self.name = name
+        self.builder = builder
+
+
+class PageManager():
+    """Keeps track of the pages and the currently active one.
+
+    :param background: The shape drawn behind the command buttons, e.g. a Rect.
+    :param buttons: The command buttons shared by every page.  Their ids index the
+                    pages' command tables and need not be contiguous.
+    :param content: ``displayio.Group`` that holds the active page's built content.
+    :param cache: PageCache for built pages. Defaults to a PageCache holding 4 pages.
+    :param dirty: Optional DirtyRects to record the areas each page switch changes in.
+
+    """
+
+    def __init__(self, background, buttons, *, content=None, cache=None, dirty=None):
+        self.background = background
+        self.dirty = dirty
+        self.buttons = buttons
+        # Command tables are indexed by button id, so they are sized by the largest
+        self.button_ids = 0
+        for button in buttons:
+            if button.id >= self.button_ids:
+                self.button_ids = button.id + 1
+        self.content = content
+        if cache is None:
+            cache = PageCache()
+        self.cache = cache
+        self._shown_group = None
+        self._shown_index = None
+        self.pages = []
+        self._tabs = {}
+        self._next_command = 0
+        self._active = None
+
+    def add_page(self, *, color, tab=None, commands=None, name=None, builder=None):
+        """Add a page and return its index.
+
+        :param color: Background color of the page.
+        :param tab: The PaddedButton that selects this page.
+        :param commands: Command numbers indexed by button id.  Defaults to the next
+                         ``button_ids`` unused numbers, so commands never collide
+                         no matter how many pages or buttons there are.
+        :param name: Optional name of the page.
+        :param builder: Function called as ``builder(page)`` to build the page content.
+        """
+        if commands is None:
+            commands = range(self._next_command, self._next_command + self.button_ids)
+        page = Page(color=color, tab=tab, commands=commands, name=name, builder=builder)
+        if page.commands:
+            self._next_command = max(self._next_command, max(page.commands) + 1)
+        index = len(self.pages)
+        self.pages.append(page)
+        if tab is not None:
+            self._tabs[tab] = index
+        return index
+
+    @property
+    def active(self):
+        """Index of the active page, or None before the first show()."""
+        return self._active
+
+    @property
+    def page(self):
+        """The active Page."""
+        return self.pages[self._active]
+
+    @property
+    def color(self):
+        """Background color of the active page."""
+        return self.pages[self._active].color
+
+    def page_for_tab(self, tab):
+        """Return the index of the page selected by ``tab`` or None."""
+        return self._tabs.get(tab)
+
+    def command(self, button):
+        """Return the command number for ``button`` on the active page or None."""
+        commands = self.pages[self._active].commands
+        if 0 <= button.id < len(commands):
+            return commands[button.id]
+        return None
+
+    def show(self, index):
+        """Make page ``index`` active, updating only what differs from the current page.
+        Returns True if the page changed.
+        """
+        if index == self._active:
+            return False
+        new = self.pages[index]
+        old_color = None if self._active is None else self.pages[self._active].color
+        self._active = index
+
+        if new.color != old_color:
+            self.background.fill = new.color
+            self.background.outline = new.color
+            self._touched(self.background)
+            for button in self.buttons:
+                # Transparent buttons already show the new color through them
+                if button.fill_color is not None:
+                    button.update(fill=new.color)
+
+        self._show_content(index, new)
+        return True
+
+    def _show_content(self, index, page):
+        if self.content is None:
+            return
+        group = None
+        if page.builder is not None:
+            group = self.cache.get(index, lambda: page.builder(page))
+        if group is self._shown_group:
+            return
+        shown = self._shown_group
+        if (shown is not None) and (group is not None) and _same_labels(shown, group) and \
+                self.cache.swap(self._shown_index, index):
+            # The Group on screen takes the new page's labels and the cache entries are
+            # exchanged, so each page's entry still holds that page's content
+            for i in range(len(shown)):
+                self._exchange(shown[i], group[i], shown)
+            self._shown_index = index
+            self.cache.pinned = index
+            return
+        if shown is not None:
+            self.content.remove(shown)
+            self._touched(shown, self.content)
+        if group is not None:
+            self.content.append(group)
+            self._touched(group, self.content)
+        self._shown_group = group
+        self._shown_index = index
+        self.cache.pinned = index
+
+    def _exchange(self, shown, other, parent):
+        # Swap the text, position and color of two Labels, recording the one on screen
+        if (shown.text == other.text) and (shown.x == other.x) and (shown.y == other.y) and \
+                (shown.color == other.color):
+            return
+        self._touched(shown, parent)
+        text, x, y, color = shown.text, shown.x, shown.y, shown.color
+        shown.text, shown.x, shown.y, shown.color = other.text, other.x, other.y, other.color
+        other.text, other.x, other.y, other.color = text, x, y, color
+        self._touched(shown, parent)
+
+    def _touched(self, item, parent=None):
+        # Record the screen area of a changed displayio object
+        if self.dirty is None:
+            return
+        if parent is None:
+            self.dirty.add_box(box_of(item))
+        else:
+            self.dirty.add_box(box_of(item, parent.x, parent.y))
+
+
+def _same_labels(a, b):
+    # True if both Groups hold the same number of Labels and nothing else
+    if len(a) != len(b):
+        return False
+    for i in range(len(a)):
+        if not (hasattr(a[i], "text") and hasattr(b[i], "text")):
+            return False
+    return True
@@ -0,0 +1,157 @@
+"""
+`render_scheduler`
+================================================================================
+Explicit, frame-paced display refresh.
+
+Auto-refresh pushes partial updates to the screen as soon as any displayio
+object changes, so a page switch that recolors the background, the tabs and
+eight buttons can show up as several partial frames.  RenderScheduler turns
+auto-refresh off; callers change everything for an input event, call
+``invalidate()`` and the next ``update()`` pushes a single refresh, no more
+often than the FPS cap.
+
+Refreshes are kept on a grid of frame slots in ``ticks_ms`` milliseconds.
+A frame is rarely a whole number of milliseconds (33 1/3 at 30 FPS), so
+slots are spaced 33 or 34 ms apart in turn to average out exactly.  A
+refresh asked for a little before its slot (up to an eighth of a frame, e.g.
+from clock rounding when ``update()`` runs exactly once per frame) still
+goes out, and the next slot is counted from where this one should have
+been, so the rate can't drift below or above the cap.
+
+If given a DirtyRects, the areas recorded in it are counted as the pixels
+pushed by each refresh and then cleared.
+
+* Author: Jason Pecor
+
+"""
+
+from ticks import ticks_ms, ticks_add, ticks_diff
+
+
+class RenderScheduler():
+    # pylint: disable=too-many-instance-attributes
+    """Collects changes and refreshes the display at most once per frame.
+
+    :param display: The display, e.g. ``board.DISPLAY``.
+    :param fps: Maximum refreshes per second. Defaults to 30.
+    :param clock: Function returning the current time in milliseconds. Defaults to
+                  ``supervisor.ticks_ms``.
+    :param dirty: Optional DirtyRects that changes are recorded in.
+
+    """
+
+    def __init__(self, display, *, fps=30, clock=ticks_ms, dirty=None):
+        self._display = display
+        self.dirty = dirty
+        self._clock = clock
+        self.fps = fps
+        self._pending = False
+        self._pending_since = 0
+        self._next_slot = None
+        display.auto_refresh = False
+
+        # Statistics; times in milliseconds
+        self.refreshes = 0
+        self.dropped_frames = 0
+        self.frame_time_last = 0
+        self.frame_time_max = 0
+        self.frame_time_total = 0
+        self.pixels_last = 0
+        self.pixels_max = 0
+        self.pixels_total = 0
+
+    @property
+    def fps(self):
+        """Maximum refreshes per second."""
+        return self._fps
+
+    @fps.setter
+    def fps(self, value):
+        self._fps = value
+        self._frame_ms = 1000 // value
+        self._frame_rem = 1000 % value    # spread as one extra ms on some frames
+        self._error = 0
+        self._slack = self._frame_ms // 8
+
+    def _frame_step(self):
+        # Milliseconds from one slot to the next, averaging exactly 1000 / fps
+        self._error += self._frame_rem
+        if self._error >= self._fps:
+            self._error -= self._fps
+            return self._frame_ms + 1
+        return self._frame_ms
+
+    @property
+    def pending(self):
+        """True if changes are waiting for the next refresh."""
+        return self._pending
+
+    @property
+    def time_to_next_frame(self):
+        """Seconds until a pending refresh may be pushed, 0 if it is due now."""
+        if self._next_slot is None:
+            return 0
+        remaining = ticks_diff(self._next_slot, self._clock()) - self._slack
+        return remaining / 1000 if remaining > 0 else 0
+
+    def invalidate(self):
+        """Mark the display as needing a refresh on the next frame."""
+        if not self._pending:
+            self._pending = True
+            self._pending_since = self._clock()
+
+    def update(self):
+        """Push one refresh if changes are pending and a frame is due.  Returns True
+        if the display was refreshed."""
+        if not self._pending:
+            return False
+        now = self._clock()
+        slot = now
+        due = self._pending_since
+        if self._next_slot is not None:
+            slot = self._next_slot
+            late = ticks_diff(now, slot)
+            if late < -self._slack:
+                return False
+            if late >= self._frame_ms:
+                slot = now      # idle for a while; start a new grid
+            if ticks_diff(self._next_slot, due) > 0:
+                due = self._next_slot
+
+        # Whole frame slots that passed while the change was waiting to be shown
+        missed = ticks_diff(now, due) // self._frame_ms
+        if missed > 0:
+            self.dropped_frames += missed
+
+        self._display.refresh()
+        end = self._clock()
+        self._pending = False
+        self._next_slot = ticks_add(slot, self._frame_step())
+        self.refreshes += 1
+
+        frame_time = ticks_diff(end, now)
+        self.frame_time_last = frame_time
+        if frame_time > self.frame_time_max:
+            self.frame_time_max = frame_time
+        self.frame_time_total += frame_time
+
+        dirty = self.dirty
+        if dirty is not None:
+            pixels = dirty.pixels
+            self.pixels_last = pixels
+            if pixels > self.pixels_max:
+                self.pixels_max = pixels
+            self.pixels_total += pixels
+            dirty.clear()
+        return True
+
+    def reset_stats(self):
+        """Clear the refresh, frame time and pixel statistics."""
+        self.refreshes = 0
+        self.dropped_frames = 0
+        self.frame_time_last = 0
+        self.frame_time_max = 0
+        self.frame_time_total = 0
+        self.pixels_last = 0
+        self.pixels_max = 0
+        self.pixels_total = 0
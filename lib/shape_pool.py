@@ -0,0 +1,184 @@
+"""
+`shape_pool`
+================================================================================
+Shared bitmaps for button bodies and backgrounds.
+
+``adafruit_display_shapes`` gives every Rect and RoundRect its own bitmap, so
+eight identical buttons hold eight identical pixel buffers.  ShapePool keeps one
+bitmap per (width, height, corner radius, stroke) and hands out PooledShapes
+that draw from it with a palette of their own.  Bitmaps are reference counted
+and dropped when the last shape using them is released.
+
+* Author: Jason Pecor
+
+"""
+
+import displayio
+
+# Bitmap color indices
+_TRANSPARENT = 0
+_OUTLINE = 1
+_FILL = 2
+
+
+def _bitmap_bytes(width, height):
+    # 3 colors are stored at 2 bits per pixel with 32-bit aligned rows
+    return ((width * 2 + 31) // 32) * 4 * height
+
+
+class PooledShape(displayio.TileGrid):
+    """A rectangle or rounded rectangle drawn from a shared bitmap.  Has the same
+    ``fill`` and ``outline`` properties as the ``adafruit_display_shapes`` classes.
+    Create these with ``ShapePool.rect()`` or ``ShapePool.roundrect()``.
+    """
+
+    def __init__(self, pool, key, bitmap, *, x, y, fill=None, outline=None):
+        self._pool = pool
+        self._key = key
+        self._palette = displayio.Palette(3)
+        self._palette.make_transparent(_TRANSPARENT)
+        super().__init__(bitmap, pixel_shader=self._palette, x=x, y=y)
+        self._fill = self._outline = None
+        self.fill = fill
+        self.outline = outline
+
+    @property
+    def fill(self):
+        """The fill color, or None for transparent."""
+        return self._fill
+
+    @fill.setter
+    def fill(self, color):
+        self._fill = color
+        self._set_color(_FILL, color)
+
+    @property
+    def outline(self):
+        """The outline color, or None for transparent."""
+        return self._outline
+
+    @outline.setter
+    def outline(self, color):
+        self._outline = color
+        self._set_color(_OUTLINE, color)
+
+    def _set_color(self, index, color):
+        if color is None:
+            self._palette[index] = 0
+            self._palette.make_transparent(index)
+        else:
+            self._palette[index] = color
+            self._palette.make_opaque(index)
+
+    def release(self):
+        """Return the bitmap to the pool.  The shape should no longer be displayed."""
+        if self._key is not None:
+            self._pool.release(self._key)
+            self._key = None
+
+
+class ShapePool():
+    """Reference counted pool of shape bitmaps."""
+
+    def __init__(self):
+        self._bitmaps = {}
+        self._refs = {}
+        self.bytes = 0
+        self.peak_bytes = 0
+        # What the same shapes would use with a bitmap each
+        self.unpooled_bytes = 0
+        self.peak_unpooled_bytes = 0
+
+    def __len__(self):
+        return len(self._bitmaps)
+
+    def rect(self, x, y, width, height, *, fill=None, outline=None, stroke=1):
+        """Return a PooledShape rectangle.  Arguments match ``adafruit_display_shapes.rect.Rect``."""
+        return self.roundrect(x, y, width, height, 0, fill=fill, outline=outline, stroke=stroke)
+
+    def roundrect(self, x, y, width, height, r, *, fill=None, outline=None, stroke=1):
+        """Return a PooledShape rounded rectangle.  Arguments match
+        ``adafruit_display_shapes.roundrect.RoundRect``."""
+        if outline is None:
+            stroke = 0
+        key = (width, height, r, stroke)
+        bitmap = self.acquire(key)
+        return PooledShape(self, key, bitmap, x=x, y=y, fill=fill, outline=outline)
+
+    def acquire(self, key):
+        """Return the bitmap for ``key`` = (width, height, r, stroke), drawing it on first use."""
+        size = _bitmap_bytes(key[0], key[1])
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            bitmap = _draw(*key)
+            self._bitmaps[key] = bitmap
+            self._refs[key] = 0
+            self.bytes += size
+            if self.bytes > self.peak_bytes:
+                self.peak_bytes = self.bytes
+        self._refs[key] += 1
+        self.unpooled_bytes += size
+        if self.unpooled_bytes > self.peak_unpooled_bytes:
+            self.peak_unpooled_bytes = self.unpooled_bytes
+        return bitmap
+
+    def release(self, key):
+        """Drop one reference to the bitmap for ``key``."""
+        size = _bitmap_bytes(key[0], key[1])
+        self.unpooled_bytes -= size
+        self._refs[key] -= 1
+        if self._refs[key] == 0:
+            del self._refs[key]
+            del self._bitmaps[key]
+            self.bytes -= size
+
+    def refcount(self, key):
+        """Number of shapes using the bitmap for ``key``."""
+        return self._refs.get(key, 0)
+
+
+def _draw(width, height, r, stroke):
+    # pylint: disable=too-many-branches
+    bitmap = displayio.Bitmap(width, height, 3)
+    bitmap.fill(_FILL)
+    for s in range(stroke):
+        for x in range(width):
+            bitmap[x, s] = _OUTLINE
+            bitmap[x, height - 1 - s] = _OUTLINE
+        for y in range(height):
+            bitmap[s, y] = _OUTLINE
+            bitmap[width - 1 - s, y] = _OUTLINE
+    if r <= 0:
+        return bitmap
+
+    # Corners: clear outside the radius and ring the edge with the outline
+    outer = (2 * r + 1) * (2 * r + 1)
+    inner = (2 * (r - stroke) + 1) * (2 * (r - stroke) + 1)
+    for dy in range(r):
+        for dx in range(r):
+            dist = 4 * ((r - dx) * (r - dx) + (r - dy) * (r - dy))
+            if dist > outer:
+                value = _TRANSPARENT
+            elif (stroke > 0) and (dist > inner):
+                value = _OUTLINE
+            else:
+                value = _FILL
+            bitmap[dx, dy] = value
+            bitmap[width - 1 - dx, dy] = value
+            bitmap[dx, height - 1 - dy] = value
+            bitmap[width - 1 - dx, height - 1 - dy] = value
+    return bitmap
+
+
+def release_shapes(group):
+    """Release every PooledShape in ``group`` and its sub-groups.  Suitable as a
+    PageCache ``on_evict`` callback."""
+    for item in group:
+        if isinstance(item, PooledShape):
+            item.release()
+        elif isinstance(item, displayio.Group):
+            release_shapes(item)
+
+
+# Pool used by PaddedButton unless another is given
+default_pool = ShapePool()
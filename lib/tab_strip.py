@@ -0,0 +1,156 @@
+"""
+`tab_strip`
+================================================================================
+Scrollable strip of page tabs that only creates display objects for the tabs
+in view.
+
+The strip keeps a fixed number of PaddedButton slots: enough to cover its
+width plus a little overscan on either side.  As it scrolls, slots that fall
+out of the window are recycled for the tabs coming into view, so memory and
+per-frame cost stay the same whether there are 4 pages or 200.
+
+* Author: Jason Pecor
+
+"""
+
+import displayio
+from padded_button import PaddedButton
+
+
+class TabStrip():
+    # pylint: disable=too-many-instance-attributes
+    """A virtualized, horizontally scrolling row of tabs.
+
+    :param x: The x position of the strip.
+    :param y: The y position of the strip.
+    :param width: The width of the strip in pixels.
+    :param height: The height of the strip in pixels.
+    :param tab_width: The width of one tab in pixels.
+    :param count: The number of tabs.
+    :param style_for: Function returning the ButtonStyle for a tab index.
+    :param label_for: Function returning the label text for a tab index. Defaults to ``str``.
+    :param overscan: Extra tabs kept built on either side of the visible ones. Defaults to 1.
+
+    """
+
+    def __init__(self, *, x, y, width, height, tab_width, count, style_for,
+                 label_for=str, overscan=1):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.tab_width = tab_width
+        self.count = count
+        self._style_for = style_for
+        self._label_for = label_for
+        self._overscan = overscan
+        self._offset = 0
+        self.selected = None
+
+        # Statistics
+        self.rebinds = 0
+
+        self.group = displayio.Group(x=x, y=y)
+        slots = min(count, width // tab_width + 1 + 2 * overscan)
+        label_max = len(label_for(count - 1)) if count else 0
+        self._slots = []
+        self._slot_index = [-1] * slots
+        for _ in range(slots):
+            tab = PaddedButton(x=0, y=0, width=tab_width, height=height,
+                               label=label_for(0), label_max=label_max,
+                               button_style=style_for(0))
+            self._slots.append(tab)
+            self.group.append(tab.group)
+        self._layout()
+
+    @property
+    def max_offset(self):
+        """Largest scroll offset in pixels."""
+        total = self.count * self.tab_width - self.width
+        return total if total > 0 else 0
+
+    @property
+    def offset(self):
+        """Scroll offset in pixels of the left edge of the strip."""
+        return self._offset
+
+    @property
+    def first_visible(self):
+        """Index of the leftmost tab in view."""
+        return self._offset // self.tab_width
+
+    def scroll_to(self, offset):
+        """Scroll so ``offset`` pixels of tabs are off the left edge.  Returns True if
+        the strip moved."""
+        if offset < 0:
+            offset = 0
+        elif offset > self.max_offset:
+            offset = self.max_offset
+        if offset == self._offset:
+            return False
+        self._offset = offset
+        self._layout()
+        return True
+
+    def scroll_by(self, pixels):
+        """Scroll by ``pixels``; positive moves later tabs into view."""
+        return self.scroll_to(self._offset + pixels)
+
+    def ensure_visible(self, index):
+        """Scroll the least amount needed to show tab ``index`` in full."""
+        left = index * self.tab_width
+        if left < self._offset:
+            return self.scroll_to(left)
+        if left + self.tab_width > self._offset + self.width:
+            return self.scroll_to(left + self.tab_width - self.width)
+        return False
+
+    def select(self, index):
+        """Mark tab ``index`` as the current page and scroll it into view.  Returns True
+        if the strip moved."""
+        self.selected = index
+        return self.ensure_visible(index)
+
+    def contains(self, point):
+        """True if ``point`` is on the strip."""
+        return (self.x <= point[0] < self.x + self.width) and \
+            (self.y <= point[1] < self.y + self.height)
+
+    def hit(self, point):
+        """Return the index of the tab under ``point`` or None."""
+        if not self.contains(point):
+            return None
+        index = (point[0] - self.x + self._offset) // self.tab_width
+        return index if index < self.count else None
+
+    def _window_start(self):
+        slots = len(self._slots)
+        first = self._offset // self.tab_width - self._overscan
+        if first > self.count - slots:
+            first = self.count - slots
+        return first if first > 0 else 0
+
+    def _layout(self):
+        # Recycle slots that left the window for tabs that entered it, then place them
+        slots = len(self._slots)
+        first = self._window_start()
+        last = first + slots
+        slot_index = self._slot_index
+        for slot in range(slots):
+            index = slot_index[slot]
+            if first <= index < last:
+                continue
+            # Find the tab index in the window that no slot holds yet
+            for candidate in range(first, last):
+                if candidate not in slot_index:
+                    self._bind(slot, candidate)
+                    break
+        for slot in range(slots):
+            self._slots[slot].group.x = slot_index[slot] * self.tab_width - self._offset
+
+    def _bind(self, slot, index):
+        tab = self._slots[slot]
+        tab.button_style = self._style_for(index)
+        tab.label = self._label_for(index)
+        self._slot_index[slot] = index
+        self.rebinds += 1
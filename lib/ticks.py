@@ -0,0 +1,53 @@
+"""
+`ticks`
+================================================================================
+Millisecond tick counter and wrap-safe arithmetic on it.
+
+``time.monotonic()`` is a float, and CircuitPython floats only have 22 bits
+of mantissa, so after an hour or so of uptime it can no longer tell
+milliseconds apart and after a day it steps in large increments.
+``supervisor.ticks_ms()`` stays exact, but it is a 29 bit count that wraps
+every 6.2 days, so times must only ever be compared through ``ticks_diff``.
+
+* Author: Jason Pecor
+
+"""
+
+import time
+
+from micropython import const
+
+_PERIOD = const(1 << 29)
+_MASK = const(_PERIOD - 1)
+_HALF = const(_PERIOD // 2)
+
+try:
+    from supervisor import ticks_ms
+except ImportError:
+    def ticks_ms():
+        """Milliseconds from an arbitrary start, wrapping at 2**29."""
+        return int(time.monotonic() * 1000) & _MASK
+
+
+def ticks_us():
+    """Microseconds from an arbitrary start, wrapping at 2**29 like ``ticks_ms()`` so
+    ``ticks_diff`` works on it too.  ``time.monotonic_ns()`` is a long int on the
+    microcontroller, so this allocates: keep it for timing that is switched on to
+    measure, like the instrumentation hooks."""
+    return (time.monotonic_ns() // 1000) & _MASK
+
+
+def ticks_add(ticks, delta):
+    """Return ``ticks`` moved by ``delta`` milliseconds, wrapped like ``ticks_ms()``."""
+    return (ticks + delta) & _MASK
+
+
+def ticks_diff(end, start):
+    """Signed milliseconds from ``start`` to ``end``, correct across a wrap as long as
+    the two are less than 3.1 days apart."""
+    return ((end - start + _HALF) & _MASK) - _HALF
+
+
+def ticks_less(a, b):
+    """True if ``a`` is earlier than ``b``."""
+    return ticks_diff(b, a) > 0
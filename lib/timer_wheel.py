@@ -0,0 +1,159 @@
+"""
+`timer_wheel`
+================================================================================
+A hashed timer wheel: every pending timeout in the UI lives in one structure
+that is advanced once per tick, instead of each user polling its own clock.
+
+Time is divided into ticks and each tick maps to one of a fixed number of
+slots.  A timer is linked into the slot for the tick it is due in, so
+scheduling and cancelling are O(1) and each tick only looks at the timers in
+one slot.  Timers further out than one lap of the wheel simply stay put
+until the lap that they are due in.  Timers are owned and reused by the
+caller, so the steady state doesn't allocate.
+
+Times are ``ticks_ms`` milliseconds and are only ever compared through
+``ticks_diff()``, so timers keep their resolution however long the board has
+been up and fire correctly across the wrap.  Delays must stay under
+``2 ** 28`` ms, about three days.
+
+* Author: Jason Pecor
+
+"""
+
+from ticks import ticks_ms, ticks_add, ticks_diff
+
+
+class Timer():
+    # pylint: disable=too-few-public-methods
+    """A reusable timeout.
+
+    :param callback: Function called as ``callback(timer)`` when the timer fires.
+    :param arg: Anything the callback needs, available as ``timer.arg``.
+
+    """
+
+    def __init__(self, callback, arg=None):
+        self.callback = callback
+        self.arg = arg
+        self.due = 0          # ticks_ms time the timer should fire
+        self._slot = -1       # -1 when not scheduled
+        self._next = None
+        self._prev = None
+
+    @property
+    def active(self):
+        """True while the timer is scheduled."""
+        return self._slot >= 0
+
+
+class TimerWheel():
+    # pylint: disable=too-many-instance-attributes, protected-access
+    """Schedules Timers.
+
+    :param slots: Number of slots in the wheel. Defaults to 64.
+    :param tick: Resolution in seconds. Defaults to 0.01.
+    :param clock: Function returning the current time in milliseconds. Defaults to
+                  ``supervisor.ticks_ms``.
+
+    """
+
+    def __init__(self, *, slots=64, tick=0.01, clock=ticks_ms):
+        self.tick = tick
+        self.clock = clock
+        self._tick_ms = max(1, int(tick * 1000 + 0.5))
+        self._heads = [None] * slots
+        self._slots = slots
+        self._time = clock()      # time of the current tick
+        self._index = 0           # slot of the current tick
+        self.pending = 0
+
+        # Statistics
+        self.fired = 0
+        self.lateness_last = 0    # milliseconds between when a timer was due and when it fired
+        self.lateness_max = 0
+        self.lateness_total = 0
+
+    def schedule(self, timer, delay):
+        """Fire ``timer`` ``delay`` milliseconds from now, replacing any earlier schedule."""
+        self.schedule_at(timer, ticks_add(self.clock(), delay))
+
+    def schedule_at(self, timer, due):
+        """Fire ``timer`` at ``ticks_ms`` time ``due``, replacing any earlier schedule.
+        Times already past fire on the next tick."""
+        if timer._slot >= 0:
+            self._unlink(timer)
+        # Ticks from the current one to the first that is not before ``due``
+        ahead = -(-ticks_diff(due, self._time) // self._tick_ms)
+        if ahead < 1:
+            ahead = 1
+        slot = (self._index + ahead) % self._slots
+        timer.due = due
+        timer._slot = slot
+        timer._prev = None
+        head = self._heads[slot]
+        timer._next = head
+        if head is not None:
+            head._prev = timer
+        self._heads[slot] = timer
+        self.pending += 1
+
+    def cancel(self, timer):
+        """Stop ``timer`` if it is scheduled."""
+        if timer._slot >= 0:
+            self._unlink(timer)
+
+    def _unlink(self, timer):
+        if timer._prev is None:
+            self._heads[timer._slot] = timer._next
+        else:
+            timer._prev._next = timer._next
+        if timer._next is not None:
+            timer._next._prev = timer._prev
+        timer._next = timer._prev = None
+        timer._slot = -1
+        self.pending -= 1
+
+    def advance(self):
+        """Fire every timer that has come due.  Returns the number fired."""
+        now = self.clock()
+        tick_ms = self._tick_ms
+        behind = ticks_diff(now, self._time) // tick_ms
+        if behind > self._slots:
+            # Fell more than a lap behind; one pass over every slot catches up
+            skip = behind - self._slots
+            self._time = ticks_add(self._time, skip * tick_ms)
+            self._index = (self._index + skip) % self._slots
+            behind = self._slots
+        fired = 0
+        heads = self._heads
+        while behind > 0:
+            behind -= 1
+            self._time = time = ticks_add(self._time, tick_ms)
+            index = self._index + 1
+            if index == self._slots:
+                index = 0
+            self._index = index
+            timer = heads[index]
+            while timer is not None:
+                if ticks_diff(timer.due, time) > 0:
+                    timer = timer._next    # due on a later lap
+                    continue
+                self._unlink(timer)
+                lateness = ticks_diff(now, timer.due)
+                self.lateness_last = lateness
+                self.lateness_total += lateness
+                if lateness > self.lateness_max:
+                    self.lateness_max = lateness
+                self.fired += 1
+                fired += 1
+                timer.callback(timer)
+                # The callback may have rescheduled or cancelled timers; start the slot over
+                timer = heads[index]
+        return fired
+
+    def reset_stats(self):
+        """Clear the lateness statistics."""
+        self.fired = 0
+        self.lateness_last = 0
+        self.lateness_max = 0
+        self.lateness_total = 0
@@ -0,0 +1,162 @@
+"""
+`touch_input`
+================================================================================
+Debounced press/hold/release state machine for the PyPortal touchscreen with
+an adaptive polling interval.
+
+Poll ``update()`` from the main loop and sleep for ``interval`` seconds between
+calls.  The interval is short while a finger is down (or was recently down) and
+backs off to a slower idle rate otherwise.  Times are kept in ``ticks_ms``
+milliseconds so debouncing stays exact however long the board has been up.
+
+* Author: Jason Pecor
+
+"""
+
+from micropython import const
+from ticks import ticks_ms, ticks_diff
+
+# Events returned by update()
+NONE = const(0)
+PRESS = const(1)
+HOLD = const(2)
+RELEASE = const(3)
+
+# Internal states
+_UP = const(0)
+_DOWN = const(1)
+
+
+class TouchInput():
+    # pylint: disable=too-many-instance-attributes
+    """Touch input state machine.
+
+    :param touchscreen: Object with a ``touch_point`` property, e.g. ``pyportal.touchscreen``.
+    :param debounce: Seconds contact must be stable before a press or release is reported.
+    :param hold_time: Seconds a press must last before a HOLD event is reported.
+    :param fast_interval: Polling interval in seconds while touch is active.
+    :param idle_interval: Polling interval in seconds while idle.
+    :param idle_after: Seconds after the last release before backing off to ``idle_interval``.
+    :param clock: Function returning the current time in milliseconds. Defaults to
+                  ``supervisor.ticks_ms``.
+
+    """
+
+    def __init__(self, touchscreen, *, debounce=0.02, hold_time=0.5,
+                 fast_interval=0.01, idle_interval=0.1, idle_after=2.0,
+                 clock=ticks_ms):
+        self._touchscreen = touchscreen
+        self._debounce = int(debounce * 1000)
+        self._hold_time = int(hold_time * 1000)
+        self._idle_after = int(idle_after * 1000)
+        self.fast_interval = fast_interval
+        self.idle_interval = idle_interval
+        self._clock = clock
+
+        self._state = _UP
+        self._held = False
+        self._contact_start = None
+        self._release_start = None
+        self._press_time = 0
+        self._last_activity = None
+        self.point = None
+        self.sampled = False        # True if the last update() read a new point
+
+        # Statistics
+        self.polls = 0
+        self.latency_last = 0       # milliseconds from first contact to dispatch
+        self.latency_max = 0
+        self.latency_total = 0
+        self.latency_count = 0
+
+    @property
+    def pressed(self):
+        """True while a debounced touch is down."""
+        return self._state == _DOWN
+
+    @property
+    def held(self):
+        """True once the current press has lasted ``hold_time``."""
+        return self._held
+
+    @property
+    def press_duration(self):
+        """Seconds since the current press was reported, or 0 when up."""
+        if self._state != _DOWN:
+            return 0
+        return ticks_diff(self._clock(), self._press_time) / 1000
+
+    @property
+    def interval(self):
+        """Seconds the caller should wait before the next ``update()``."""
+        if (self._state == _DOWN) or (self._contact_start is not None):
+            return self.fast_interval
+        if (self._last_activity is not None) and \
+                (ticks_diff(self._clock(), self._last_activity) < self._idle_after):
+            return self.fast_interval
+        return self.idle_interval
+
+    def update(self):
+        """Sample the touchscreen once and return NONE, PRESS, HOLD or RELEASE."""
+        self.polls += 1
+        now = self._clock()
+        p = self._touchscreen.touch_point
+        self.sampled = False
+
+        if self._state == _UP:
+            if p is None:
+                self._contact_start = None
+                return NONE
+            if self._contact_start is None:
+                self._contact_start = now
+            if ticks_diff(now, self._contact_start) < self._debounce:
+                return NONE
+            self._state = _DOWN
+            self._held = False
+            self._release_start = None
+            self._press_time = now
+            self._last_activity = now
+            self.point = p
+            self.sampled = True
+            return PRESS
+
+        # _DOWN
+        if p is not None:
+            self._release_start = None
+            self._last_activity = now
+            self.point = p
+            self.sampled = True
+            if (not self._held) and (ticks_diff(now, self._press_time) >= self._hold_time):
+                self._held = True
+                return HOLD
+            return NONE
+        if self._release_start is None:
+            self._release_start = now
+        if ticks_diff(now, self._release_start) < self._debounce:
+            return NONE
+        self._state = _UP
+        self._contact_start = None
+        self._last_activity = now
+        return RELEASE
+
+    def mark_dispatched(self):
+        """Record the latency from first contact to now for the current press.
+
+        Call this once the PRESS event has been acted on.
+        """
+        if self._contact_start is None:
+            return
+        latency = ticks_diff(self._clock(), self._contact_start)
+        self.latency_last = latency
+        if latency > self.latency_max:
+            self.latency_max = latency
+        self.latency_total += latency
+        self.latency_count += 1
+
+    def reset_stats(self):
+        """Clear the poll and latency statistics."""
+        self.polls = 0
+        self.latency_last = 0
+        self.latency_max = 0
+        self.latency_total = 0
+        self.latency_count = 0
@@ -0,0 +1,292 @@
+"""
+`uart_link`
+================================================================================
+Non-blocking, framed command link over a UART.
+
+Commands are packed into small frames in a preallocated ring buffer and
+drained a few bytes at a time from the main loop, so a slow link never holds
+up touch handling.  Whatever has queued up since the last poll goes out in a
+single write.  Replies in the same frame format are parsed incrementally as
+they arrive.
+
+Frame format::
+
+    0x7E  type  length  payload[length]  checksum
+
+``checksum`` is the two's complement of the 8-bit sum of type, length and
+payload, so the sum of everything after the 0x7E is 0 modulo 256.  Command
+frames have type 0x01 and a 2 byte little endian command number.  Status
+frames have type 0x02 and free-form payload, e.g. text from the other end.
+Type 0x03 carries an encoded timing histogram and an empty 0x04 frame asks
+for them to be sent.  Label frames (0x05) carry a button id followed by new
+label text for that button.
+
+* Author: Jason Pecor
+
+"""
+
+from micropython import const
+
+FRAME_START = const(0x7E)
+FRAME_COMMAND = const(0x01)
+FRAME_STATUS = const(0x02)
+FRAME_STATS = const(0x03)
+FRAME_STATS_REQUEST = const(0x04)
+FRAME_LABEL = const(0x05)
+_OVERHEAD = const(4)     # start, type, length, checksum
+
+# FrameParser states
+_WAIT_START = const(0)
+_TYPE = const(1)
+_LENGTH = const(2)
+_PAYLOAD = const(3)
+_CHECKSUM = const(4)
+
+
+def checksum(data):
+    """Checksum of the bytes between the start byte and the checksum."""
+    total = 0
+    for value in data:
+        total += value
+    return (-total) & 0xFF
+
+
+class RingBuffer():
+    """Fixed-size byte FIFO backed by a preallocated bytearray.
+
+    :param size: Capacity in bytes.
+
+    """
+
+    def __init__(self, size):
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._size = size
+        self._head = 0     # next byte to read
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def size(self):
+        """Capacity in bytes."""
+        return self._size
+
+    @property
+    def free(self):
+        """Bytes that can still be written."""
+        return self._size - self._count
+
+    def put(self, value):
+        """Append one byte.  The caller checks ``free`` first."""
+        self._buffer[(self._head + self._count) % self._size] = value
+        self._count += 1
+
+    def peek(self, limit):
+        """Return a memoryview of up to ``limit`` contiguous queued bytes."""
+        end = self._head + min(limit, self._count)
+        if end > self._size:
+            end = self._size
+        return self._view[self._head:end]
+
+    def peek_into(self, buffer, limit):
+        """Copy up to ``limit`` queued bytes into ``buffer`` without allocating.
+        Returns the number copied."""
+        count = limit if limit < self._count else self._count
+        index = self._head
+        for i in range(count):
+            buffer[i] = self._buffer[index]
+            index += 1
+            if index == self._size:
+                index = 0
+        return count
+
+    def consume(self, count):
+        """Drop ``count`` bytes from the front."""
+        self._head = (self._head + count) % self._size
+        self._count -= count
+
+    def clear(self):
+        """Drop everything queued."""
+        self._head = 0
+        self._count = 0
+
+
+class FrameParser():
+    # pylint: disable=too-many-instance-attributes
+    """Incremental parser for received frames.
+
+    :param on_frame: Function called as ``on_frame(frame_type, payload)`` for each good
+                     frame.  ``payload`` is a memoryview that is only valid during the call.
+    :param max_payload: Largest payload accepted. Defaults to 255, the most the length
+                        byte can describe, so every well-formed frame is accepted.
+
+    """
+
+    def __init__(self, on_frame, *, max_payload=255):
+        self._on_frame = on_frame
+        self._payload = bytearray(max_payload)
+        self._view = memoryview(self._payload)
+        self._state = _WAIT_START
+        self._type = 0
+        self._length = 0
+        self._index = 0
+        self._sum = 0
+
+        # Statistics
+        self.frames = 0
+        self.errors = 0
+
+    def feed(self, data):
+        """Parse received bytes."""
+        for value in data:
+            state = self._state
+            if state == _WAIT_START:
+                if value == FRAME_START:
+                    self._state = _TYPE
+            elif state == _TYPE:
+                self._type = value
+                self._sum = value
+                self._state = _LENGTH
+            elif state == _LENGTH:
+                if value > len(self._payload):
+                    self.errors += 1
+                    self._state = _WAIT_START
+                    continue
+                self._length = value
+                self._index = 0
+                self._sum += value
+                self._state = _PAYLOAD if value else _CHECKSUM
+            elif state == _PAYLOAD:
+                self._payload[self._index] = value
+                self._index += 1
+                self._sum += value
+                if self._index == self._length:
+                    self._state = _CHECKSUM
+            else:
+                self._state = _WAIT_START
+                if (self._sum + value) & 0xFF:
+                    self.errors += 1
+                    continue
+                self.frames += 1
+                self._on_frame(self._type, self._view[:self._length])
+
+
+class CommandLink():
+    # pylint: disable=too-many-instance-attributes
+    """Queues command frames and drains them to a UART without blocking.
+
+    :param uart: The UART, e.g. ``busio.UART(board.D3, board.D4, baudrate=9600)``.
+    :param size: Ring buffer size in bytes. Defaults to 256.
+    :param chunk: Most bytes written per ``poll()`` or read per ``receive()``.  Bounds
+                  how long one poll can block: about 1 ms per byte at 9600 baud.
+                  Defaults to 16.
+    :param high_water: Fill level in bytes above which the link reports ``busy``.
+                       Defaults to three quarters of ``size``.
+    :param on_frame: Function called as ``on_frame(frame_type, payload)`` for each frame
+                     received by ``receive()``.
+
+    """
+
+    def __init__(self, uart, *, size=256, chunk=16, high_water=None, on_frame=None):
+        self._uart = uart
+        self._ring = RingBuffer(size)
+        # Scratch buffers with a view per length, so polling never allocates
+        self._tx_buffer = bytearray(chunk)
+        self._tx_views = [memoryview(self._tx_buffer)[:n] for n in range(chunk + 1)]
+        self._rx_buffer = bytearray(chunk)
+        self._rx_views = [memoryview(self._rx_buffer)[:n] for n in range(chunk + 1)]
+        self._parser = FrameParser(on_frame) if on_frame is not None else None
+        if high_water is None:
+            high_water = (size * 3) // 4
+        self.high_water = high_water
+
+        # Statistics
+        self.frames_queued = 0
+        self.frames_dropped = 0     # overflow: no room in the ring
+        self.backpressure = 0       # frames queued while above high_water
+        self.bytes_sent = 0
+        self.writes = 0
+
+    @property
+    def queued(self):
+        """Bytes waiting to be sent."""
+        return len(self._ring)
+
+    @property
+    def busy(self):
+        """True while the queue is above the high water mark."""
+        return len(self._ring) > self.high_water
+
+    def send_frame(self, frame_type, payload):
+        """Queue a frame.  Returns False and counts an overflow if it doesn't fit."""
+        length = len(payload)
+        ring = self._ring
+        if ring.free < length + _OVERHEAD:
+            self.frames_dropped += 1
+            return False
+        if len(ring) > self.high_water:
+            self.backpressure += 1
+        total = frame_type + length
+        ring.put(FRAME_START)
+        ring.put(frame_type)
+        ring.put(length)
+        for value in payload:
+            ring.put(value)
+            total += value
+        ring.put((-total) & 0xFF)
+        self.frames_queued += 1
+        return True
+
+    def send_command(self, command):
+        """Queue a command frame for ``command`` (0-65535)."""
+        ring = self._ring
+        if ring.free < 2 + _OVERHEAD:
+            self.frames_dropped += 1
+            return False
+        if len(ring) > self.high_water:
+            self.backpressure += 1
+        low = command & 0xFF
+        high = (command >> 8) & 0xFF
+        ring.put(FRAME_START)
+        ring.put(FRAME_COMMAND)
+        ring.put(2)
+        ring.put(low)
+        ring.put(high)
+        ring.put((-(FRAME_COMMAND + 2 + low + high)) & 0xFF)
+        self.frames_queued += 1
+        return True
+
+    def poll(self):
+        """Write up to ``chunk`` queued bytes in one write without allocating.  Returns the
+        number written."""
+        if not len(self._ring):
+            return 0
+        count = self._ring.peek_into(self._tx_buffer, len(self._tx_buffer))
+        written = self._uart.write(self._tx_views[count])
+        if written is None:    # timed out, nothing went out
+            return 0
+        self._ring.consume(written)
+        self.bytes_sent += written
+        self.writes += 1
+        return written
+
+    @property
+    def parser(self):
+        """The FrameParser for received frames, or None."""
+        return self._parser
+
+    def receive(self):
+        """Parse whatever has arrived, up to ``chunk`` bytes.  Returns the number read."""
+        waiting = self._uart.in_waiting
+        if not waiting:
+            return 0
+        if waiting > len(self._rx_buffer):
+            waiting = len(self._rx_buffer)
+        count = self._uart.readinto(self._rx_views[waiting])
+        if not count:
+            return 0
+        if self._parser is not None:
+            self._parser.feed(self._rx_views[count])
+        return count
@@ -0,0 +1,162 @@
+"""
+`ui_runtime`
+================================================================================
+Cooperative scheduler for the UI: touch polling, UART transmit and receive,
+HID macros and display refresh each run as their own periodic task.
+
+Tasks are ``asyncio`` tasks when the ``asyncio`` library is available and
+fall back to a simple round-robin loop otherwise.  Every task keeps latency
+(how late it started compared to its schedule) and overrun statistics.
+Schedules and statistics are kept in ``ticks_ms`` milliseconds and compared
+through ``ticks_diff()``, so a 10 ms period stays 10 ms however long the
+board has been up; periods are still given in seconds.
+
+* Author: Jason Pecor
+
+"""
+
+import time
+from ticks import ticks_ms, ticks_add, ticks_diff
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+
+class PeriodicTask():
+    # pylint: disable=too-many-instance-attributes, too-few-public-methods
+    """A function run every ``period`` seconds.  Created by ``UIRuntime.add_task()``.
+
+    :param name: Name used when reporting.
+    :param func: Function to call.  Takes no arguments.
+    :param period: Seconds between runs, or a function returning it.
+    :param priority: Higher runs first when several tasks are due.
+
+    """
+
+    def __init__(self, name, func, period, priority):
+        self.name = name
+        self.func = func
+        self.period = period
+        self.priority = priority
+        self.next_time = 0     # ticks_ms time of the next run
+
+        # Statistics; times in milliseconds
+        self.runs = 0
+        self.overruns = 0      # started a full period late or ran longer than a period
+        self.latency_last = 0
+        self.latency_max = 0
+        self.run_time_last = 0
+        self.run_time_max = 0
+
+    def interval(self):
+        """Seconds until the next run should start."""
+        if callable(self.period):
+            return self.period()
+        return self.period
+
+    def run(self, now, clock):
+        """Call the function and record its statistics.  ``now`` is the ``ticks_ms``
+        time the run started."""
+        latency = ticks_diff(now, self.next_time) if self.runs else 0
+        self.func()
+        end = clock()
+        # Read after the call: an adaptive period (e.g. touch) reacts to what this run saw
+        interval = int(self.interval() * 1000 + 0.5)
+        run_time = ticks_diff(end, now)
+
+        self.runs += 1
+        self.latency_last = latency
+        if latency > self.latency_max:
+            self.latency_max = latency
+        self.run_time_last = run_time
+        if run_time > self.run_time_max:
+            self.run_time_max = run_time
+        if (latency > interval) or (run_time > interval):
+            self.overruns += 1
+        self.next_time = ticks_add(now, interval)
+
+
+class UIRuntime():
+    """Runs periodic tasks cooperatively.
+
+    :param clock: Function returning the current time in milliseconds. Defaults to
+                  ``supervisor.ticks_ms``.
+
+    """
+
+    def __init__(self, *, clock=ticks_ms):
+        self._clock = clock
+        self.tasks = []
+
+    def add_task(self, name, func, *, period, priority=0):
+        """Add a task and return its PeriodicTask.
+
+        :param name: Name used when reporting.
+        :param func: Function to call.  Takes no arguments.
+        :param period: Seconds between runs, or a function returning it.
+        :param priority: Higher runs first when several tasks are due. Defaults to 0.
+        """
+        task = PeriodicTask(name, func, period, priority)
+        task.next_time = self._clock()
+        self.tasks.append(task)
+        self.tasks.sort(key=lambda t: -t.priority)
+        return task
+
+    def _higher_due(self, task, now):
+        # True if a higher priority task is waiting to run
+        for other in self.tasks:
+            if other.priority <= task.priority:
+                return False
+            if ticks_diff(now, other.next_time) >= 0:
+                return True
+        return False
+
+    async def _run_task(self, task):
+        clock = self._clock
+        while True:
+            now = clock()
+            # Let overdue higher priority tasks go first, but don't starve
+            for _ in range(len(self.tasks)):
+                if not self._higher_due(task, now):
+                    break
+                await asyncio.sleep(0)
+                now = clock()
+            task.run(now, clock)
+            delay = ticks_diff(task.next_time, clock())
+            await asyncio.sleep(delay / 1000 if delay > 0 else 0)
+
+    async def _main(self):
+        await asyncio.gather(*[asyncio.create_task(self._run_task(task))
+                               for task in self.tasks])
+
+    def run_once(self):
+        """Run every task that is due, highest priority first.  Returns seconds until
+        the next task is due."""
+        clock = self._clock
+        for task in self.tasks:
+            now = clock()
+            if ticks_diff(now, task.next_time) >= 0:
+                task.run(now, clock)
+        now = clock()
+        wait = None
+        for task in self.tasks:
+            due = ticks_diff(task.next_time, now)
+            if (wait is None) or (due < wait):
+                wait = due
+        return wait / 1000 if wait > 0 else 0
+
+    def run(self):
+        """Run the tasks forever."""
+        if asyncio is not None:
+            asyncio.run(self._main())
+        while True:
+            time.sleep(self.run_once())
+
+    def report(self):
+        """Print a line of statistics per task."""
+        for task in self.tasks:
+            print("{}: runs {} overruns {} latency {}/{} ms run {}/{} ms".format(
+                task.name, task.runs, task.overruns, task.latency_last, task.latency_max,
+                task.run_time_last, task.run_time_max))
@@ -8,231 +8,430 @@ Tabbed/paged user interface screen for the Adafruit PyPortal
 """
 
 import board
-import time
 import busio
+import displayio
+import usb_hid
 
 from adafruit_pyportal import PyPortal
 from adafruit_bitmap_font import bitmap_font
+import compact_font
 from adafruit_hid.keyboard import Keyboard
 from adafruit_hid.keyboard_layout_us import KeyboardLayoutUS
-from padded_button import PaddedButton
-from adafruit_display_shapes.rect import Rect
+from adafruit_hid.keycode import Keycode
+from hid_macros import MacroPlayer, find_keyboard_device
+from padded_button import PaddedButton, ButtonStyle
+from hit_grid import HitGrid
+import touch_input
+from touch_input import TouchInput
+from page_manager import PageManager
+from tab_strip import TabStrip
+import layout
+import gestures
+from gestures import SwipeDetector
+from page_cache import PageCache
+from dirty_rects import DirtyRects
+from shape_pool import default_pool, release_shapes
+from render_scheduler import RenderScheduler
+from uart_link import CommandLink, FRAME_STATUS, FRAME_STATS_REQUEST, FRAME_LABEL
+from ui_runtime import UIRuntime
+from timer_wheel import TimerWheel
+from hold_repeat import HoldRepeat
+from command_dispatch import CommandDispatcher, DROP_OLDEST
+import alloc_guard
+from instrumentation import Instrumentation
+from adafruit_display_text.label import Label
+
+# Printing each press formats strings, which allocates.  Turn this off for an
+# allocation-free dispatch path once the UI is set up the way you want it.
+VERBOSE = True
+
+# Measure heap use of the dispatch path at startup and warn if it allocates
+CHECK_ALLOCATIONS = False
+
+# Record timing histograms for the touch path.  Dump them by sending a stats
+# request frame over the UART.
+INSTRUMENT = False
+instruments = Instrumentation()
+touch_to_refresh = instruments.histogram("touch_to_refresh")
+loop_time = instruments.histogram("touch_task")
+if INSTRUMENT:
+    instruments.enable(PaddedButton)
 
 # Setup UART
-uart = busio.UART(board.D3, board.D4, baudrate=9600)
+# Commands go out as small framed packets, drained a few bytes per loop so the
+# 9600 baud link never stalls touch handling
+uart = busio.UART(board.D3, board.D4, baudrate=9600, timeout=0)
+
+# Frames that passed the checksum but couldn't be used, e.g. text that isn't UTF-8.
+# They are counted and dropped so bad input can't stop the UART task.
+bad_frames = 0
+
+def decode_text(payload):
+    """Return the UTF-8 text in payload, or None (and count a bad frame) if it isn't"""
+    global bad_frames   # pylint: disable=global-statement
+    try:
+        return str(bytes(payload), "utf-8")
+    except UnicodeError:
+        bad_frames += 1
+        return None
+
+def on_frame(frame_type, payload):
+    """Handle a frame received over the UART"""
+    if frame_type == FRAME_STATUS:
+        text = decode_text(payload)
+        if text is not None:
+            print("Status: {}".format(text))
+    elif frame_type == FRAME_STATS_REQUEST:
+        instruments.dump()
+        instruments.send(command_link)
+        dispatcher.report()
+    elif frame_type == FRAME_LABEL:
+        set_label(payload)
+
+def set_label(payload):
+    """Show a live value from the other end by updating a button label in place.
+    Text longer than the button's label_max is cut short; frames for unknown buttons
+    or with text that can't be shown are counted as bad and dropped."""
+    global bad_frames   # pylint: disable=global-statement
+    button = buttons_by_id.get(payload[0]) if len(payload) > 1 else None
+    if button is None:
+        bad_frames += 1
+        return
+    text = decode_text(payload[1:])
+    if text is None:
+        return
+    if len(text) > button.label_max:
+        text = text[:button.label_max]
+    try:
+        button.label = text
+    except RuntimeError:    # wider than the button
+        bad_frames += 1
+        return
+    render.invalidate()
+
+command_link = CommandLink(uart, size=256, chunk=16, on_frame=on_frame)
+
+# Pages, tabs, buttons, styles and key bindings are described in layout.json.
+# The first boot compiles it to layout.bin (when the filesystem is writable) and
+# later boots read that directly until layout.json changes.
+ui = layout.load_layout("/layout.json")
+if VERBOSE:
+    print("Layout loaded from {}".format("cache" if ui.from_cache else "layout.json"))
 
 # The buttons on the TFT display will send keycodes just like a standard keyboard
 keyboard = Keyboard()
 keyboard_layout = KeyboardLayoutUS(keyboard)
 
-# Load the font to be used on the buttons
-font = bitmap_font.load_font("/fonts/Dina.bdf")
+# Key macros are compiled to HID reports once here and played out one report
+# per loop pass, so a long macro doesn't freeze the touchscreen
+def bind_macros(player):
+    """Bind the layout's key macros to their commands"""
+    for command, kind, value in ui.bindings:
+        if kind == layout.KEYS:
+            value = tuple(getattr(Keycode, name) for name in value)
+        player.bind(command, value)
+
+macros = MacroPlayer(find_keyboard_device(usb_hid.devices), layout=keyboard_layout,
+                     interval=0.01)
+bind_macros(macros)
+
+# Load the font to be used on the buttons.  The compact font only holds the glyphs
+# used by the labels (see tools/compile_font.py); fall back to the full BDF.
+try:
+    font = compact_font.load_font("/fonts/Dina.cfnt")
+except OSError:
+    font = bitmap_font.load_font("/fonts/Dina.bdf")
 
 # Colors
 WHITE = 0xffffff
-BLUE = 0x094A85
-LIGHT_BLUE = 0x13BDF9
-DARK_BLUE = 0x0D2035
-LIGHT_GREEN = 0x009A6E
-GREEN = 0x45E83A
-ORANGE = 0xDF550F
-RED = 0xDB1308
-GREY = 0x3B3C3E
-BLACK = 0x000000
 
 # Prepare PyPortal for graphics 
 pyportal = PyPortal(default_bg=0x000000)
-button_margin = (2, 2)
-tab_margin = (0,0)
-page_margin = (0,0)
-
-page0_color = DARK_BLUE
-page1_color = RED
-page2_color = BLUE
-page3_color = ORANGE
-
-active_fill = DARK_BLUE
-active_outline = DARK_BLUE
-
-# Create the main page and buttons
-#
-# This code is a bit verbose and clumsy, and it can be streamlined by pre-defining
-# the sizes and anchor points for each button.  However, keeping it all here like
-# this provides some additional context for making sense of what is passed into the
-# init() function for each button which has proven helpful for me as I'm learning CP.
-#
-# Also, this uses a class called PaddedButton which is based on the Adafruit Button class
-# It provides additional arguments for margin and padding.  
+
+PAGE_COUNT = len(ui.pages)
 
 # Main background
-main_page = Rect(0, 0, 320, 200, fill=page0_color, outline=page0_color, stroke=0)
-
-# These buttons will serve as "tabs" at the bottom of the screen
-tab0 = PaddedButton(x=0, y=180, width=80, height=60,
-                    label="0", label_font=font, label_color=0xffffFF, label_y=40,
-                    fill_color=page0_color, outline_color=page0_color, style=1,
-                    selected_fill=page0_color, selected_outline=page0_color,
-                    margin=tab_margin, padding=(0, 0))
-
-tab1 = PaddedButton(x=80, y=180, width=80, height=60,
-                    label="1", label_font=font, label_color=0xffffFF, label_y=40,
-                    fill_color=page1_color, outline_color=page1_color, style=1,
-                    selected_fill=page1_color, selected_outline=page1_color,
-                    margin=tab_margin, padding=(0, 0))
-
-tab2 = PaddedButton(x=160, y=180, width=80, height=60,
-                    label="2", label_font=font, label_color=0xffffFF, label_y=40,
-                    fill_color=page2_color, outline_color=page2_color, style=1,
-                    selected_fill=page2_color, selected_outline=page2_color,
-                    margin=tab_margin, padding=(0, 0))
-
-tab3 = PaddedButton(x=240, y=180, width=80, height=60,
-                    label="3", label_font=font, label_color=0xffffFF, label_y=40,
-                    fill_color=page3_color, outline_color=page3_color, style=1,
-                    selected_fill=page3_color, selected_outline=page3_color,
-                    margin=tab_margin, padding=(0, 0))
-
-# Now for the actual buttons that do something worthwhile
-button_width = 80
-button_height = 60
-row1_y = 0
-row2_y = 110
-
-cmd00_button = PaddedButton(x=0, y=row1_y, width=button_width, height=button_height,
-                            fill_color=None, outline_color=0xFFFFFF,
-                            selected_outline=0x00ff00, selected_fill=0x00ff00,
-                            label="CMD 0", label_font=font, label_color=0xffffFF, id=0,
-                            style=1, margin=button_margin, padding=(5, 5))
-cmd01_button = PaddedButton(x=80, y=row1_y, width=button_width, height=button_height,
-                            fill_color=None, outline_color=0xFFFFFF,
-                            selected_outline=0x00ff00, selected_fill=0x00ff00,
-                            label="CMD 1", label_font=font, label_color=0xffffFF, id=1,
-                            style=1, margin=button_margin, padding=(5, 5))
-cmd02_button = PaddedButton(x=160, y=row1_y, width=button_width, height=button_height,
-                            fill_color=None, outline_color=0xFFFFFF,
-                            selected_outline=0x00ff00, selected_fill=0x00ff00,
-                            label="CMD 2", label_font=font, label_color=0xffffFF, id=2,
-                            style=1, margin=button_margin, padding=(5, 5))
-cmd03_button = PaddedButton(x=240, y=row1_y, width=button_width, height=button_height,
-                            fill_color=None, outline_color=0xFFFFFF,
-                            selected_outline=0x00ff00, selected_fill=0x00ff00,  
-                            label="CMD 3", label_font=font, label_color=0xffffFF, id=3,
-                            style=1, margin=button_margin, padding=(5, 5))
-
-cmd04_button = PaddedButton(x=0, y=row2_y, width=button_width, height=button_height,
-                            fill_color=None, outline_color=0xFFFFFF,
-                            selected_outline=0x00ff00, selected_fill=0x00ff00,
-                            label="CMD 4", label_font=font, label_color=0xffffFF, id=4,
-                            style=1, margin=button_margin, padding=(5, 5))
-cmd05_button = PaddedButton(x=80, y=row2_y, width=button_width, height=button_height,
-                            fill_color=None, outline_color=0xFFFFFF,
-                            selected_outline=0x00ff00, selected_fill=0x00ff00,
-                            label="CMD 5", label_font=font, label_color=0xffffFF, id=5,
-                            style=1, margin=button_margin, padding=(5, 5))
-cmd06_button = PaddedButton(x=160, y=row2_y, width=button_width, height=button_height,
-                            fill_color=None, outline_color=0xFFFFFF,
-                            selected_outline=0x00ff00, selected_fill=0x00ff00,
-                            label="CMD 6", label_font=font, label_color=0xffffFF, id=6,
-                            style=1, margin=button_margin, padding=(5, 5))
-cmd07_button = PaddedButton(x=240, y=row2_y, width=button_width, height=button_height,
-                            fill_color=None, outline_color=0xFFFFFF,
-                            selected_outline=0x00ff00, selected_fill=0x00ff00,
-                            label="CMD 7", label_font=font, label_color=0xffffFF, id=7,
-                            style=1, margin=button_margin, padding=(5, 5))
-
-# Add all of the buttons to a list
-pages = [main_page]
+area_x, area_y, area_width, area_height = ui.area
+page_color = ui.pages[0][1]
+main_page = default_pool.rect(area_x, area_y, area_width, area_height,
+                              fill=page_color, outline=page_color, stroke=0)
+
+# Buttons that look alike share one ButtonStyle instead of each keeping their own
+# copies of the colors, font, margin and padding.
+styles = {name: ButtonStyle(label_font=font, **style) for name, style in ui.styles.items()}
+tab_style = styles[ui.tabs["style"]]
+
+def page_tab_style(color):
+    """Tab style for a page: the tab is drawn in the page color whether selected or not"""
+    return tab_style.derive(fill_color=color, outline_color=color,
+                            selected_fill=color, selected_outline=color)
+
+# The "tabs" at the bottom of the screen.  Only the tabs in view (plus one either
+# side) exist as buttons; they are recycled as the strip is dragged sideways.
+tab_strip = TabStrip(x=ui.tabs["x"], y=ui.tabs["y"], width=ui.tabs["width"],
+                     height=ui.tabs["height"], tab_width=ui.tabs["tab_width"], count=PAGE_COUNT,
+                     style_for=lambda i: page_tab_style(ui.pages[i][1]))
+
+# Now for the actual buttons that do something worthwhile.
+# PaddedButton is based on the Adafruit Button class, with margin and padding added.
+buttons = [PaddedButton(x=b["x"], y=b["y"], width=b["width"], height=b["height"],
+                        label=b["label"], id=b["id"], label_max=b["label_max"],
+                        button_style=styles[b["style"]])
+           for b in ui.buttons]
+
+buttons_by_id = {button.id: button for button in buttons}
 
-tabs = [tab0,
-        tab1,
-        tab2,
-        tab3]
-
-buttons =  [cmd00_button,
-            cmd01_button,
-            cmd02_button,
-            cmd03_button,
-            cmd04_button,
-            cmd05_button,
-            cmd06_button,
-            cmd07_button
-          ]
+pages = [main_page]
 
 # And add to the display
 touchables = []  # This is an awful name, but can't think of anything better
 
-for tab in tabs:
-    pyportal.splash.append(tab.group)
-    touchables.append(tab)
+pyportal.splash.append(tab_strip.group)  # tab strip does its own hit-testing
 for page in pages:
     pyportal.splash.append(page)  # main page is not a touch-responsive object - don't add to touchables
+
+# Per-page content is built on first view and swapped in here
+page_content = displayio.Group()
+pyportal.splash.append(page_content)
+
 for button in buttons:
     pyportal.splash.append(button.group)
     touchables.append(button)
 
-active_page = 0
+# Cell lookup over the screen so a touch doesn't scan every button
+hit_grid = HitGrid(touchables, width=320, height=240)
+
+# Page titles are changed in place on a page switch, so each holds the longest name
+TITLE_MAX = max(len(name) for name, _ in ui.pages)
+
+def build_page(page):
+    """Build the content for a page the first time it is shown"""
+    group = displayio.Group()
+    try:
+        title = Label(font, text=page.name, color=WHITE, max_glyphs=TITLE_MAX)
+    except TypeError:   # newer adafruit_display_text sizes the label itself
+        title = Label(font, text=page.name, color=WHITE)
+    title.x = (320 - title.bounding_box[2]) // 2
+    title.y = 85    # between the two rows of buttons
+    group.append(title)
+    return group
+
+# Pages come from the layout: each page's color and name, with content built on demand.
+# Command numbers are handed out sequentially per page unless given explicitly.
+# Built pages are kept in a small LRU cache and rebuilt if they get evicted.
+# Page switches only touch what differs between the two pages; the areas they
+# change, and those of button color and label changes, are recorded here and
+# counted as pixels pushed by the next refresh.
+dirty = DirtyRects(width=320, height=240)
+for button in buttons:
+    button.dirty = dirty
+page_manager = PageManager(main_page, buttons, content=page_content,
+                           cache=PageCache(max_pages=2, min_free=8192,
+                                           on_evict=release_shapes),
+                           dirty=dirty)
+for name, color in ui.pages:
+    page_manager.add_page(color=color, name=name, builder=build_page)
+page_manager.show(0)
+tab_strip.select(0)
+
+selected_button = None
+
+def run_command(command):
+    """Send a command over the UART and play its key macro"""
+    if VERBOSE:
+        print("Running command {}".format(command))
+    command_link.send_command(command)
+    macros.play(command)
+
+# Presses look up their command in a table compiled from the pages.  Commands are
+# queued and drained by their own task: a duplicate of a command still waiting is
+# merged into it, each command runs at most every 50 ms, and nothing is taken off
+# the queue while the UART is backed up.
+dispatcher = CommandDispatcher(run_command, queue_size=16, overflow=DROP_OLDEST,
+                               min_interval=0.05, ready=lambda: not command_link.busy)
+dispatcher.compile([page.commands for page in page_manager.pages],
+                   page_manager.button_ids)
+
+# Long-press and auto-repeat timeouts for every button share one timer wheel,
+# advanced by its own task below
+timers = TimerWheel(slots=64, tick=0.01)
+hold_repeat = HoldRepeat(timers, lambda button, command: dispatcher.submit(command))
+for button, config in zip(buttons, ui.buttons):
+    hold_repeat.configure(button, long_press=config["long_press"],
+                          long_press_command=config["long_press_command"],
+                          repeat_delay=config["repeat_delay"],
+                          repeat_interval=config["repeat_interval"])
+
+# Changes from each touch event are pushed to the screen as one refresh
+render = RenderScheduler(board.DISPLAY, fps=30, dirty=dirty)
+render.invalidate()
 
 # Capture touch actions
-last_p = None  # Will be used to trap Off->On touch transition
-
-while True:
-
-    p = pyportal.touchscreen.touch_point
-
-    if (p is not None) & (last_p is None):  # Only catch the Off->On transition
-
-        (y, x, z) = p
-
-        for i, b in enumerate(touchables):
-
-            if b.contains(p):
-
-                b.selected = True
-                command = (10 * int(active_page)) + b.id
-                
-                # Not doing anything wiht the buttons right now.
-                # Just dumping out the associated command
-                if (b in buttons):
-                    print("Button {} pressed on page {}. Running command {}".format(b.label,active_page,command))
-
-                # Change the active page with the tab
-                if b == tab0:
-                    active_page = 0
-                    print("Setting active page to {}".format(active_page))
-                    active_fill = active_outline = page0_color
-                    main_page.fill= page0_color
-                    main_page.outline= page0_color
-
-                elif b == tab1:
-                    active_page = 1
-                    print("Setting active page to {}".format(active_page))
-                    active_fill = active_outline = page1_color
-                    main_page.fill= page1_color
-                    main_page.outline= page1_color
-                    
-                elif b == tab2:
-                    active_page = 2
-                    print("Setting active page to {}".format(active_page))
-                    active_fill = active_outline = page2_color
-                    main_page.fill= page2_color
-                    main_page.outline= page2_color
-                    
-                elif b == tab3:
-                    active_page = 3
-                    print("Setting active page to {}".format(active_page))
-                    active_fill = active_outline = page3_color
-                    main_page.fill = page3_color
-                    main_page.outline= page3_color
-
-            else:
-                b.selected = False
+# Debounced press/hold/release tracking.  Polls quickly while a finger is down
+# and backs off to a slower rate when the screen has been idle for a while.
+touch = TouchInput(pyportal.touchscreen, debounce=0.02, hold_time=0.5,
+                   fast_interval=0.01, idle_interval=0.1, idle_after=2.0)
+
+# Horizontal swipes on the page background move to the next or previous page
+swipe = SwipeDetector(size=8, smoothing=1, min_distance=60, min_speed=200)
+
+def strip_moved():
+    """Record the tab strip as changed; scrolling moves every tab in it"""
+    dirty.add(tab_strip.x, tab_strip.y, tab_strip.width, tab_strip.height)
+
+def show_page(page):
+    """Switch to a page and bring its tab into view.  Used by tab taps and swipes."""
+    page_manager.show(page)
+    if tab_strip.select(page):
+        strip_moved()
+    if VERBOSE:
+        print("Setting active page to {} ({} pixels to push)".format(page, dirty.pixels))
+
+def dispatch(p):
+    """Act on a press at touch point p"""
+    global selected_button   # pylint: disable=global-statement
+
+    b = hit_grid.hit(p)
+
+    if (selected_button is not None) and (selected_button is not b):
+        selected_button.selected = False
+    selected_button = b
+
+    if b is None:
+        return
+
+    b.selected = True
+
+    # Queue the associated command to go out over the UART
+    command = dispatcher.press(page_manager.active, b.id)
+    if VERBOSE and (command is not None):
+        print("Button {} pressed on page {}. Queued command {}".format(b.label,page_manager.active,command))
+    hold_repeat.press(b, command)
+
+def release_buttons():
+    """Toggle buttons back off when released.  This is a no-op for buttons
+    that are already showing the right colors."""
+    for button in buttons:
+        button.selected = False
+    hold_repeat.release()
+
+# Dragging the tab strip scrolls it; a tap that doesn't move selects the page
+TAP_SLOP = 10   # pixels a tap may wander and still count as a tap
+drag_start = None
+drag_x = 0
+
+def poll_touch():
+    """Sample the touchscreen and act on presses and releases"""
+    global pending_touch, drag_start, drag_x   # pylint: disable=global-statement
+    if INSTRUMENT:
+        loop_time.start()
+
+    event = touch.update()
+
+    if event == touch_input.PRESS:  # Only catch the Off->On transition
+        if INSTRUMENT:
+            touch_to_refresh.start()
+            pending_touch = True
+        p = touch.point
+        if tab_strip.contains(p):
+            drag_start = drag_x = p[0]
+        else:
+            dispatch(p)
+            if selected_button is None:   # on the page background
+                swipe.begin(p)
+        touch.mark_dispatched()
+        render.invalidate()
+
+    elif touch.pressed:
+        # Polls while a release is being debounced read no new point
+        if touch.sampled:
+            if swipe.active:
+                swipe.add(touch.point)
+            elif drag_start is not None:
+                x = touch.point[0]
+                if tab_strip.scroll_by(drag_x - x):
+                    strip_moved()
+                    render.invalidate()
+                drag_x = x
 
     else:
-        # Toggle buttons back off when released
-        for button in buttons:
-            button.selected = False
-            button.fillcolor = active_fill        
-
-    # Capture state of p to setup one-shot compare
-    time.sleep(0.5)
-    last_p = p
+        release_buttons()
+        if event == touch_input.RELEASE:
+            if drag_start is not None:
+                if abs(drag_x - drag_start) <= TAP_SLOP:
+                    page = tab_strip.hit(touch.point)
+                    if page is not None:
+                        show_page(page)
+                drag_start = None
+            gesture = swipe.end()
+            page = page_manager.active
+            if (gesture == gestures.SWIPE_LEFT) and (page + 1 < PAGE_COUNT):
+                show_page(page + 1)
+            elif (gesture == gestures.SWIPE_RIGHT) and (page > 0):
+                show_page(page - 1)
+            render.invalidate()
+
+    if INSTRUMENT:
+        loop_time.stop()
+
+pending_touch = False
+
+def refresh():
+    """Push pending display changes, timing the first refresh after each press"""
+    global pending_touch   # pylint: disable=global-statement
+    if render.update() and pending_touch:
+        touch_to_refresh.stop()
+        pending_touch = False
+
+if CHECK_ALLOCATIONS:
+    # The check runs the real dispatch path, but against stand-in devices so that
+    # nothing goes out over the UART or reaches the host as a key press.  Its
+    # dispatcher has no rate limit, so every press runs its command all the way
+    # to the stand-ins instead of being merged into the one still waiting.
+    verbose, VERBOSE = VERBOSE, False
+    probe_link = CommandLink(alloc_guard.NullDevice(), size=256, chunk=16)
+    probe_macros = MacroPlayer(alloc_guard.NullDevice(), layout=keyboard_layout, interval=0)
+    bind_macros(probe_macros)
+    probe_dispatcher = CommandDispatcher(run_command, queue_size=16, overflow=DROP_OLDEST,
+                                         min_interval=0, ready=lambda: not command_link.busy)
+    probe_dispatcher.compile([page.commands for page in page_manager.pages],
+                             page_manager.button_ids)
+    probe = (buttons[0].x + 10, buttons[0].y + 10, 0)
+
+    def swap_probe():
+        """Swap the stand-ins with the real link, macros and dispatcher"""
+        global command_link, macros, dispatcher   # pylint: disable=global-statement
+        global probe_link, probe_macros, probe_dispatcher   # pylint: disable=global-statement
+        command_link, probe_link = probe_link, command_link
+        macros, probe_macros = probe_macros, macros
+        dispatcher, probe_dispatcher = probe_dispatcher, dispatcher
+
+    def press_and_release():
+        """One press of a command button followed by the release, with the command
+        sent and its macro played out"""
+        dispatch(probe)
+        release_buttons()
+        dispatcher.poll()
+        while command_link.poll():
+            pass
+        while macros.busy:
+            macros.poll()
+
+    swap_probe()
+    alloc_guard.check("Touch dispatch", press_and_release)
+    swap_probe()
+    hold_repeat.release()
+    selected_button = None
+    VERBOSE = verbose
+
+# Each job runs as its own cooperative task.  Touch polling follows the adaptive
+# interval from TouchInput; higher priority tasks go first when several are due.
+runtime = UIRuntime()
+runtime.add_task("touch", poll_touch, period=lambda: touch.interval, priority=4)
+runtime.add_task("uart_tx", command_link.poll, period=0.01, priority=2)
+runtime.add_task("uart_rx", command_link.receive, period=0.02, priority=2)
+runtime.add_task("hid", macros.poll, period=macros.interval, priority=3)
+runtime.add_task("timers", timers.advance, period=timers.tick, priority=3)
+runtime.add_task("dispatch", dispatcher.poll, period=0.01, priority=3)
+runtime.add_task("render", refresh, period=1 / render.fps, priority=1)
+runtime.run()
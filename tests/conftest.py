@@ -0,0 +1,155 @@
+"""Host test setup: CircuitPython modules come from ``tests/stubs`` and the UI
+modules from ``lib``, as they would from CIRCUITPY/lib on the board."""
+
+import builtins
+import os
+import re
+import shutil
+import sys
+import time
+
+import pytest
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(_HERE)
+sys.path.insert(0, os.path.join(ROOT, "lib"))
+sys.path.insert(0, os.path.join(_HERE, "stubs"))
+
+
+class FakeClock():
+    """Clock for the ``clock=`` parameters.  Returns seconds as a float, or
+    milliseconds through ``ticks_ms``, wrapping at 2**29 like supervisor.ticks_ms."""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def ticks_ms(self):
+        return int(round(self.now * 1000)) & ((1 << 29) - 1)
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def frame(frame_type, payload):
+    """Encode a UART frame the way the other end of the link sends it."""
+    body = bytes([frame_type, len(payload)]) + bytes(payload)
+    return b"\x7e" + body + bytes([(-sum(body)) & 0xFF])
+
+
+class _Stop(Exception):
+    pass
+
+
+class Simulation():
+    """Runs ``pyportal_paged_ui.py`` on the stubs with a fake clock, a scripted
+    touchscreen and a fake UART until ``seconds`` of simulated time have passed.
+
+    ``contacts`` are (start, end, (x0, y0), (x1, y1)) strokes, the finger moving in a
+    straight line; ``incoming`` are (time, bytes) arriving on the UART.  Times are
+    seconds from boot.  The script's globals are kept in ``namespace``.
+    """
+
+    def __init__(self, tmp_path, monkeypatch):
+        self.root = tmp_path
+        self._monkeypatch = monkeypatch
+        self.clock = FakeClock()
+        self.start = self.clock.now
+        self.namespace = {}
+        self.sleeps = 0
+        shutil.copytree(os.path.join(ROOT, "fonts"), os.path.join(str(tmp_path), "fonts"))
+        shutil.copy2(os.path.join(ROOT, "layout.json"), os.path.join(str(tmp_path), "layout.json"))
+
+    def path(self, name):
+        """Where a file in the board's root directory is kept."""
+        return os.path.join(str(self.root), name.lstrip("/"))
+
+    def _local(self, name):
+        if isinstance(name, str) and name.startswith(("/layout", "/fonts/")):
+            return self.path(name)
+        return name
+
+    def _patch(self, module, name):
+        real = getattr(module, name)
+        self._monkeypatch.setattr(module, name,
+                                  lambda path, *args, **kwargs: real(self._local(path),
+                                                                     *args, **kwargs))
+
+    def _fresh_modules(self):
+        # Modules keep ``time.monotonic`` as a default argument and the stubs keep
+        # device state, so the script gets its own copies of both
+        for name, module in list(sys.modules.items()):
+            filename = getattr(module, "__file__", None) or ""
+            if filename.startswith((os.path.join(ROOT, "lib"), os.path.join(_HERE, "stubs"))):
+                self._monkeypatch.delitem(sys.modules, name)
+        self._monkeypatch.setitem(sys.modules, "asyncio", None)
+
+    def run(self, seconds, *, contacts=(), incoming=(), flags=None):
+        """Boot the script and run it.  ``flags`` replaces the values of settings at the
+        top of the script, e.g. ``{"VERBOSE": False}``.  Returns the namespace."""
+        clock = self.clock
+        start = self.start
+        incoming = sorted(incoming)
+        monkeypatch = self._monkeypatch
+
+        def sleep(delay):
+            self.sleeps += 1
+            clock.advance(max(delay, 0.001))
+            uart = self.namespace.get("uart")
+            while incoming and (incoming[0][0] <= clock.now - start) and (uart is not None):
+                uart.incoming.extend(incoming.pop(0)[1])
+            if clock.now - start >= seconds:
+                raise _Stop()
+
+        def touch_point(_):
+            now = clock.now - start
+            for begin, end, (x0, y0), (x1, y1) in contacts:
+                if begin <= now < end:
+                    fraction = (now - begin) / (end - begin)
+                    return (int(x0 + (x1 - x0) * fraction), int(y0 + (y1 - y0) * fraction), 30000)
+            return None
+
+        monkeypatch.setattr(time, "monotonic", clock)
+        monkeypatch.setattr(time, "sleep", sleep)
+        monkeypatch.setattr(builtins, "open", _Redirect(builtins.open, self._local))
+        for name in ("stat", "remove", "rename"):
+            self._patch(os, name)
+        self._fresh_modules()
+        import adafruit_pyportal    # pylint: disable=import-outside-toplevel
+        adafruit_pyportal.Touchscreen.touch_point = property(touch_point)
+
+        with open(os.path.join(ROOT, "pyportal_paged_ui.py")) as source:
+            text = source.read()
+        for name, value in (flags or {}).items():
+            text, count = re.subn(r"^{} = .*$".format(name), "{} = {!r}".format(name, value),
+                                  text, flags=re.M)
+            assert count == 1, name
+        code = compile(text, "pyportal_paged_ui.py", "exec")
+        self.namespace = {"__name__": "__main__"}
+        try:
+            exec(code, self.namespace)    # pylint: disable=exec-used
+        except _Stop:
+            pass
+        return self.namespace
+
+
+class _Redirect():
+    # ``open`` with board paths mapped into the simulation's directory
+    def __init__(self, real, local):
+        self._real = real
+        self._local = local
+
+    def __call__(self, name, *args, **kwargs):
+        return self._real(self._local(name), *args, **kwargs)
+
+
+@pytest.fixture
+def simulation(tmp_path, monkeypatch):
+    return Simulation(tmp_path, monkeypatch)
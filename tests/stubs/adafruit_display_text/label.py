@@ -0,0 +1,55 @@
+"""Host stand-in for adafruit_display_text.label.  Like the library, the label is a
+Group with a TileGrid per glyph that are reused when the text changes, and its
+color is entry 1 of its own Palette.  It is 12 pixels high."""
+
+import displayio
+
+
+class Label(displayio.Group):
+    def __init__(self, font, *, text="", color=0xFFFFFF, max_glyphs=None, **kwargs):
+        super().__init__(x=kwargs.get("x", 0), y=kwargs.get("y", 0))
+        self.font = font
+        self.palette = displayio.Palette(2)
+        self.palette.make_transparent(0)
+        self.palette[1] = color
+        self._text = None
+        self._width = 0
+        self.text = text
+
+    @property
+    def color(self):
+        return self.palette[1]
+
+    @color.setter
+    def color(self, color):
+        self.palette[1] = color
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        self._text = text
+        x = 0
+        count = 0
+        for char in text:
+            glyph = self.font.get_glyph(ord(char)) if self.font is not None else None
+            if glyph is None:
+                continue
+            if count < len(self):
+                tile = self[count]
+                tile.bitmap = glyph.bitmap
+                tile.x = x
+            else:
+                self.append(displayio.TileGrid(glyph.bitmap, pixel_shader=self.palette,
+                                               x=x, y=glyph.dy - glyph.height + 6))
+            count += 1
+            x += glyph.shift_x
+        while len(self) > count:
+            self.pop()
+        self._width = x
+
+    @property
+    def bounding_box(self):
+        return (0, -6, self._width, 12)
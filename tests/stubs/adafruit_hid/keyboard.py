@@ -0,0 +1,6 @@
+"""Host stand-in for adafruit_hid.keyboard."""
+
+
+class Keyboard():
+    def __init__(self, devices=None):
+        self.devices = devices
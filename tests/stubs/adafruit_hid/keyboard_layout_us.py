@@ -0,0 +1,15 @@
+"""Host stand-in for adafruit_hid.keyboard_layout_us, covering letters, space and newline."""
+
+
+class KeyboardLayoutUS():
+    def __init__(self, keyboard):
+        self.keyboard = keyboard
+
+    def keycodes(self, char):
+        if char == "\n":
+            return (0x28,)
+        if char.isalpha() and char.isupper():
+            return (0xE1, 4 + ord(char.lower()) - ord("a"))
+        if char.isalpha():
+            return (4 + ord(char) - ord("a"),)
+        return (0x2C,)
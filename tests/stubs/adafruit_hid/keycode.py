@@ -0,0 +1,21 @@
+"""Host stand-in for adafruit_hid.keycode."""
+
+
+class Keycode():
+    A = 0x04
+    C = 0x06
+    V = 0x19
+    ENTER = 0x28
+    ESCAPE = 0x29
+    F1 = 0x3A
+    F2 = 0x3B
+    F3 = 0x3C
+    F4 = 0x3D
+    F5 = 0x3E
+    F6 = 0x3F
+    F7 = 0x40
+    F8 = 0x41
+    CONTROL = 0xE0
+    LEFT_CONTROL = 0xE0
+    SHIFT = 0xE1
+    LEFT_SHIFT = 0xE1
@@ -0,0 +1,19 @@
+"""Host stand-in for adafruit_pyportal with a scripted touchscreen.  Tests put touch
+points (or None) in ``touchscreen.script``; one is read per ``touch_point`` access."""
+
+import displayio
+
+
+class Touchscreen():
+    def __init__(self):
+        self.script = []
+
+    @property
+    def touch_point(self):
+        return self.script.pop(0) if self.script else None
+
+
+class PyPortal():
+    def __init__(self, **kwargs):
+        self.splash = displayio.Group()
+        self.touchscreen = Touchscreen()
@@ -0,0 +1,17 @@
+"""Host stand-in for board with a display that counts refreshes."""
+
+D3 = "D3"
+D4 = "D4"
+
+
+class _Display():
+    def __init__(self):
+        self.auto_refresh = True
+        self.refreshes = 0
+
+    def refresh(self, **kwargs):
+        self.refreshes += 1
+        return True
+
+
+DISPLAY = _Display()
@@ -0,0 +1,24 @@
+"""Host stand-in for busio.UART: writes are collected and reads come from ``incoming``."""
+
+
+class UART():
+    def __init__(self, tx=None, rx=None, *, baudrate=9600, timeout=1, **kwargs):
+        self.baudrate = baudrate
+        self.sent = bytearray()
+        self.incoming = bytearray()
+        self.writes = 0
+
+    def write(self, data):
+        self.sent.extend(data)
+        self.writes += 1
+        return len(data)
+
+    @property
+    def in_waiting(self):
+        return len(self.incoming)
+
+    def readinto(self, buffer):
+        count = min(len(buffer), len(self.incoming))
+        buffer[:count] = self.incoming[:count]
+        del self.incoming[:count]
+        return count
@@ -0,0 +1,96 @@
+"""Host stand-in for CircuitPython's displayio, enough for the UI code and tests."""
+
+
+class Bitmap():
+    def __init__(self, width, height, value_count):
+        if width <= 0 or height <= 0:
+            raise ValueError("Bitmap size must be positive")
+        self.width = width
+        self.height = height
+        self.value_count = value_count
+        self._data = bytearray(width * height)
+
+    def __setitem__(self, index, value):
+        x, y = index if isinstance(index, tuple) else (index % self.width, index // self.width)
+        self._data[y * self.width + x] = value
+
+    def __getitem__(self, index):
+        x, y = index if isinstance(index, tuple) else (index % self.width, index // self.width)
+        return self._data[y * self.width + x]
+
+    def fill(self, value):
+        for i in range(len(self._data)):
+            self._data[i] = value
+
+
+class Palette():
+    # Count of color writes across every palette, for tests
+    writes = 0
+
+    def __init__(self, color_count):
+        self._colors = [0] * color_count
+        self._transparent = set()
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __setitem__(self, index, color):
+        Palette.writes += 1
+        self._colors[index] = color
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def make_transparent(self, index):
+        self._transparent.add(index)
+
+    def make_opaque(self, index):
+        self._transparent.discard(index)
+
+    def is_transparent(self, index):
+        return index in self._transparent
+
+
+class TileGrid():
+    def __init__(self, bitmap, *, pixel_shader, x=0, y=0, **kwargs):
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self.x = x
+        self.y = y
+        self.hidden = False
+
+
+class Group():
+    def __init__(self, *, x=0, y=0, scale=1, max_size=None):
+        self.x = x
+        self.y = y
+        self.scale = scale
+        self.hidden = False
+        self._children = []
+
+    def append(self, item):
+        self._children.append(item)
+
+    def insert(self, index, item):
+        self._children.insert(index, item)
+
+    def remove(self, item):
+        self._children.remove(item)
+
+    def pop(self, index=-1):
+        return self._children.pop(index)
+
+    def index(self, item):
+        return self._children.index(item)
+
+    def __getitem__(self, index):
+        return self._children[index]
+
+    def __setitem__(self, index, item):
+        self._children[index] = item
+
+    def __len__(self):
+        return len(self._children)
+
+    def __iter__(self):
+        return iter(self._children)
@@ -0,0 +1,7 @@
+"""Host stand-in for supervisor.  ticks_ms wraps at 2**29 like the real one."""
+
+import time
+
+
+def ticks_ms():
+    return int(time.monotonic() * 1000) & ((1 << 29) - 1)
@@ -0,0 +1,14 @@
+"""Host stand-in for usb_hid with one keyboard device that records its reports."""
+
+
+class Device():
+    def __init__(self, usage_page=0x01, usage=0x06):
+        self.usage_page = usage_page
+        self.usage = usage
+        self.reports = []
+
+    def send_report(self, report, report_id=None):
+        self.reports.append(bytes(report))
+
+
+devices = [Device()]
@@ -0,0 +1,68 @@
+"""The press/release path doesn't allocate once warmed up, and checking that at
+boot doesn't send anything."""
+
+import alloc_guard
+from conftest import frame
+
+BIG = 2 ** 29 - 1
+# CPython boxes every int above 256, so counters, millisecond times and the
+# dirty pixel count that MicroPython keeps in the pointer show up here as a few
+# int-sized blocks
+INT_BLOCK = alloc_guard.allocated_per_call(lambda: BIG + 1)
+BOXED_INTS = 5
+
+
+def test_fallback_sees_memory_freed_within_the_call():
+    assert alloc_guard.allocated_per_call(lambda: [0] * 1000) >= 8000
+    assert alloc_guard.allocated_per_call(lambda: None) == 0
+    assert not alloc_guard.check("list", lambda: [0] * 1000)
+    assert alloc_guard.check("nothing", lambda: None)
+
+
+def test_null_device():
+    device = alloc_guard.NullDevice()
+    assert device.write(b"abc") == 3
+    assert device.readinto(bytearray(4)) == 0
+    device.send_report(bytes(8))
+
+
+def test_boot_check_sends_nothing(simulation, capsys):
+    ns = simulation.run(0.5, flags={"CHECK_ALLOCATIONS": True})
+    assert bytes(ns["uart"].sent) == b""
+    assert ns["macros"]._device.reports == []    # pylint: disable=protected-access
+    assert ns["dispatcher"].submitted == 0 and ns["dispatcher"].queued == 0
+    assert not any(button.selected for button in ns["buttons"])
+    assert "Running command" not in capsys.readouterr().out
+
+
+def test_press_and_release_does_not_allocate(simulation):
+    ns = simulation.run(0.1, flags={"CHECK_ALLOCATIONS": True, "VERBOSE": False})
+    press_and_release = ns["press_and_release"]
+    ns["swap_probe"]()
+    dispatcher = ns["dispatcher"]
+    dispatched = dispatcher.dispatched
+    sent = ns["command_link"].bytes_sent
+    reports = ns["macros"].reports_sent
+    allocated = alloc_guard.allocated_per_call(press_and_release, warmup=10, iterations=200)
+    print("\npress and release: {:.1f} bytes per call on the host ({} per boxed int)".format(
+        allocated, INT_BLOCK))
+    assert allocated <= BOXED_INTS * INT_BLOCK
+    # Every press ran its command: sent as a frame and played as key reports
+    assert dispatcher.dispatched - dispatched == 210 and dispatcher.merged == 0
+    assert ns["command_link"].bytes_sent - sent == 210 * len(frame(0x01, b"\0\0"))
+    assert ns["macros"].reports_sent - reports == 2 * 210
+
+    # The same measurement catches the path starting to allocate.  On the host it is
+    # the peak of each call, which the boxed ints freed part way through already
+    # reach, so the list is kept as a leak would be rather than dropped at once.
+    kept = []
+
+    def with_list():
+        press_and_release()
+        kept.append([0] * 16)
+    assert alloc_guard.allocated_per_call(with_list, iterations=200) > \
+        BOXED_INTS * INT_BLOCK
+
+    ns["VERBOSE"] = True
+    assert alloc_guard.allocated_per_call(press_and_release, iterations=20) > \
+        BOXED_INTS * INT_BLOCK
@@ -0,0 +1,58 @@
+"""Bytes per button with a shared ButtonStyle against a style per button."""
+
+import tracemalloc
+
+from adafruit_bitmap_font import bitmap_font
+
+from padded_button import PaddedButton, ButtonStyle
+from shape_pool import ShapePool
+
+FONT = bitmap_font.load_font("/fonts/Dina.bdf")
+COLORS = dict(fill_color=0x0000FF, outline_color=0xFFFFFF, label_font=FONT,
+              label_color=0xFFFFFF, padding=(4, 4))
+
+
+def build(count, shared):
+    pool = ShapePool()
+    style = ButtonStyle(**COLORS)
+    buttons = []
+    for i in range(count):
+        position = dict(x=(i % 4) * 80, y=(i // 4) % 4 * 60, width=80, height=60,
+                        label="B{}".format(i % 100), id=i, shape_pool=pool)
+        if shared:
+            buttons.append(PaddedButton(button_style=style, **position))
+        else:
+            buttons.append(PaddedButton(**position, **COLORS))
+    return buttons
+
+
+def bytes_per_button(count, shared):
+    # Warm up the label and bitmap caches shared by every button
+    build(count, True)
+    build(count, False)
+    tracemalloc.start()
+    buttons = build(count, shared)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(buttons) == count
+    return used / count
+
+
+def test_shared_style_uses_less_memory_per_button():
+    print()
+    for count in (12, 100, 500):
+        shared = bytes_per_button(count, True)
+        separate = bytes_per_button(count, False)
+        print("{:4d} buttons: {:6.0f} B/button shared style, {:6.0f} B/button own style"
+              .format(count, shared, separate))
+        assert shared < separate
+
+
+def test_selected_variants_are_shared():
+    buttons = build(100, True)
+    styles = {id(button.button_style) for button in buttons}
+    for button in buttons:
+        button.update(fill=0xFF0000)
+    styles_after = {id(button.button_style) for button in buttons}
+    assert len(styles) == 1
+    assert len(styles_after) == 1
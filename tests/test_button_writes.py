@@ -0,0 +1,64 @@
+"""PaddedButton only pushes colors that changed, so idle frames write nothing."""
+
+import displayio
+from adafruit_bitmap_font import bitmap_font
+
+from padded_button import PaddedButton, ButtonStyle
+from page_manager import PageManager
+from shape_pool import ShapePool
+
+FONT = bitmap_font.load_font("/fonts/Dina.bdf")
+
+
+def make_ui():
+    pool = ShapePool()
+    style = ButtonStyle(fill_color=0x0000FF, outline_color=0xFFFFFF, label_font=FONT,
+                        label_color=0xFFFFFF)
+    buttons = [PaddedButton(x=80 * (i % 4), y=110 * (i // 4), width=80, height=60,
+                            label="B{}".format(i), id=i, button_style=style, shape_pool=pool)
+               for i in range(8)]
+    background = pool.rect(0, 0, 320, 200, fill=0x0000FF, outline=0x0000FF)
+    pages = PageManager(background, buttons)
+    for color in (0x0000FF, 0xFF0000):
+        pages.add_page(color=color)
+    pages.show(0)
+    return pages, buttons
+
+
+def idle_frame(pages, buttons, selected):
+    # Everything a frame re-asserts when nothing has happened
+    pages.show(pages.active)
+    for button in buttons:
+        button.selected = button is selected
+        button.update(selected=button is selected, fill=pages.color)
+        button.label = "B{}".format(button.id)
+
+
+def test_idle_frames_write_nothing():
+    pages, buttons = make_ui()
+    buttons[2].selected = True
+    palette_writes = displayio.Palette.writes
+    writes_total = PaddedButton.writes_total
+    for _ in range(1000):
+        idle_frame(pages, buttons, buttons[2])
+    print("\n1000 idle frames: {} palette writes, {} button color writes".format(
+        displayio.Palette.writes - palette_writes, PaddedButton.writes_total - writes_total))
+    assert displayio.Palette.writes == palette_writes
+    assert PaddedButton.writes_total == writes_total
+
+
+def test_changes_write_only_what_differs():
+    pages, buttons = make_ui()
+    writes = PaddedButton.writes_total
+    # Fill, outline and label all invert
+    buttons[0].selected = True
+    assert PaddedButton.writes_total - writes == 3
+    assert buttons[0].writes == 3
+    # Back again, and a page change repaints only the fills
+    buttons[0].selected = False
+    writes = PaddedButton.writes_total
+    pages.show(1)
+    assert PaddedButton.writes_total - writes == len(buttons)
+    writes = PaddedButton.writes_total
+    idle_frame(pages, buttons, None)
+    assert PaddedButton.writes_total == writes
@@ -0,0 +1,109 @@
+"""CommandDispatcher with over a thousand bindings: a press costs the same however
+many commands are bound, and how many commands per second it gets through and
+how long they wait in the queue."""
+
+import random
+import time
+
+from command_dispatch import CommandDispatcher
+
+BUTTONS = 8
+
+
+def build(pages, clock, **kwargs):
+    handled = []
+    dispatcher = CommandDispatcher(handled.append, clock=clock.ticks_ms, **kwargs)
+    commands = [range(page * BUTTONS, (page + 1) * BUTTONS) for page in range(pages)]
+    dispatcher.compile(commands, BUTTONS)
+    return dispatcher, handled
+
+
+def press_cost(dispatcher, pages, presses=20000):
+    # Host seconds per press() and poll() of a random command
+    rng = random.Random(pages)
+    picks = [(rng.randrange(pages), rng.randrange(BUTTONS)) for _ in range(presses)]
+    start = time.perf_counter()
+    for page, button_id in picks:
+        dispatcher.press(page, button_id)
+        dispatcher.poll()
+    return (time.perf_counter() - start) / presses
+
+
+def test_table_lookup(clock):
+    dispatcher, handled = build(150, clock)
+    assert dispatcher.command_for(0, 0) == 0
+    assert dispatcher.command_for(149, 7) == 149 * BUTTONS + 7
+    assert dispatcher.command_for(150, 0) is None
+    assert dispatcher.command_for(0, BUTTONS) is None
+    assert dispatcher.press(123, 4) == 123 * BUTTONS + 4
+    assert dispatcher.poll() == 1
+    assert handled == [123 * BUTTONS + 4]
+
+
+def test_press_cost_does_not_grow_with_bindings(clock):
+    results = []
+    for pages in (2, 16, 150, 1000):
+        dispatcher, _ = build(pages, clock)
+        press_cost(dispatcher, pages, 2000)    # warm up
+        results.append((pages * BUTTONS, press_cost(dispatcher, pages)))
+    print()
+    for bindings, cost in results:
+        print("{:5d} bindings: {:.2f} us per press and poll".format(bindings, cost * 1e6))
+    assert results[-1][1] < 3 * results[0][1]
+
+
+def test_throughput_and_latency(clock):
+    # A thousand and twenty four bindings, ten of them rate limited to 20 per second,
+    # driven by bursts of presses while poll() runs every 10 ms like its task
+    pages = 128
+    dispatcher, handled = build(pages, clock, queue_size=16)
+    for command in range(10):
+        dispatcher.bind(command, handled.append, min_interval=0.05)
+    rng = random.Random(4)
+    polls = 0
+    busy = 0
+    for _ in range(1000):
+        for _ in range(rng.randrange(1, 7)):
+            dispatcher.press(rng.randrange(pages), rng.randrange(BUTTONS))
+        start = time.perf_counter()
+        dispatcher.poll()
+        busy += time.perf_counter() - start
+        polls += 1
+        clock.advance(0.01)
+    while dispatcher.queued:
+        dispatcher.poll()
+        clock.advance(0.01)
+
+    assert dispatcher.dispatched + dispatcher.merged + dispatcher.dropped == dispatcher.submitted
+    assert len(handled) == dispatcher.dispatched
+    mean = dispatcher.latency_total / dispatcher.dispatched
+    print("\n{} bindings: {} submitted, {} run ({:.0f} per second), {} merged, {} dropped".format(
+        pages * BUTTONS, dispatcher.submitted, dispatcher.dispatched,
+        dispatcher.dispatched / (polls * 0.01), dispatcher.merged, dispatcher.dropped))
+    print("queue peak {}, latency mean {:.1f} ms max {:.1f} ms, {:.1f} us per poll".format(
+        dispatcher.queue_peak, mean, dispatcher.latency_max, busy / polls * 1e6))
+    # Four runs per poll keep up with an average of 3.5 presses per poll, so bursts
+    # rarely overflow and nothing waits longer than a full queue takes to drain
+    assert dispatcher.dropped < dispatcher.submitted // 100
+    assert dispatcher.latency_max <= (16 // 4 + 1) * 10 + 50
+
+
+def test_rate_limit_across_wrap_and_long_idle(clock):
+    clock.now = (1 << 29) / 1000 - 0.02     # ticks_ms wraps 20 ms in
+    dispatcher, handled = build(1, clock, min_interval=0.05)
+    times = []
+    for _ in range(30):
+        dispatcher.press(0, 0)
+        if dispatcher.poll():
+            times.append(clock.ticks_ms())
+        clock.advance(0.01)
+    # One run per 50 ms while the button repeats every 10 ms, wrap or not
+    gaps = [(b - a) % (1 << 29) for a, b in zip(times, times[1:])]
+    assert gaps == [50] * 5
+    clock.advance(0.05)
+    assert dispatcher.poll() == 1 and not dispatcher.queued
+    # Idle for half a wrap period: the old next_time mustn't hold the command back
+    clock.advance((1 << 28) / 1000 - 0.01)
+    dispatcher.press(0, 0)
+    assert dispatcher.poll() == 1
+    assert dispatcher.latency_last == 0
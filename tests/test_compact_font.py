@@ -0,0 +1,90 @@
+"""Compact font loading against the BDF it was compiled from: same glyphs, less
+time and heap at boot."""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import displayio
+from fontio import Glyph
+
+import compact_font
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+import compile_font    # pylint: disable=wrong-import-position
+
+BDF = os.path.join(ROOT, "fonts", "Dina.bdf")
+CFNT = os.path.join(ROOT, "fonts", "Dina.cfnt")
+
+
+def label_chars():
+    return compile_font.scan_labels([os.path.join(ROOT, "pyportal_paged_ui.py"),
+                                     os.path.join(ROOT, "layout.json")]) | set(compile_font.ALWAYS)
+
+
+def load_bdf(chars):
+    # What the BDF path costs: parse the text font and build a Bitmap per glyph drawn
+    _, parsed = compile_font.parse_bdf(BDF)
+    glyphs = {}
+    for char in chars:
+        width, height, dx, dy, shift_x, shift_y, rows = parsed[ord(char)]
+        bitmap = displayio.Bitmap(max(width, 1), max(height, 1), 2)
+        for y, row in enumerate(rows):
+            for x in range(width):
+                if row[x >> 3] & (0x80 >> (x & 7)):
+                    bitmap[x, y] = 1
+        glyphs[ord(char)] = Glyph(bitmap, 0, width, height, dx, dy, shift_x, shift_y)
+    return glyphs
+
+
+def load_compact(chars):
+    font = compact_font.load_font(CFNT)
+    font.load_glyphs(chars)
+    return font
+
+
+def measure(load, chars, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        load(chars)
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    result = load(chars)
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, kept, peak
+
+
+def test_compact_font_matches_bdf():
+    chars = label_chars()
+    font = load_compact(chars)
+    reference = load_bdf(chars)
+    for char in chars:
+        glyph = font.get_glyph(ord(char))
+        expected = reference[ord(char)]
+        assert glyph is not None, char
+        assert glyph.shift_x == expected.shift_x
+        assert glyph.width == expected.width
+        # Rows are trimmed, so compare the pixels on the baseline grid
+        for y in range(glyph.height):
+            source_y = y + (expected.height - glyph.height) - (glyph.dy - expected.dy)
+            for x in range(glyph.width):
+                assert glyph.bitmap[x, y] == expected.bitmap[x, source_y], char
+    # Only the compiled subset is present
+    assert font.get_glyph(ord("~")) is None
+
+
+def test_boot_time_and_heap():
+    chars = label_chars()
+    bdf_time, bdf_kept, bdf_peak = measure(load_bdf, chars)
+    cfnt_time, cfnt_kept, cfnt_peak = measure(load_compact, chars)
+    print("\n{} label glyphs".format(len(chars)))
+    print("BDF     {:7.2f} ms  peak {:7d} B  kept {:6d} B  ({} byte file)".format(
+        bdf_time * 1e3, bdf_peak, bdf_kept, os.path.getsize(BDF)))
+    print("compact {:7.2f} ms  peak {:7d} B  kept {:6d} B  ({} byte file)".format(
+        cfnt_time * 1e3, cfnt_peak, cfnt_kept, os.path.getsize(CFNT)))
+    assert cfnt_time < bdf_time
+    assert cfnt_peak * 10 < bdf_peak
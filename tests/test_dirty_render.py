@@ -0,0 +1,113 @@
+"""The areas recorded in DirtyRects cover every pixel a change alters: redrawing
+only those areas of a fake framebuffer gives the same picture as redrawing the
+whole screen, for presses, label updates, page switches and strip scrolls."""
+
+WIDTH = 320
+HEIGHT = 240
+
+
+def render(root):
+    """Draw the displayio tree under ``root`` into a list of 0xRRGGBB pixels."""
+    pixels = [0] * (WIDTH * HEIGHT)
+
+    def draw(item, x, y):
+        if item.hidden:
+            return
+        x += item.x
+        y += item.y
+        if not hasattr(item, "bitmap"):    # a Group
+            for child in item:
+                draw(child, x, y)
+            return
+        bitmap = item.bitmap
+        palette = item.pixel_shader
+        for by in range(bitmap.height):
+            sy = y + by
+            if not 0 <= sy < HEIGHT:
+                continue
+            for bx in range(bitmap.width):
+                sx = x + bx
+                value = bitmap[bx, by]
+                if 0 <= sx < WIDTH and not palette.is_transparent(value):
+                    pixels[sy * WIDTH + sx] = palette[value]
+
+    draw(root, 0, 0)
+    return pixels
+
+
+def full_repaint(ns):
+    """Pixels a page switch pushed before switches were diffed: the background,
+    every button body and the new page's title."""
+    pixels = ns["area_width"] * ns["area_height"]
+    for button in ns["buttons"]:
+        _, _, width, height = button._body_box    # pylint: disable=protected-access
+        pixels += width * height
+    _, _, width, height = ns["page_content"][0][0].bounding_box
+    return pixels + width * height
+
+
+def check(ns, screen, name, results):
+    """Copy only the dirty areas of a full redraw onto ``screen`` and compare."""
+    dirty = ns["dirty"]
+    full = render(ns["pyportal"].splash)
+    rects = [dirty.rect(i) for i in range(len(dirty))]
+    # Every area was kept, not just counted
+    assert sum(width * height for _, _, width, height in rects) == dirty.pixels
+    for x, y, width, height in rects:
+        for row in range(y, y + height):
+            start = row * WIDTH + x
+            screen[start:start + width] = full[start:start + width]
+    changed = sum(1 for a, b in zip(screen, full) if a != b)
+    results.append((name, len(rects), dirty.pixels))
+    dirty.clear()
+    assert changed == 0, "{}: {} pixels changed outside the dirty areas".format(name, changed)
+
+
+def test_dirty_areas_cover_every_change(simulation):
+    ns = simulation.run(0.5, flags={"VERBOSE": False})
+    ns["dirty"].clear()
+    screen = render(ns["pyportal"].splash)
+    button = ns["buttons"][0]
+    point = (button.x + 10, button.y + 10, 0)
+    results = []
+
+    ns["dispatch"](point)
+    check(ns, screen, "press", results)
+    ns["release_buttons"]()
+    check(ns, screen, "release", results)
+    ns["set_label"](bytes([button.id]) + b"42")
+    check(ns, screen, "label", results)
+    ns["show_page"](1)
+    check(ns, screen, "page 0 to 1", results)
+    ns["show_page"](2)
+    check(ns, screen, "page 1 to 2", results)
+    ns["show_page"](ns["PAGE_COUNT"] - 1)
+    check(ns, screen, "scroll to last page", results)
+    ns["show_page"](0)
+    check(ns, screen, "back to page 0", results)
+
+    print()
+    for name, rects, pixels in results:
+        print("{:22s} {:2d} areas {:6d} pixels ({:.0%} of the screen)".format(
+            name, rects, pixels, pixels / (WIDTH * HEIGHT)))
+    assert all(pixels for _, _, pixels in results)
+    # Page transitions push less than the full repaint they used to be
+    old = full_repaint(ns)
+    print("full repaint of a page   {:6d} pixels".format(old))
+    for name, _, pixels in results[3:]:
+        assert pixels < old, "{}: {} pixels, {} before".format(name, pixels, old)
+
+
+def test_page_titles_change_in_place(simulation):
+    ns = simulation.run(0.5, flags={"VERBOSE": False})
+    page_manager = ns["page_manager"]
+    content = ns["page_content"]
+    shown = content[0]
+    ns["show_page"](1)
+    ns["show_page"](2)
+    # The same Group stays on screen; each cached page still holds its own title
+    assert content[0] is shown
+    assert shown[0].text == page_manager.pages[2].name
+    for index in page_manager.cache._order:    # pylint: disable=protected-access
+        group = page_manager.cache.get(index, None)
+        assert group[0].text == page_manager.pages[index].name
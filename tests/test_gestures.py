@@ -0,0 +1,131 @@
+"""SwipeDetector fed through TouchInput the way the UI feeds it, using strokes
+recorded from the PyPortal touchscreen at its 10 ms fast polling rate."""
+
+import time
+import tracemalloc
+
+import gestures
+import touch_input
+from gestures import SwipeDetector
+from touch_input import TouchInput
+
+# (milliseconds, x, y) as read from the touchscreen
+FLICK_LEFT = [(0, 261, 129), (10, 243, 134), (20, 222, 130), (30, 209, 134), (40, 185, 133),
+              (50, 170, 132), (60, 152, 134), (70, 129, 134), (80, 114, 138), (90, 92, 136),
+              (100, 74, 140), (110, 58, 137)]
+FLICK_RIGHT = [(0, 51, 93), (10, 66, 89), (20, 92, 92), (30, 112, 87), (40, 133, 90),
+               (50, 152, 85), (60, 171, 84), (70, 195, 90), (80, 213, 85), (90, 236, 83)]
+TAP = [(0, 161, 117), (10, 161, 119), (20, 161, 123), (30, 162, 118), (40, 157, 121),
+       (50, 161, 122), (60, 158, 119), (70, 157, 121), (80, 162, 117)]
+# Dragged most of the way, then the finger rests before lifting
+SLOW_DRAG = [(0, 251, 97), (20, 237, 102), (40, 228, 100), (60, 214, 100), (80, 207, 99),
+             (100, 192, 99), (120, 187, 102), (140, 178, 101), (160, 167, 103),
+             (180, 167, 102), (200, 158, 100), (220, 155, 104), (240, 150, 102),
+             (260, 142, 104), (280, 142, 103), (300, 132, 103), (320, 134, 101),
+             (340, 132, 103), (360, 130, 107), (380, 128, 104), (400, 121, 104),
+             (420, 124, 101), (440, 120, 107), (460, 123, 102), (480, 124, 104),
+             (500, 120, 104), (520, 118, 107), (540, 121, 103), (560, 119, 106),
+             (580, 118, 101)]
+VERTICAL = [(0, 148, 42), (10, 150, 50), (20, 154, 69), (30, 157, 77), (40, 158, 91),
+            (50, 158, 103), (60, 163, 119), (70, 164, 133), (80, 168, 144), (90, 167, 160),
+            (100, 175, 172), (110, 175, 186), (120, 178, 199), (130, 175, 210)]
+
+
+class RecordedTouchscreen():
+    # Plays back a recorded stroke starting at ``start`` seconds
+    def __init__(self, clock, trace, start):
+        self._clock = clock
+        self._trace = trace
+        self._start = start
+
+    @property
+    def touch_point(self):
+        elapsed = round((self._clock() - self._start) * 1000)
+        if elapsed < 0 or elapsed > self._trace[-1][0]:
+            return None
+        point = None
+        for t, x, y in self._trace:
+            if t > elapsed:
+                break
+            point = (x, y, 30000)
+        return point
+
+
+def play(clock, trace):
+    """Run a stroke through TouchInput and SwipeDetector as ``poll_touch`` does.
+    Returns the gesture, the detector and the number of points read while pressed."""
+    touch = TouchInput(RecordedTouchscreen(clock, trace, clock.now + 0.1),
+                       debounce=0.02, hold_time=0.5, fast_interval=0.01,
+                       clock=clock.ticks_ms)
+    swipe = SwipeDetector(size=8, smoothing=1, min_distance=60, min_speed=200,
+                          clock=clock.ticks_ms)
+    gesture = None
+    sampled = 0
+    while gesture is None:
+        event = touch.update()
+        if event == touch_input.PRESS:
+            swipe.begin(touch.point)
+            sampled += 1
+        elif touch.pressed:
+            if touch.sampled:
+                swipe.add(touch.point)
+                sampled += 1
+        elif event == touch_input.RELEASE:
+            gesture = swipe.end()
+        clock.advance(touch.interval)
+    return gesture, swipe, sampled
+
+
+def test_recorded_strokes(clock):
+    assert play(clock, FLICK_LEFT)[0] == gestures.SWIPE_LEFT
+    assert play(clock, FLICK_RIGHT)[0] == gestures.SWIPE_RIGHT
+    assert play(clock, TAP)[0] == gestures.NONE
+    assert play(clock, SLOW_DRAG)[0] == gestures.NONE
+    assert play(clock, VERTICAL)[0] == gestures.NONE
+
+
+def test_release_debounce_adds_no_samples(clock):
+    # The polls after the finger lifts repeat the last point; adding them as new
+    # samples would make a flick look like it slowed down at the end
+    _, swipe, sampled = play(clock, FLICK_LEFT)
+    assert swipe.samples == sampled
+    # The debounce swallows the first 20 ms of the stroke; the rest is read once per poll
+    assert sampled == len(FLICK_LEFT) - 2
+
+
+def test_strokes_across_tick_wrap(clock):
+    # The flick starts 50 ms before supervisor.ticks_ms wraps back to 0
+    clock.now = ((1 << 29) - 150) / 1000
+    assert play(clock, FLICK_LEFT)[0] == gestures.SWIPE_LEFT
+    clock.now = ((1 << 29) - 150) / 1000
+    assert play(clock, TAP)[0] == gestures.NONE
+
+
+def test_cost_per_sample(clock):
+    swipe = SwipeDetector(clock=clock.ticks_ms)
+    swipe.begin((261, 129, 30000))
+    points = [(x, y, 30000) for _, x, y in FLICK_LEFT]
+    for point in points:    # warm up
+        swipe.add(point)
+
+    def strokes(count):
+        for _ in range(count):
+            for point in points:
+                clock.advance(0.01)
+                swipe.add(point)
+
+    start = time.perf_counter()
+    strokes(1000)
+    per_sample = (time.perf_counter() - start) / (1000 * len(points))
+
+    # Fixed size ring buffer: what is kept doesn't grow with the stroke
+    tracemalloc.start()
+    strokes(10)
+    before = tracemalloc.get_traced_memory()[0]
+    strokes(1000)
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print("\nSwipeDetector.add: {:.2f} us per sample, {} bytes kept".format(
+        per_sample * 1e6, grown))
+    assert grown <= 0
+    assert per_sample < 50e-6
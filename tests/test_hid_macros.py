@@ -0,0 +1,103 @@
+"""MacroPlayer against a fake HID keyboard: report order and time blocked per poll."""
+
+import time
+
+import pytest
+import usb_hid
+from adafruit_hid.keycode import Keycode
+from adafruit_hid.keyboard_layout_us import KeyboardLayoutUS
+
+from hid_macros import MacroPlayer, find_keyboard_device
+
+RELEASE = bytes(8)
+
+
+class FakeKeyboard():
+    # Records reports; each one takes ``cost`` seconds of the fake clock, like a USB
+    # write waiting for the host to poll
+    def __init__(self, clock, cost=0.001):
+        self.clock = clock
+        self.cost = cost
+        self.reports = []
+
+    def send_report(self, report):
+        self.reports.append(bytes(report))
+        self.clock.advance(self.cost)
+
+
+def report(*keys, modifiers=0):
+    return bytes([modifiers, 0] + list(keys) + [0] * (6 - len(keys)))
+
+
+def play_all(player, clock, step=0.001, limit=10000):
+    polls = 0
+    while player.busy and polls < limit:
+        player.poll()
+        clock.advance(step)
+        polls += 1
+    return polls
+
+
+def test_finds_boot_keyboard():
+    assert find_keyboard_device(usb_hid.devices) is usb_hid.devices[0]
+    with pytest.raises(ValueError):
+        find_keyboard_device([])
+
+
+def test_report_order(clock):
+    keyboard = FakeKeyboard(clock)
+    player = MacroPlayer(keyboard, layout=KeyboardLayoutUS(None), clock=clock.ticks_ms)
+    player.bind(1, Keycode.F1)
+    player.bind(2, [(Keycode.CONTROL, Keycode.C), "Hi", Keycode.ENTER])
+    player.play(1)
+    player.play(2)
+    play_all(player, clock)
+    assert keyboard.reports == [
+        report(Keycode.F1), RELEASE,
+        report(Keycode.C, modifiers=0x01), RELEASE,
+        report(0x0B, modifiers=0x02), RELEASE,     # shift-h
+        report(0x0C), RELEASE,
+        report(Keycode.ENTER), RELEASE]
+    assert player.macros_played == 2
+    assert player.reports_sent == 10
+
+
+def test_reports_are_spaced_by_interval(clock):
+    keyboard = FakeKeyboard(clock, cost=0)
+    player = MacroPlayer(keyboard, interval=0.01, clock=clock.ticks_ms)
+    player.bind(1, [Keycode.A] * 5)
+    player.play(1)
+    polls = play_all(player, clock, step=0.001)
+    assert len(keyboard.reports) == 10
+    assert polls >= 9 * 10
+
+
+def test_queue_overflow(clock):
+    player = MacroPlayer(FakeKeyboard(clock), queue_size=2, clock=clock.ticks_ms)
+    player.bind(1, Keycode.A)
+    assert [player.play(1) for _ in range(3)] == [True, True, False]
+    assert player.macros_dropped == 1
+    assert not player.play(99)
+
+
+def test_too_many_keys():
+    player = MacroPlayer(FakeKeyboard(None))
+    with pytest.raises(ValueError):
+        player.compile(tuple(range(4, 11)))
+
+
+def test_blocking_per_poll_is_one_report(clock):
+    keyboard = FakeKeyboard(clock, cost=0.001)
+    player = MacroPlayer(keyboard, layout=KeyboardLayoutUS(None), interval=0.01, clock=clock.ticks_ms)
+    text = "The quick brown fox jumps over the lazy dog\n" * 4
+    player.bind(1, text)
+    player.play(1)
+    start = time.perf_counter()
+    polls = play_all(player, clock, limit=100000)
+    elapsed = time.perf_counter() - start
+    print("\n{} reports over {} polls: at most {:.1f} ms blocked per poll, host "
+          "{:.2f} us per poll".format(player.reports_sent, polls,
+                                      player.poll_time_max, elapsed * 1e6 / polls))
+    assert player.reports_sent == 2 * len(text)
+    # However long the macro, a poll only ever waits for one report
+    assert player.poll_time_max == round(keyboard.cost * 1000)
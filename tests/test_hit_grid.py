@@ -0,0 +1,108 @@
+"""HitGrid agrees with a linear scan and checks far fewer buttons per lookup."""
+
+import random
+import time
+
+from hit_grid import HitGrid
+
+
+class CountingButton():
+    # Just the parts of a PaddedButton that HitGrid uses
+    checks = 0
+
+    def __init__(self, x, y, width, height):
+        self.bounds = (x, y, x + width - 1, y + height - 1)
+        self._hit_index = None
+
+    def contains(self, point):
+        CountingButton.checks += 1
+        x_min, y_min, x_max, y_max = self.bounds
+        return (x_min <= point[0] <= x_max) and (y_min <= point[1] <= y_max)
+
+
+def make_buttons(columns, rows, width=320, height=240):
+    cell_w = width // columns
+    cell_h = height // rows
+    return [CountingButton(c * cell_w + 2, r * cell_h + 2, cell_w - 4, cell_h - 4)
+            for r in range(rows) for c in range(columns)]
+
+
+def linear_hit(buttons, point):
+    for button in buttons:
+        if button.contains(point):
+            return button
+    return None
+
+
+def points(count, seed=1):
+    rng = random.Random(seed)
+    return [(rng.randrange(-10, 330), rng.randrange(-10, 250)) for _ in range(count)]
+
+
+def test_matches_linear_scan():
+    for columns, rows in ((4, 2), (4, 3), (10, 10), (20, 12)):
+        buttons = make_buttons(columns, rows)
+        grid = HitGrid(buttons)
+        for point in points(2000):
+            assert grid.hit(point) is linear_hit(buttons, point)
+
+
+def test_rebuilds_only_when_invalidated():
+    buttons = make_buttons(4, 3)
+    grid = HitGrid(buttons)
+    for point in points(100):
+        grid.hit(point)
+    assert grid.rebuilds == 1
+    grid.remove(buttons[0])
+    assert grid.hit((buttons[0].bounds[0] + 1, buttons[0].bounds[1] + 1)) is None
+    assert grid.rebuilds == 2
+
+
+def test_benchmark_against_linear_scan():
+    touches = points(5000)
+    print()
+    for columns, rows in ((4, 3), (10, 10), (20, 12)):
+        buttons = make_buttons(columns, rows)
+        grid = HitGrid(buttons)
+        grid.hit((0, 0))
+
+        CountingButton.checks = 0
+        start = time.perf_counter()
+        for point in touches:
+            linear_hit(buttons, point)
+        linear_time = time.perf_counter() - start
+        linear_checks = CountingButton.checks
+
+        CountingButton.checks = 0
+        start = time.perf_counter()
+        for point in touches:
+            grid.hit(point)
+        grid_time = time.perf_counter() - start
+        grid_checks = CountingButton.checks
+
+        print("{:4d} buttons: linear {:6.2f} checks {:6.2f} us, grid {:4.2f} checks {:6.2f} us"
+              " per touch".format(len(buttons), linear_checks / len(touches),
+                                  linear_time * 1e6 / len(touches),
+                                  grid_checks / len(touches), grid_time * 1e6 / len(touches)))
+        # A cell overlaps at most a couple of buttons, however many there are
+        assert grid_checks <= 2 * len(touches)
+        assert grid_checks * 4 < linear_checks
+
+
+def test_moved_padded_button_is_found_at_its_new_place():
+    from padded_button import PaddedButton    # pylint: disable=import-outside-toplevel
+    button = PaddedButton(x=0, y=0, width=80, height=60, fill_color=None, outline_color=None)
+    grid = HitGrid([button])
+    assert grid.hit((10, 10)) is button
+    button.x = 200
+    assert button.contains((210, 10)) and not button.contains((10, 10))
+    assert grid.hit((210, 10)) is button and grid.hit((10, 10)) is None
+    button.width = 20
+    button.height = 20
+    assert grid.hit((230, 10)) is None and grid.hit((210, 10)) is button
+    button.y = 100
+    assert grid.hit((210, 110)) is button and grid.hit((210, 10)) is None
+    rebuilds = grid.rebuilds
+    button.margin = (4, 4)    # laid out once, so nothing moves
+    grid.hit((210, 110))
+    assert grid.rebuilds == rebuilds
@@ -0,0 +1,137 @@
+"""Instrumentation: histograms across a tick wrap, stats frames through the
+default parser, what the hooks record, and what they cost when enabled and
+disabled."""
+
+import time
+
+import busio
+from adafruit_bitmap_font import bitmap_font
+
+from instrumentation import Instrumentation, Histogram
+from padded_button import PaddedButton
+from uart_link import CommandLink, FrameParser, FRAME_STATS
+
+FONT = bitmap_font.load_font("/fonts/Dina.bdf")
+
+
+class Ticks():
+    # ticks_ms that can be set, starting just before the 2**29 wrap
+    def __init__(self):
+        self.now = (1 << 29) - 3
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now = (self.now + ms) & ((1 << 29) - 1)
+
+
+def test_timing_across_tick_wrap():
+    ticks = Ticks()
+    histogram = Histogram("wrap", ticks)
+    histogram.start()
+    ticks.advance(10)
+    assert ticks.now < 10
+    histogram.stop()
+    assert histogram.count == 1 and histogram.max == 10
+    assert histogram.counts[4] == 1      # 8..15
+
+
+def test_stats_frames_fit_the_default_parser():
+    instruments = Instrumentation(timer=Ticks())
+    for name in ("touch_to_refresh", "touch_task", "contains", "selected", "label"):
+        instruments.histogram(name).record(5)
+    uart = busio.UART()
+    link = CommandLink(uart)
+    instruments.send(link)
+    while link.poll():
+        pass
+    received = []
+    parser = FrameParser(lambda frame_type, payload: received.append(
+        (frame_type, bytes(payload))))
+    parser.feed(uart.sent)
+    assert parser.errors == 0
+    assert [payload.split(b"\0")[0] for _, payload in received] == \
+        [name.encode() for name in instruments.histograms]
+    assert all(frame_type == FRAME_STATS for frame_type, _ in received)
+    assert max(len(payload) for _, payload in received) > 32
+
+
+class Stepping(Ticks):
+    # Moves on a fixed number of ticks every time it is read
+    def __init__(self, step):
+        super().__init__()
+        self.step = step
+
+    def __call__(self):
+        self.advance(self.step)
+        return self.now
+
+
+def test_hooks_record_the_time_of_each_call():
+    button = PaddedButton(x=0, y=0, width=80, height=60, label="V0", id=0, label_font=FONT)
+    instruments = Instrumentation(timer=Ticks(), hook_timer=Stepping(37))
+    instruments.enable(PaddedButton)
+    try:
+        for i in range(10):
+            button.contains((i, 30))
+            button.label = "V{}".format(i)
+    finally:
+        instruments.disable()
+    for name in ("contains", "label"):
+        histogram = instruments.histograms[name]
+        assert (histogram.count, histogram.total, histogram.max) == (10, 370, 37)
+        assert histogram.counts[6] == 10     # 32..63, across the tick wrap
+
+
+def test_hooks_are_timed_in_microseconds():
+    button = PaddedButton(x=0, y=0, width=80, height=60, label="V0", id=0, label_font=FONT)
+    instruments = Instrumentation()
+    instruments.enable(PaddedButton)
+    try:
+        for i in range(100):
+            button.label = "V{}".format(i % 10)
+    finally:
+        instruments.disable()
+    # A label update is well under a millisecond but not under a microsecond
+    label = instruments.histograms["label"]
+    print("\nlabel: {} us total, {} us max, buckets {}".format(
+        label.total, label.max, label.counts))
+    assert label.count == 100
+    assert label.counts[0] < 100
+    assert label.total > 0
+
+
+def button_work(buttons, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        for button in buttons:
+            button.contains((i % 320, 30))
+            button.selected = bool(i & 1)
+            button.label = "V{}".format(i % 10)
+    return (time.perf_counter() - start) / (iterations * len(buttons))
+
+
+def test_hook_overhead():
+    buttons = [PaddedButton(x=80 * i, y=0, width=80, height=60, label="V0", id=i,
+                            label_font=FONT) for i in range(4)]
+    original = PaddedButton.contains
+    instruments = Instrumentation()
+    button_work(buttons, 50)
+
+    disabled = min(button_work(buttons, 500) for _ in range(3))
+    instruments.enable(PaddedButton)
+    try:
+        enabled = min(button_work(buttons, 500) for _ in range(3))
+    finally:
+        instruments.disable()
+    again = min(button_work(buttons, 500) for _ in range(3))
+
+    print("\ncontains + selected + label: {:.2f} us disabled, {:.2f} us enabled, "
+          "{:.2f} us after disable".format(disabled * 1e6, enabled * 1e6, again * 1e6))
+    counts = {name: h.count for name, h in instruments.histograms.items()}
+    assert counts["contains"] == counts["selected"] == counts["label"] == 3 * 500 * 4
+    # Disabling puts the original methods back, so nothing extra runs at all
+    assert PaddedButton.contains is original
+    assert not instruments.enabled
+    assert enabled > again
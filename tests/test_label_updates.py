@@ -0,0 +1,87 @@
+"""Live label updates: in place against rebuilding the Label, and bad label
+frames from the UART."""
+
+import time
+
+import pytest
+from adafruit_bitmap_font import bitmap_font
+from adafruit_display_text.label import Label
+
+import alloc_guard
+from padded_button import PaddedButton
+from conftest import frame
+
+FONT = bitmap_font.load_font("/fonts/Dina.bdf")
+VALUES = ["{:.1f}".format(v / 10) for v in range(100, 200)]
+
+
+def make_button():
+    return PaddedButton(x=0, y=0, width=80, height=60, label="000.0", label_font=FONT,
+                        label_max=6)
+
+
+def rebuild_label(button, text):
+    # What the label setter did before: a new Label for every change
+    group = button.group
+    if group[-1] is button._label:    # pylint: disable=protected-access
+        group.pop()
+    label = Label(FONT, text=text)
+    dims = label.bounding_box
+    label.x = button.x + (button.width - dims[2]) // 2
+    label.y = button.y + button.height // 2
+    label.color = 0
+    button._label = label    # pylint: disable=protected-access
+    group.append(label)
+
+
+def rate(update, count=2000):
+    start = time.perf_counter()
+    for i in range(count):
+        update(VALUES[i % len(VALUES)])
+    return count / (time.perf_counter() - start)
+
+
+def test_in_place_against_rebuilding():
+    button = make_button()
+    label = button._label    # pylint: disable=protected-access
+    values = iter(VALUES * 100)
+
+    def in_place():
+        button.label = next(values)
+
+    def rebuilt():
+        rebuild_label(button, next(values))
+
+    in_place_rate = rate(lambda text: setattr(button, "label", text))
+    in_place_bytes = alloc_guard.allocated_per_call(in_place, iterations=100)
+    assert button._label is label    # pylint: disable=protected-access
+    rebuilt_rate = rate(lambda text: rebuild_label(button, text))
+    rebuilt_bytes = alloc_guard.allocated_per_call(rebuilt, iterations=100)
+    print("\nin place: {:.0f} updates/s, {:.0f} B/update; rebuilt: {:.0f} updates/s, "
+          "{:.0f} B/update".format(in_place_rate, in_place_bytes, rebuilt_rate, rebuilt_bytes))
+    assert in_place_rate > rebuilt_rate
+    assert in_place_bytes * 2 < rebuilt_bytes
+
+
+def test_too_wide_leaves_label_alone():
+    button = PaddedButton(x=0, y=0, width=30, height=60, label="1", label_font=FONT,
+                          label_max=8)
+    with pytest.raises(RuntimeError):
+        button.label = "WWWWWWWW"
+    assert button.label == "1"
+
+
+def test_bad_label_frames_are_dropped(simulation):
+    ns = simulation.run(1.0, incoming=[
+        (0.2, frame(0x05, b"\x01" + b"ABCDEFGHIJKL")),    # longer than label_max 8
+        (0.3, frame(0x05, b"\x02\xff\xfe")),             # not UTF-8
+        (0.4, frame(0x05, b"\x63" + b"x")),              # no button 99
+        (0.5, frame(0x05, b"\x03" + b"42.0")),
+    ])
+    buttons = ns["buttons_by_id"]
+    assert buttons[1].label == "ABCDEFGH"
+    assert buttons[2].label == "CMD 2"
+    assert buttons[3].label == "42.0"
+    assert ns["bad_frames"] == 2
+    # The UART task kept running
+    assert ns["command_link"].parser.frames == 4
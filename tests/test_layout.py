@@ -0,0 +1,79 @@
+"""Loading layout.json through its binary cache: damaged caches fall back to the
+JSON and get rebuilt, and how much boot time the cache saves."""
+
+import os
+import shutil
+import struct
+import time
+
+import pytest
+
+import layout
+from conftest import ROOT
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "layout.json")
+    shutil.copy2(os.path.join(ROOT, "layout.json"), path)
+    return path
+
+
+def cache_of(source):
+    return source.rsplit(".", 1)[0] + ".bin"
+
+
+def test_cache_is_used_once_written(source):
+    first = layout.load_layout(source)
+    assert not first.from_cache
+    assert os.path.exists(cache_of(source))
+    assert not os.path.exists(cache_of(source) + ".tmp")
+    second = layout.load_layout(source)
+    assert second.from_cache
+    assert (second.pages, second.buttons, second.bindings) == \
+        (first.pages, first.buttons, first.bindings)
+
+
+@pytest.mark.parametrize("damage", ["truncated", "bad_text", "bad_offset", "extra"])
+def test_damaged_cache_is_rebuilt(source, damage):
+    good = layout.load_layout(source)
+    with open(cache_of(source), "rb") as file:
+        data = bytearray(file.read())
+    # The header still matches layout.json, so only the contents give it away
+    if damage == "truncated":
+        data = data[:len(data) * 2 // 3]
+    elif damage == "bad_text":
+        data[-3:] = b"\xff\xfe\xfd"
+    elif damage == "bad_offset":
+        # The last binding's string offset sits just before the string table
+        strings = len(data) - struct.unpack_from(layout.HEADER, data)[-1]
+        struct.pack_into("<H", data, strings - 2, 0xFFF0)
+    else:
+        data += b"\0"
+    with open(cache_of(source), "wb") as file:
+        file.write(data)
+
+    loaded = layout.load_layout(source)
+    assert not loaded.from_cache
+    assert loaded.bindings == good.bindings
+    assert layout.load_layout(source).from_cache
+
+
+def test_boot_time_json_and_cache(source):
+    runs = 20
+    layout.load_layout(source)
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        os.remove(cache_of(source))
+        layout.load_layout(source)
+    compile_time = (time.perf_counter() - start) / runs
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        assert layout.load_layout(source).from_cache
+    cache_time = (time.perf_counter() - start) / runs
+
+    print("\nlayout.json: {:.2f} ms compiling, {:.2f} ms from layout.bin ({:.1f}x)".format(
+        compile_time * 1000, cache_time * 1000, compile_time / cache_time))
+    assert cache_time < compile_time
@@ -0,0 +1,94 @@
+"""Memory and per-frame cost of the tab strip and pages from 4 to 200 pages."""
+
+import time
+import tracemalloc
+
+import displayio
+from adafruit_bitmap_font import bitmap_font
+from adafruit_display_text.label import Label
+
+from padded_button import ButtonStyle
+from page_cache import PageCache
+from page_manager import PageManager
+from shape_pool import ShapePool, release_shapes
+from tab_strip import TabStrip
+
+FONT = bitmap_font.load_font("/fonts/Dina.bdf")
+COLORS = (0x000080, 0xFF0000, 0x0000FF, 0xFFA500, 0x90EE90, 0x808080)
+
+
+def count_objects(group):
+    total = 0
+    for item in group:
+        total += 1
+        if isinstance(item, displayio.Group):
+            total += count_objects(item)
+    return total
+
+
+def build(pages):
+    pool = ShapePool()
+    style = ButtonStyle(fill_color=0, outline_color=0, label_font=FONT, label_color=0xFFFFFF)
+    strip = TabStrip(x=0, y=180, width=320, height=60, tab_width=80, count=pages,
+                     style_for=lambda i: style.derive(fill_color=COLORS[i % len(COLORS)]),
+                     label_for="{:03d}".format)
+    content = displayio.Group()
+
+    def builder(page):
+        group = displayio.Group()
+        group.append(Label(FONT, text=page.name))
+        return group
+
+    manager = PageManager(pool.rect(0, 0, 320, 180, fill=0, outline=0), [], content=content,
+                          cache=PageCache(max_pages=2, on_evict=release_shapes))
+    for i in range(pages):
+        manager.add_page(color=COLORS[i % len(COLORS)], name="Page {:03d}".format(i),
+                         builder=builder)
+    manager.show(0)
+    strip.select(0)
+    return strip, manager, content
+
+
+def drag(strip, count=2000):
+    """Drag the strip 8 pixels a frame, back and forth.  Returns seconds per frame."""
+    start = time.perf_counter()
+    direction = 8
+    for _ in range(count):
+        if not strip.scroll_by(direction):
+            direction = -direction
+    return (time.perf_counter() - start) / count
+
+
+def switch(strip, manager, count=40):
+    """Show pages spread across the whole range.  Returns seconds per switch, most of
+    which is the gc.collect() after each cache eviction."""
+    start = time.perf_counter()
+    for i in range(count):
+        page = (i * 37) % len(manager.pages)
+        manager.show(page)
+        strip.select(page)
+    return (time.perf_counter() - start) / count
+
+
+def test_flat_memory_and_frame_cost():
+    results = []
+    print()
+    for pages in (4, 20, 50, 200):
+        tracemalloc.start()
+        strip, manager, content = build(pages)
+        built, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        frame_time = min(drag(strip) for _ in range(3))
+        switch_time = switch(strip, manager)
+        objects = count_objects(strip.group) + count_objects(content)
+        results.append((pages, built, frame_time, objects))
+        print("{:4d} pages: {:6d} B built, {} display objects, drag {:5.1f} us/frame, "
+              "page switch {:6.1f} us".format(pages, built, objects, frame_time * 1e6,
+                                              switch_time * 1e6))
+
+    # Display objects stop growing once the strip is wider than the screen; after
+    # that only the page records grow
+    assert results[1][3] == results[-1][3]
+    assert (results[-1][1] - results[1][1]) / (results[-1][0] - results[1][0]) < 512
+    # Per frame cost of dragging is flat from 20 to 200 pages
+    assert results[-1][2] < 2 * results[1][2]
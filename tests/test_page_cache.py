@@ -0,0 +1,131 @@
+"""PageCache LRU order, its three eviction limits and statistics, and that the
+page on screen is never evicted from under PageManager."""
+
+import displayio
+
+from page_cache import PageCache
+from page_manager import PageManager
+from shape_pool import ShapePool, release_shapes
+
+
+class Heap():
+    """``mem_free`` for the cache: building a page takes ``page_size`` bytes and
+    evicting one gives them back."""
+
+    def __init__(self, free=10000, page_size=1000):
+        self.free = free
+        self.page_size = page_size
+
+    def __call__(self):
+        return self.free
+
+    def build(self, key):
+        self.free -= self.page_size
+        return "page {}".format(key)
+
+    def evicted(self, group):
+        self.free += self.page_size
+
+
+def make_cache(clock, heap, **kwargs):
+    evicted = []
+
+    def on_evict(group):
+        evicted.append(group)
+        heap.evicted(group)
+
+    return PageCache(clock=clock, mem_free=heap, on_evict=on_evict, **kwargs), evicted
+
+
+def test_least_recently_used_page_is_evicted(clock):
+    heap = Heap()
+    cache, evicted = make_cache(clock, heap, max_pages=3)
+    for key in (0, 1, 2):
+        cache.get(key, lambda key=key: heap.build(key))
+    cache.get(0, None)          # 1 is now the least recently used
+    cache.get(3, lambda: heap.build(3))
+    assert evicted == ["page 1"]
+    assert 1 not in cache
+    assert cache._order == [2, 0, 3]    # pylint: disable=protected-access
+    assert (len(cache), cache.evictions) == (3, 1)
+
+
+def test_evicts_over_max_bytes(clock):
+    heap = Heap()
+    cache, evicted = make_cache(clock, heap, max_pages=10, max_bytes=2500)
+    for key in range(4):
+        cache.get(key, lambda key=key: heap.build(key))
+    assert cache.size_of(3) == 1000
+    assert evicted == ["page 0", "page 1"]
+    assert cache.bytes == 2000
+
+
+def test_evicts_below_min_free(clock):
+    heap = Heap(free=4500)
+    cache, evicted = make_cache(clock, heap, max_pages=10, min_free=2000)
+    for key in range(4):
+        cache.get(key, lambda key=key: heap.build(key))
+    # Each page leaves 1000 bytes less; from the third on one has to go
+    assert evicted == ["page 0", "page 1"]
+    assert heap.free >= 2000
+    assert list(cache._order) == [2, 3]    # pylint: disable=protected-access
+
+
+def test_new_page_is_kept_when_it_alone_is_over_budget(clock):
+    heap = Heap(free=1500)
+    cache, evicted = make_cache(clock, heap, min_free=2000)
+    cache.get(0, lambda: heap.build(0))
+    cache.get(1, lambda: heap.build(1))
+    assert evicted == ["page 0"]
+    assert 1 in cache
+
+
+def test_hits_misses_and_build_time(clock):
+    heap = Heap()
+    cache, _ = make_cache(clock, heap)
+
+    def slow_build(seconds, key):
+        clock.advance(seconds)
+        return heap.build(key)
+
+    cache.get(0, lambda: slow_build(0.25, 0))
+    cache.get(1, lambda: slow_build(0.5, 1))
+    cache.get(0, None)
+    cache.get(0, None)
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert cache.build_time_last == 0.5
+    assert cache.build_time_max == 0.5
+    assert cache.build_time_total == 0.75
+
+
+def test_page_on_screen_is_not_evicted(clock):
+    """Only the page being shown used to be protected, so a low heap could evict
+    the Group still on screen and release its shapes."""
+    heap = Heap(free=3500, page_size=1000)
+    pool = ShapePool()
+    content = displayio.Group()
+    on_screen = []
+
+    def builder(page):
+        heap.free -= heap.page_size
+        group = displayio.Group()
+        group.append(pool.rect(0, 0, 10, 10, fill=page.color, outline=page.color))
+        return group
+
+    def on_evict(group):
+        on_screen.append(any(group is shown for shown in content))
+        heap.free += heap.page_size
+        release_shapes(group)
+
+    cache = PageCache(max_pages=4, min_free=2000, clock=clock, mem_free=heap,
+                      on_evict=on_evict)
+    manager = PageManager(pool.rect(0, 0, 320, 200, fill=0, outline=0), [],
+                          content=content, cache=cache)
+    for color in (1, 2, 3, 4):
+        manager.add_page(color=color, builder=builder)
+    for index in (0, 1, 2, 3, 0):
+        manager.show(index)
+        assert cache.get(index, None) is content[0]
+        # Every shape on screen is still in use
+        assert all(item._key is not None for item in content[0])  # pylint: disable=protected-access
+    assert on_screen and not any(on_screen)
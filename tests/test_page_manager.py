@@ -0,0 +1,69 @@
+"""PageManager command tables and page switching."""
+
+from command_dispatch import CommandDispatcher
+from page_manager import PageManager
+from shape_pool import ShapePool
+
+
+class Button():
+    # Just the parts of a PaddedButton that PageManager uses
+    def __init__(self, button_id, fill_color=None):
+        self.id = button_id
+        self.fill_color = fill_color
+        self.updates = 0
+        self.body = None
+        self.group = None
+
+    def update(self, *, fill=None):
+        self.fill_color = fill
+        self.updates += 1
+
+
+def make_pages(ids, count=3):
+    background = ShapePool().rect(0, 0, 320, 200, fill=0, outline=0)
+    pages = PageManager(background, [Button(i) for i in ids])
+    for page in range(count):
+        pages.add_page(color=0x100000 * page)
+    return pages
+
+
+def test_commands_are_indexed_by_id():
+    pages = make_pages(range(8))
+    assert pages.button_ids == 8
+    assert pages.pages[1].commands == tuple(range(8, 16))
+    pages.show(1)
+    assert [pages.command(button) for button in pages.buttons] == list(range(8, 16))
+
+
+def test_sparse_ids_all_get_commands():
+    pages = make_pages((0, 3, 12, 200))
+    assert pages.button_ids == 201
+    dispatcher = CommandDispatcher(lambda command: None)
+    dispatcher.compile([page.commands for page in pages.pages], pages.button_ids)
+    seen = set()
+    for index in range(len(pages.pages)):
+        pages.show(index)
+        for button in pages.buttons:
+            command = pages.command(button)
+            assert command is not None
+            assert dispatcher.command_for(index, button.id) == command
+            seen.add(command)
+    # Every (page, button) pair has a command of its own
+    assert len(seen) == len(pages.pages) * len(pages.buttons)
+
+
+def test_switch_recolors_only_filled_buttons():
+    background = ShapePool().rect(0, 0, 320, 200, fill=0, outline=0)
+    filled = Button(0, fill_color=0)
+    clear = Button(1)
+    pages = PageManager(background, [filled, clear])
+    pages.add_page(color=0xFF0000)
+    pages.add_page(color=0xFF0000)
+    pages.add_page(color=0x00FF00)
+    assert pages.show(0)
+    assert not pages.show(0)
+    assert pages.show(1)
+    assert filled.updates == 1
+    pages.show(2)
+    assert filled.updates == 2 and filled.fill_color == 0x00FF00
+    assert clear.updates == 0
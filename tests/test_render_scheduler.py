@@ -0,0 +1,105 @@
+"""RenderScheduler against a fake display that counts refreshes."""
+
+from dirty_rects import DirtyRects
+from render_scheduler import RenderScheduler
+
+
+class FakeDisplay():
+    def __init__(self):
+        self.auto_refresh = True
+        self.refreshes = 0
+
+    def refresh(self):
+        self.refreshes += 1
+        return True
+
+
+def test_turns_auto_refresh_off(clock):
+    display = FakeDisplay()
+    RenderScheduler(display, fps=30, clock=clock.ticks_ms)
+    assert display.auto_refresh is False
+
+
+def test_no_changes_no_refresh(clock):
+    display = FakeDisplay()
+    render = RenderScheduler(display, fps=30, clock=clock.ticks_ms)
+    for _ in range(1000):
+        render.update()
+        clock.advance(0.005)
+    assert display.refreshes == 0
+
+
+def test_changes_in_a_frame_share_one_refresh(clock):
+    display = FakeDisplay()
+    render = RenderScheduler(display, fps=30, clock=clock.ticks_ms)
+    # A page switch: background, four tabs and eight buttons change at once
+    for _ in range(13):
+        render.invalidate()
+    assert render.update()
+    assert not render.update()
+    assert display.refreshes == 1
+
+
+def test_refreshes_are_capped_at_fps(clock):
+    display = FakeDisplay()
+    render = RenderScheduler(display, fps=30, clock=clock.ticks_ms)
+    # Something changes every 5 ms for ten seconds
+    for _ in range(2000):
+        render.invalidate()
+        render.update()
+        clock.advance(0.005)
+    print("\n2000 invalidations over 10 s: {} refreshes".format(display.refreshes))
+    assert display.refreshes == render.refreshes
+    assert 299 <= display.refreshes <= 301
+
+
+def test_update_once_per_frame_keeps_full_rate(clock):
+    display = FakeDisplay()
+    render = RenderScheduler(display, fps=30, clock=clock.ticks_ms)
+    # Called exactly every 1/fps, as the render task is; float rounding must not
+    # make every other frame look early
+    next_time = clock.now
+    for _ in range(300):
+        clock.now = next_time
+        render.invalidate()
+        render.update()
+        next_time = clock.now + 1 / 30
+    assert display.refreshes == 300
+    assert render.dropped_frames == 0
+
+
+def test_jittery_updates_do_not_exceed_cap(clock):
+    display = FakeDisplay()
+    render = RenderScheduler(display, fps=30, clock=clock.ticks_ms)
+    start = clock.now
+    for i in range(3000):
+        clock.now = start + i * 0.0033 + (0.002 if i % 3 else 0)
+        render.invalidate()
+        render.update()
+    seconds = clock.now - start
+    # One per frame slot; the last may go out up to an eighth of a frame early
+    assert display.refreshes <= 30 * seconds + 1 + 1 / 8
+
+
+def test_dirty_pixels_are_counted_per_refresh(clock):
+    display = FakeDisplay()
+    dirty = DirtyRects()
+    render = RenderScheduler(display, fps=30, clock=clock.ticks_ms, dirty=dirty)
+    dirty.add(0, 0, 80, 60)
+    dirty.add(300, 230, 80, 60)      # clipped to 20 x 10
+    render.invalidate()
+    render.update()
+    assert render.pixels_last == 80 * 60 + 20 * 10
+    assert dirty.pixels == 0 and len(dirty) == 0
+
+
+def test_rate_holds_across_tick_wrap(clock):
+    display = FakeDisplay()
+    clock.now = (1 << 29) / 1000 - 5.0     # ticks_ms wraps halfway through
+    render = RenderScheduler(display, fps=30, clock=clock.ticks_ms)
+    for _ in range(2000):
+        render.invalidate()
+        render.update()
+        clock.advance(0.005)
+    assert 299 <= display.refreshes <= 301
+    assert render.time_to_next_frame <= 1 / 30
@@ -0,0 +1,56 @@
+"""ShapePool shares one bitmap per shape size; peak bitmap memory with and without it."""
+
+import displayio
+
+from shape_pool import ShapePool, PooledShape, release_shapes
+
+
+def build_screen(pool):
+    # The demo screen: background, 8 command buttons and 4 visible tabs, each as a
+    # shadowed body the way PaddedButton draws SHADOWROUNDRECT
+    group = displayio.Group()
+    group.append(pool.rect(0, 0, 320, 200, fill=0, outline=0))
+    for i in range(8):
+        x, y = 80 * (i % 4), 110 * (i // 4)
+        group.append(pool.roundrect(x + 2, y + 2, 78, 58, 10, fill=0))
+        group.append(pool.roundrect(x, y, 78, 58, 10, fill=0xFF, outline=0xFFFFFF))
+    for i in range(4):
+        group.append(pool.rect(80 * i, 180, 80, 40, fill=0xFF, outline=0xFFFFFF))
+    return group
+
+
+def test_identical_shapes_share_a_bitmap():
+    pool = ShapePool()
+    first = pool.roundrect(0, 0, 78, 58, 10, fill=1, outline=2)
+    second = pool.roundrect(80, 0, 78, 58, 10, fill=3, outline=4)
+    assert first.bitmap is second.bitmap
+    assert first.pixel_shader is not second.pixel_shader
+    assert pool.refcount((78, 58, 10, 1)) == 2
+    first.release()
+    second.release()
+    second.release()    # a second release is ignored
+    assert len(pool) == 0 and pool.bytes == 0
+
+
+def test_transparent_corners():
+    shape = ShapePool().roundrect(0, 0, 40, 30, 10, fill=1, outline=2)
+    assert shape.pixel_shader.is_transparent(shape.bitmap[0, 0])
+    assert not shape.pixel_shader.is_transparent(shape.bitmap[20, 15])
+
+
+def test_peak_bitmap_memory():
+    pool = ShapePool()
+    screens = []
+    # Pages built and evicted as the cache would, two screens alive at a time
+    for _ in range(6):
+        screens.append(build_screen(pool))
+        if len(screens) > 2:
+            release_shapes(screens.pop(0))
+    shapes = sum(1 for item in screens[0] if isinstance(item, PooledShape))
+    print("\n{} shapes per screen: peak {} bitmap bytes pooled, {} with a bitmap each"
+          .format(shapes, pool.peak_bytes, pool.peak_unpooled_bytes))
+    assert len(pool) == 4
+    assert pool.peak_bytes * 5 < pool.peak_unpooled_bytes
+    for screen in screens:
+        release_shapes(screen)
+    assert pool.bytes == 0 and pool.unpooled_bytes == 0
@@ -0,0 +1,60 @@
+"""The whole script on the host: fake touchscreen, UART, HID and display, driven
+by a fake clock."""
+
+from conftest import frame
+
+BUTTON_0 = (10, 10)      # inside command button 0 (F1, command 0 on page 0)
+
+
+def test_tap_sends_command_and_key(simulation):
+    ns = simulation.run(2.0, contacts=[(1.0, 1.15, BUTTON_0, BUTTON_0)])
+    assert ns["dispatcher"].dispatched == 1
+    sent = bytes(ns["uart"].sent)
+    assert sent == frame(0x01, b"\x00\x00")
+    keyboard = ns["macros"]._device    # pylint: disable=protected-access
+    assert [report[2] for report in keyboard.reports] == [0x3A, 0]
+    # The touch period is read after each poll, so once contact is seen polling
+    # speeds up straight away and the press is confirmed a debounce later, rather
+    # than an idle interval later
+    contact = int((simulation.start + 1.0) * 1000)
+    press = ns["touch"]._press_time    # pylint: disable=protected-access
+    print("\nPRESS {} ms after contact, {} ms after it was first seen".format(
+        press - contact, ns["touch"].latency_last))
+    assert ns["touch"].latency_last <= 20 + 10
+
+
+def test_swipe_changes_page(simulation):
+    ns = simulation.run(2.0, contacts=[(1.0, 1.2, (280, 85), (40, 85))])
+    assert ns["page_manager"].active == 1
+    assert ns["dispatcher"].submitted == 0
+    # One sample per 10 ms poll of the 200 ms contact once the 20 ms debounce has
+    # passed; the polls debouncing the release read nothing new
+    assert ns["swipe"].samples <= round((0.2 - 0.02) / 0.01)
+
+
+def test_bad_status_frame_is_dropped(simulation, capsys):
+    ns = simulation.run(2.0, incoming=[(0.5, frame(0x02, b"\xff\xfe")),
+                                       (1.0, frame(0x02, b"ok"))])
+    assert ns["bad_frames"] == 1
+    assert ns["command_link"].parser.frames == 2
+    assert "Status: ok" in capsys.readouterr().out
+
+
+def test_ten_seconds_of_use(simulation):
+    # Taps on the buttons every half second, a swipe and a tab tap
+    contacts = [(0.5 + 0.5 * i, 0.6 + 0.5 * i, (10 + 80 * (i % 4), 10), (10 + 80 * (i % 4), 10))
+                for i in range(12)]
+    contacts += [(7.0, 7.2, (280, 85), (40, 85)), (8.0, 8.1, (100, 200), (100, 200))]
+    ns = simulation.run(10.0, contacts=contacts, flags={"VERBOSE": False})
+    render = ns["render"]
+    runtime = ns["runtime"]
+    runs = {task.name: task.runs for task in runtime.tasks}
+    print("\nrefreshes {} ({} pixels), commands {}, reports {}, loop passes {}".format(
+        render.refreshes, render.pixels_total, ns["dispatcher"].dispatched,
+        ns["macros"].reports_sent, simulation.sleeps))
+    print("task runs: {}".format(runs))
+    assert ns["dispatcher"].dispatched == 12
+    assert ns["page_manager"].active == 1
+    assert render.refreshes <= 30 * 10
+    # Touch polls fast only while in use
+    assert runs["touch"] < 10 / 0.01
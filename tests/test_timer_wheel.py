@@ -0,0 +1,108 @@
+"""TimerWheel and HoldRepeat on a fake ticks_ms clock: timers never fire early or
+more than a tick late, across the tick wrap, and what a tick costs with many
+buttons held."""
+
+import random
+import time
+
+from hold_repeat import HoldRepeat
+from timer_wheel import Timer, TimerWheel
+
+WRAP = (1 << 29) / 1000     # seconds at which ticks_ms wraps back to 0
+
+
+def run(clock, wheel, seconds, jitter, rng):
+    """Advance ``wheel`` every 10 ms plus up to ``jitter`` seconds of scheduling delay.
+    Returns the host seconds spent in advance() and the number of calls."""
+    end = clock.now + seconds
+    busy = 0
+    calls = 0
+    while clock.now < end:
+        clock.advance(0.01 + rng.random() * jitter)
+        start = time.perf_counter()
+        wheel.advance()
+        busy += time.perf_counter() - start
+        calls += 1
+    return busy, calls
+
+
+def test_timers_fire_on_time_across_wrap(clock):
+    rng = random.Random(1)
+    clock.now = WRAP - 1.0
+    wheel = TimerWheel(slots=64, tick=0.01, clock=clock.ticks_ms)
+    fired = []
+    timers = [Timer(lambda timer: fired.append((timer.arg, clock.ticks_ms()))) for _ in range(200)]
+    due = {}
+    for timer in timers:
+        # Up to three laps of the wheel ahead, so some wait out whole laps
+        timer.arg = timer
+        wheel.schedule(timer, rng.randrange(1, 2000))
+        due[timer] = timer.due
+
+    run(clock, wheel, 3.0, 0.004, rng)
+    assert len(fired) == len(timers)
+    assert wheel.pending == 0
+    late = [(now - due[timer]) % (1 << 29) for timer, now in fired]
+    print("\nLateness across the wrap: max {} ms, mean {:.1f} ms".format(
+        max(late), sum(late) / len(late)))
+    # Never early, and late by at most the rounding up to a tick plus the time
+    # between two advance() calls
+    assert min(late) >= 0
+    assert max(late) <= 10 + (10 + 4) + 1
+    assert wheel.lateness_max == max(late)
+
+
+def test_catches_up_after_a_stall(clock):
+    wheel = TimerWheel(slots=64, tick=0.01, clock=clock.ticks_ms)
+    fired = []
+    timers = [Timer(fired.append) for _ in range(10)]
+    for i, timer in enumerate(timers):
+        wheel.schedule(timer, 100 * (i + 1))
+    clock.advance(5.0)    # several laps without a tick
+    assert wheel.advance() == 10
+    assert sorted(map(id, fired)) == sorted(map(id, timers))
+
+
+def test_held_buttons_repeat_at_their_rate(clock):
+    rng = random.Random(2)
+    clock.now = WRAP - 0.5
+    wheel = TimerWheel(slots=64, tick=0.01, clock=clock.ticks_ms)
+    sent = []
+    hold = HoldRepeat(wheel, lambda button, command: sent.append(command))
+    for button in range(8):
+        hold.configure(button, long_press=0.25 * (button + 1), long_press_command=100 + button,
+                       repeat_delay=0.3, repeat_interval=0.05)
+        hold.press(button, button)
+
+    run(clock, wheel, 1.3, 0.004, rng)
+    assert 1.29 <= hold.held_for(0) <= 1.3 + 0.01
+    hold.release()
+    # Repeats from 0.3 s every 50 ms until 1.3 s, whatever the tick jitter
+    assert hold.repeats == 8 * 21
+    for button in range(8):
+        assert 20 <= sent.count(button) <= 21
+    assert sorted(c for c in sent if c >= 100) == [100, 101, 102, 103, 104]
+    assert wheel.pending == 0
+
+
+def test_tick_cost_with_many_held_buttons(clock):
+    rng = random.Random(3)
+    results = []
+    for held in (0, 10, 100, 1000):
+        wheel = TimerWheel(slots=64, tick=0.01, clock=clock.ticks_ms)
+        hold = HoldRepeat(wheel, lambda button, command: None)
+        for button in range(held):
+            # Long presses far off, repeats every 200 ms
+            hold.configure(button, long_press=60, long_press_command=1,
+                           repeat_delay=0.2, repeat_interval=0.2)
+            hold.press(button, 0)
+        busy, calls = run(clock, wheel, 2.0, 0.002, rng)
+        hold.release()
+        results.append((held, busy / calls, hold.repeats))
+    print()
+    for held, per_tick, repeats in results:
+        print("{:5d} held: {:7.1f} us per tick, {} repeats".format(held, per_tick * 1e6, repeats))
+    # A tick only walks one slot, so what it costs follows the timers in that slot;
+    # idle ticks stay cheap
+    assert results[0][1] < 20e-6
+    assert results[3][1] < 100 * results[1][1]
@@ -0,0 +1,104 @@
+"""TouchInput against a scripted touchscreen: press latency and how often it polls."""
+
+import time
+
+import touch_input
+from touch_input import TouchInput
+
+
+class ScriptedTouchscreen():
+    # Reports a point while the clock is inside one of the (start, end) contacts
+    def __init__(self, clock, contacts, point=(100, 100)):
+        self._clock = clock
+        self._contacts = contacts
+        self._point = point
+
+    @property
+    def touch_point(self):
+        now = self._clock()
+        for start, end in self._contacts:
+            if start <= now < end:
+                return self._point
+        return None
+
+
+def run(clock, touch, until):
+    """Poll ``touch`` at its own interval until ``until``.  Returns the events with
+    their times and the host seconds spent in update()."""
+    events = []
+    busy = 0
+    while clock.now < until:
+        start = time.perf_counter()
+        event = touch.update()
+        busy += time.perf_counter() - start
+        if event == touch_input.PRESS:
+            touch.mark_dispatched()
+        if event != touch_input.NONE:
+            events.append((event, clock.now))
+        clock.advance(touch.interval)
+    return events, busy
+
+
+def make(clock, contacts):
+    screen = ScriptedTouchscreen(clock, contacts)
+    return TouchInput(screen, debounce=0.02, hold_time=0.5, fast_interval=0.01,
+                      idle_interval=0.1, idle_after=2.0, clock=clock.ticks_ms)
+
+
+def test_press_hold_release(clock):
+    start = clock.now
+    touch = make(clock, [(start + 1.0, start + 1.8)])
+    events, _ = run(clock, touch, start + 3.0)
+    assert [event for event, _ in events] == [touch_input.PRESS, touch_input.HOLD,
+                                              touch_input.RELEASE]
+    assert touch.latency_count == 1
+    # Contact is seen on the next idle poll, then confirmed after the debounce
+    assert touch.latency_last <= 20 + 10
+
+
+def test_bounce_is_ignored(clock):
+    start = clock.now
+    touch = make(clock, [(start + 1.0, start + 1.011)])
+    events, _ = run(clock, touch, start + 2.0)
+    assert events == []
+
+
+def test_debounce_across_tick_wrap(clock):
+    # 2 ms before supervisor.ticks_ms wraps back to 0
+    clock.now = ((1 << 29) - 2) / 1000
+    start = clock.now
+    touch = make(clock, [(start, start + 0.3)])
+    events, _ = run(clock, touch, start + 1.0)
+    assert [event for event, _ in events] == [touch_input.PRESS, touch_input.RELEASE]
+    assert 20 <= touch.latency_last <= 30
+
+
+def test_latency_and_cpu_duty(clock):
+    # A tap every 5 seconds for a minute, then a minute of idle
+    start = clock.now
+    contacts = [(start + 5.0 * i + 0.37, start + 5.0 * i + 0.52) for i in range(1, 12)]
+    touch = make(clock, contacts)
+    events, busy = run(clock, touch, start + 60.0)
+    active_polls = touch.polls
+    presses = [when for event, when in events if event == touch_input.PRESS]
+    assert len(presses) == len(contacts)
+    # From the finger landing, including the wait for the next idle poll
+    delays = [(when - contact[0]) * 1000 for when, contact in zip(presses, contacts)]
+    average = touch.latency_total / touch.latency_count
+
+    touch.reset_stats()
+    _, idle_busy = run(clock, touch, start + 120.0)
+    idle_polls = touch.polls
+    per_poll = (busy + idle_busy) / (active_polls + idle_polls)
+
+    print("\npress latency: {:.1f} ms from first sample, {:.1f} ms average and {:.1f} ms "
+          "max from contact".format(average, sum(delays) / len(delays), max(delays)))
+    print("polls/s: tapping {:.1f}, idle {:.1f}; host cost {:.2f} us/poll, "
+          "idle duty {:.4%}".format(active_polls / 60, idle_polls / 60, per_poll * 1e6,
+                                   idle_polls * per_poll / 60))
+    assert average <= 30
+    assert max(delays) <= 100 + 20 + 10
+    # Idle polling backs off to idle_interval
+    assert idle_polls <= 60 / 0.1 + 1
+    # Each tap keeps the fast rate for idle_after seconds, then it backs off again
+    assert active_polls < len(contacts) * (2.2 / 0.01 + 5 / 0.1)
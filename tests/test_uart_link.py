@@ -0,0 +1,135 @@
+"""CommandLink and FrameParser against a fake UART."""
+
+import busio
+
+from uart_link import (CommandLink, FrameParser, RingBuffer, checksum, FRAME_START,
+                       FRAME_COMMAND, FRAME_STATUS)
+
+
+class SlowUART(busio.UART):
+    # Accepts at most ``limit`` bytes per write, like a UART with a short timeout
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    def write(self, data):
+        if not self.limit:
+            return None
+        data = bytes(data[:self.limit])
+        return super().write(data)
+
+
+def frames(data):
+    """Split a byte stream into (type, payload) frames, checking each checksum."""
+    result = []
+    index = 0
+    while index < len(data):
+        assert data[index] == FRAME_START
+        frame_type, length = data[index + 1], data[index + 2]
+        body = data[index + 1:index + 3 + length]
+        assert checksum(body) == data[index + 3 + length]
+        assert sum(data[index + 1:index + 4 + length]) & 0xFF == 0
+        result.append((frame_type, bytes(data[index + 3:index + 3 + length])))
+        index += 4 + length
+    return result
+
+
+def drain(link):
+    while link.poll():
+        pass
+
+
+def test_command_frame_format():
+    uart = busio.UART()
+    link = CommandLink(uart)
+    link.send_command(0x1234)
+    drain(link)
+    assert bytes(uart.sent) == bytes([0x7E, 0x01, 0x02, 0x34, 0x12,
+                                      (-(1 + 2 + 0x34 + 0x12)) & 0xFF])
+    link.send_frame(FRAME_STATUS, b"ok")
+    drain(link)
+    assert frames(uart.sent) == [(FRAME_COMMAND, b"\x34\x12"), (FRAME_STATUS, b"ok")]
+
+
+def test_writes_are_batched_and_bounded():
+    uart = busio.UART()
+    link = CommandLink(uart, chunk=16)
+    for command in range(10):
+        link.send_command(command)
+    assert uart.writes == 0
+    # 60 queued bytes go out in chunks of at most 16, one write per poll
+    assert [link.poll() for _ in range(5)] == [16, 16, 16, 12, 0]
+    assert uart.writes == link.writes == 4
+    assert [int.from_bytes(payload, "little") for _, payload in frames(uart.sent)] == \
+        list(range(10))
+
+
+def test_partial_and_timed_out_writes():
+    uart = SlowUART(5)
+    link = CommandLink(uart, chunk=16)
+    link.send_command(7)
+    link.send_command(8)
+    assert link.poll() == 5
+    uart.limit = 0
+    assert link.poll() == 0
+    assert link.queued == 7
+    uart.limit = 3
+    drain(link)
+    assert link.bytes_sent == 12
+    assert frames(uart.sent) == [(FRAME_COMMAND, b"\x07\x00"), (FRAME_COMMAND, b"\x08\x00")]
+
+
+def test_overflow_and_backpressure_counters():
+    link = CommandLink(busio.UART(), size=64, high_water=30)
+    results = [link.send_command(i) for i in range(12)]
+    # 6 bytes per command: 10 fit in 64 bytes; frames 7-10 are queued above 30 bytes
+    assert results == [True] * 10 + [False] * 2
+    assert link.frames_queued == 10
+    assert link.frames_dropped == 2
+    assert link.backpressure == 4
+    assert link.busy
+    drain(link)
+    assert not link.busy
+
+
+def test_ring_buffer_wraps():
+    ring = RingBuffer(8)
+    scratch = bytearray(8)
+    for value in range(6):
+        ring.put(value)
+    ring.consume(5)
+    for value in range(6, 12):
+        ring.put(value)
+    assert len(ring) == 7 and ring.free == 1
+    assert ring.peek_into(scratch, 8) == 7
+    assert bytes(scratch[:7]) == bytes(range(5, 12))
+    assert bytes(ring.peek(8)) == bytes([5, 6, 7])
+
+
+def test_parser_rejects_bad_frames():
+    received = []
+    parser = FrameParser(lambda frame_type, payload: received.append(
+        (frame_type, bytes(payload))), max_payload=8)
+    good = bytes([0x7E, 0x02, 0x02, 0x68, 0x69, (-(2 + 2 + 0x68 + 0x69)) & 0xFF])
+    bad_sum = good[:-1] + bytes([good[-1] ^ 1])
+    too_long = bytes([0x7E, 0x02, 0x09])
+    parser.feed(b"\x00\x01" + bad_sum + too_long + good)
+    assert received == [(FRAME_STATUS, b"hi")]
+    assert parser.errors == 2 and parser.frames == 1
+    # Split across reads
+    for value in good:
+        parser.feed(bytes([value]))
+    assert received[-1] == (FRAME_STATUS, b"hi")
+
+
+def test_receive_feeds_parser_in_chunks():
+    uart = busio.UART()
+    received = []
+    link = CommandLink(uart, chunk=4, on_frame=lambda t, p: received.append(bytes(p)))
+    uart.incoming.extend(bytes([0x7E, 0x02, 0x03, 0x61, 0x62, 0x63,
+                                (-(2 + 3 + 0x61 + 0x62 + 0x63)) & 0xFF]))
+    assert link.receive() == 4
+    assert received == []
+    assert link.receive() == 3
+    assert received == [b"abc"]
+    assert link.receive() == 0
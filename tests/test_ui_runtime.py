@@ -0,0 +1,58 @@
+"""UIRuntime's round-robin loop on a fake ticks_ms clock: tasks run at their
+periods, the loop sleeps between them, and neither changes across the wrap."""
+
+from ui_runtime import UIRuntime
+
+WRAP = (1 << 29) / 1000     # seconds at which ticks_ms wraps back to 0
+
+
+def run(clock, runtime, seconds):
+    """Run the loop as ``UIRuntime.run()`` does without asyncio.  Returns the passes."""
+    end = clock.now + seconds
+    passes = 0
+    while clock.now < end:
+        wait = runtime.run_once()
+        clock.advance(max(wait, 0.001))
+        passes += 1
+    return passes
+
+
+def make(clock):
+    runtime = UIRuntime(clock=clock.ticks_ms)
+    counts = {"fast": 0, "slow": 0}
+
+    def fast():
+        counts["fast"] += 1
+
+    def slow():
+        counts["slow"] += 1
+        clock.advance(0.002)     # takes 2 ms
+
+    runtime.add_task("fast", fast, period=0.01, priority=2)
+    runtime.add_task("slow", slow, period=lambda: 0.1, priority=1)
+    return runtime, counts
+
+
+def test_tasks_run_at_their_periods_across_wrap(clock):
+    clock.now = WRAP - 1.0
+    runtime, counts = make(clock)
+    passes = run(clock, runtime, 2.0)
+    fast, slow = runtime.tasks
+    print("\n{} passes in 2 s: fast {} runs, slow {} runs, latency max {} ms".format(
+        passes, fast.runs, slow.runs, fast.latency_max))
+    assert 195 <= counts["fast"] <= 201
+    assert 20 <= counts["slow"] <= 21
+    assert slow.run_time_max == 2
+    assert fast.latency_max <= 2
+    assert fast.overruns == 0 and slow.overruns == 0
+    # The loop sleeps until the next task is due rather than spinning
+    assert passes <= counts["fast"] + counts["slow"] + 2
+
+
+def test_idle_after_days_of_uptime(clock):
+    # Two days in, time.monotonic() would no longer tell 10 ms apart
+    clock.now = 2 * 86400.0
+    runtime, counts = make(clock)
+    run(clock, runtime, 1.0)
+    assert 95 <= counts["fast"] <= 101
+    assert runtime.run_once() > 0
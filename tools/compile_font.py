@@ -0,0 +1,142 @@
+"""
+`compile_font`
+================================================================================
+Host-side build step that compiles the glyphs used by the UI from a BDF font
+into the compact binary format read by ``lib/compact_font.py``.
+
+Label text is collected from the ``label=``, ``text=`` and ``name=`` string
+arguments in the given Python source files and from the ``label`` and
+``name`` values in JSON layout files.  Blank rows above and below each glyph
+are trimmed.
+
+Usage::
+
+    python tools/compile_font.py fonts/Dina.bdf fonts/Dina.cfnt --scan pyportal_paged_ui.py layout.json
+
+* Author: Jason Pecor
+
+"""
+
+import argparse
+import ast
+import json
+import struct
+
+MAGIC = b"CFNT"
+HEADER = "<4sBBbbH"
+ENTRY = "<HBBbbbbH"
+
+LABEL_KEYWORDS = ("label", "text", "name")
+
+# Layout file sections whose names and text are not drawn with the font
+JSON_UNDRAWN = ("colors", "styles", "bindings")
+
+# Always kept: Label measures "M" to center text vertically
+ALWAYS = " M"
+
+
+def scan_labels(filenames):
+    """Return the set of characters used in label strings in ``filenames``."""
+    chars = set()
+    for filename in filenames:
+        if filename.endswith(".json"):
+            with open(filename) as source:
+                _scan_json(json.load(source), chars)
+            continue
+        with open(filename) as source:
+            tree = ast.parse(source.read(), filename)
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.keyword) or node.arg not in LABEL_KEYWORDS:
+                continue
+            if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+                chars.update(node.value.value)
+    return chars
+
+
+def _scan_json(value, chars):
+    # Collect label text from a layout file, skipping names that are never drawn
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in LABEL_KEYWORDS and isinstance(item, str):
+                chars.update(item)
+            elif key not in JSON_UNDRAWN:
+                _scan_json(item, chars)
+    elif isinstance(value, list):
+        for item in value:
+            _scan_json(item, chars)
+
+
+def parse_bdf(filename):
+    """Return (bounding box, {code point: (width, height, dx, dy, shift_x, shift_y, rows)})."""
+    bbox = None
+    glyphs = {}
+    with open(filename) as bdf:
+        lines = iter(bdf.read().splitlines())
+    for line in lines:
+        if line.startswith("FONTBOUNDINGBOX"):
+            bbox = tuple(int(v) for v in line.split()[1:5])
+        elif line.startswith("STARTCHAR"):
+            code = shift_x = shift_y = None
+            width = height = dx = dy = 0
+            for line in lines:
+                if line.startswith("ENCODING"):
+                    code = int(line.split()[1])
+                elif line.startswith("DWIDTH"):
+                    shift_x, shift_y = (int(v) for v in line.split()[1:3])
+                elif line.startswith("BBX"):
+                    width, height, dx, dy = (int(v) for v in line.split()[1:5])
+                elif line.startswith("BITMAP"):
+                    rows = [bytes.fromhex(next(lines).strip()) for _ in range(height)]
+                    glyphs[code] = (width, height, dx, dy, shift_x, shift_y, rows)
+                elif line.startswith("ENDCHAR"):
+                    break
+    return bbox, glyphs
+
+
+def _trim(width, height, dy, rows):
+    # Drop blank rows above and below the glyph, keeping at least one row
+    top = 0
+    while top < height - 1 and not any(rows[top]):
+        top += 1
+    bottom = height
+    while bottom > top + 1 and not any(rows[bottom - 1]):
+        bottom -= 1
+    stride = (width + 7) // 8
+    rows = [row[:stride].ljust(stride, b"\0") for row in rows[top:bottom]]
+    return bottom - top, dy + (height - bottom), rows
+
+
+def compile_font(bdf_filename, chars):
+    """Compile the glyphs for ``chars`` from ``bdf_filename`` and return the file contents."""
+    bbox, glyphs = parse_bdf(bdf_filename)
+    table = b""
+    data = b""
+    codes = sorted(c for c in set(ord(ch) for ch in chars) if c in glyphs)
+    for code in codes:
+        width, height, dx, dy, shift_x, shift_y, rows = glyphs[code]
+        height, dy, rows = _trim(width, height, dy, rows)
+        table += struct.pack(ENTRY, code, width, height, dx, dy, shift_x, shift_y, len(data))
+        data += b"".join(rows)
+    return struct.pack(HEADER, MAGIC, bbox[0], bbox[1], bbox[2], bbox[3], len(codes)) + table + data
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Compile a subset of a BDF font.")
+    parser.add_argument("bdf", help="BDF font to compile")
+    parser.add_argument("output", help="compact font file to write")
+    parser.add_argument("--scan", nargs="*", default=[],
+                        help="Python or JSON layout files to scan for label text")
+    parser.add_argument("--chars", default="", help="extra characters to include")
+    args = parser.parse_args()
+
+    chars = scan_labels(args.scan) | set(args.chars) | set(ALWAYS)
+    compiled = compile_font(args.bdf, chars)
+    with open(args.output, "wb") as output:
+        output.write(compiled)
+    print("{} glyphs, {} bytes: {}".format(
+        struct.unpack_from(HEADER, compiled)[5], len(compiled), "".join(sorted(chars))))
+
+
+if __name__ == "__main__":
+    main()